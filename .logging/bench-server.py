@@ -0,0 +1,155 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.10"
+# dependencies = []
+# ///
+"""
+Load test of server.py: file listings while large downloads are in progress.
+
+Writes --files small session files and one session file of about --download-mb
+to a temporary requests/ directory, then for the old single-threaded
+HTTPServer and for server.py's BoundedThreadingHTTPServer:
+  - starts --downloads clients fetching the large file slowly (a --chunk-kb
+    read every --delay-ms, like a browser tab on a slow link)
+  - meanwhile sends --listings /api/files and /api/session requests from
+    --clients threads, and reports their latency
+
+With one request at a time, every listing waits behind the downloads.
+
+Usage:
+    uv run .logging/bench-server.py [--download-mb 64] [--downloads 4] [--listings 40]
+"""
+import argparse
+import importlib.util
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import HTTPServer
+from pathlib import Path
+
+from session_files import write_session_file
+
+SERVER = Path(__file__).resolve().parent / "server.py"
+
+
+def synthetic_entry(index: int, rng: random.Random, words: int) -> dict:
+    text = " ".join(rng.choice(("escape", "room", "puzzle", "lantern", "door", "clue", "ÆØÅ", "✓")) for _ in range(words))
+    return {
+        "request": {"session.id": f"session-{index:06d}", "request_text": [{"role": "user", "content": text}]},
+        "response": {"response_text": text, "input_token_count": rng.randint(10, 9000)},
+    }
+
+
+def write_sessions(args, rng: random.Random) -> str:
+    requests_dir = Path("requests")
+    requests_dir.mkdir()
+    for index in range(args.files):
+        entries = (synthetic_entry(index, rng, 50) for _ in range(rng.randint(1, 20)))
+        write_session_file(entries, requests_dir / f"2025-11-10_09-{index // 60 % 60:02d}-{index % 60:02d}-session-{index:06d}.json")
+
+    large = requests_dir / "2025-11-11_00-00-00-large-session.json"
+    entries, size = [], 0
+    while size < args.download_mb * 1024 * 1024:
+        entries.append(synthetic_entry(len(entries), rng, 2000))
+        size += 26_000  # About the size of one entry on disk
+    write_session_file(entries, large)
+    return f"/requests/{large.name}"
+
+
+def slow_download(url: str, args, results: list):
+    start = time.perf_counter()
+    received = 0
+    # No Accept-Encoding: the full uncompressed file
+    with urllib.request.urlopen(url, timeout=600) as response:
+        while chunk := response.read(args.chunk_kb * 1024):
+            received += len(chunk)
+            time.sleep(args.delay_ms / 1000)
+    results.append((received, time.perf_counter() - start))
+
+
+def listing_client(base: str, download: str, count: int, latencies: list):
+    paths = ("/api/files?limit=50", "/api/files?q=session-0001",
+             f"/api/session/{download.rsplit('/', 1)[1]}?offset=100&limit=20")
+    for i in range(count):
+        path = paths[i % len(paths)]
+        start = time.perf_counter()
+        with urllib.request.urlopen(base + path, timeout=600) as response:
+            response.read()
+        latencies.append(time.perf_counter() - start)
+
+
+def run(name: str, httpd, download: str, args):
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://localhost:{httpd.server_address[1]}"
+
+    downloads = []
+    downloaders = [threading.Thread(target=slow_download, args=(base + download, args, downloads)) for _ in range(args.downloads)]
+    for downloader in downloaders:
+        downloader.start()
+    time.sleep(0.2)  # Let the downloads get going
+
+    latencies = []
+    clients = [threading.Thread(target=listing_client, args=(base, download, args.listings // args.clients, latencies)) for _ in range(args.clients)]
+    start = time.perf_counter()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    listing_time = time.perf_counter() - start
+    for downloader in downloaders:
+        downloader.join()
+
+    httpd.shutdown()
+    httpd.server_close()
+    latencies.sort()
+    size = downloads[0][0]
+    print(f"{name}:")
+    print(f"  {len(latencies)} listings in {listing_time:6.2f}s  "
+          f"p50 {statistics.median(latencies) * 1000:8.1f} ms  max {latencies[-1] * 1000:8.1f} ms")
+    print(f"  {len(downloads)} downloads of {size / 1e6:.0f} MB, slowest {max(seconds for _, seconds in downloads):6.2f}s")
+    return latencies[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=400)
+    parser.add_argument("--download-mb", type=int, default=64)
+    parser.add_argument("--downloads", type=int, default=4)
+    parser.add_argument("--chunk-kb", type=int, default=64)
+    parser.add_argument("--delay-ms", type=int, default=10)
+    parser.add_argument("--listings", type=int, default=40)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=None, help="concurrent requests (default: server.py's)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)  # server.py serves the current directory
+        spec = importlib.util.spec_from_file_location("server", SERVER)
+        server = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(server)
+
+        start = time.perf_counter()
+        download = write_sessions(args, rng)
+        print(f"generated {args.files} session files and a {Path(download[1:]).stat().st_size / 1e6:.0f} MB one "
+              f"in {time.perf_counter() - start:.1f}s")
+        server.CORSRequestHandler.catalog = server.SessionCatalog(Path("requests"))
+        server.CORSRequestHandler.catalog.sync()
+
+        single = run("single-threaded HTTPServer", HTTPServer(("localhost", 0), server.CORSRequestHandler), download, args)
+        workers = args.workers or server.WORKER_THREADS
+        pooled = run(f"BoundedThreadingHTTPServer, {workers} workers",
+                     server.BoundedThreadingHTTPServer(("localhost", 0), server.CORSRequestHandler, workers),
+                     download, args)
+        print(f"slowest listing: {single / pooled:.0f}x faster")
+        os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.10"
+# dependencies = []
+# ///
+"""
+Benchmark watcher.py's incremental tailing on a large synthetic telemetry log.
+
+Writes --size-mb of pretty-printed telemetry records (prompts, API requests and
+responses, tool calls; a new session every few hundred records) to a temporary
+.logging/log.jsonl, then measures:
+  - catch-up: the first process_all over the whole file (MB/s, records/s)
+  - per event: --events rounds of appending --batch records and processing them,
+    against what the old watcher did on every event (parse every record from the
+    start of the file, skipping those already handled)
+
+Usage:
+    uv run .logging/bench-watcher.py [--size-mb 1024] [--events 20] [--batch 50]
+"""
+import argparse
+import importlib.util
+import json
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+WATCHER = Path(__file__).resolve().parent / "watcher.py"
+RECORDS_PER_SESSION = 300
+
+
+def synthetic_record(index: int, rng: random.Random) -> dict:
+    event = rng.choice(("gemini_cli.user_prompt", "gemini_cli.api_request", "gemini_cli.api_response", "gemini_cli.tool_call"))
+    attributes = {
+        "event.name": event,
+        "event.timestamp": f"2025-11-10T09:{(index // 60) % 60:02d}:{index % 60:02d}.000Z",
+        "session.id": f"session-{index // RECORDS_PER_SESSION:06d}",
+        "prompt_id": f"prompt-{index}",
+        "model": "gemini-2.5-flash",
+    }
+    text = " ".join(rng.choice(("escape", "room", "puzzle", "lantern", "door", "clue", "ÆØÅ", "✓")) for _ in range(rng.randint(20, 400)))
+    if event == "gemini_cli.user_prompt":
+        attributes["prompt"] = text
+    elif event == "gemini_cli.api_request":
+        attributes["request_text"] = json.dumps([{"role": "user", "parts": [{"text": text}]}])
+    elif event == "gemini_cli.api_response":
+        attributes.update(input_token_count=rng.randint(10, 9000), output_token_count=rng.randint(10, 2000), response_text=text)
+    else:
+        attributes.update(function_name="read_file", function_args={"path": f"src/{index}.py"}, success=True, duration_ms=rng.randint(1, 500))
+    return {"attributes": attributes}
+
+
+def write_records(path: Path, start: int, count: int, rng: random.Random) -> int:
+    with path.open("a", encoding="utf-8") as f:
+        for index in range(start, start + count):
+            f.write(json.dumps(synthetic_record(index, rng), indent=2, ensure_ascii=False) + "\n")
+    return start + count
+
+
+def full_reparse(watcher, path: Path, skip: int) -> int:
+    # The old per-event work: every value from the start of the file, the first `skip` ignored
+    count = 0
+    for _ in watcher.LogTail(path).read_new():
+        count += 1
+    return count - skip
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=1024)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory) # watcher.py works on ./.logging
+        Path(".logging").mkdir()
+        spec = importlib.util.spec_from_file_location("watcher", WATCHER)
+        watcher = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(watcher)
+
+        log = watcher.LOG_FILE
+        log.touch()
+        records = 0
+        start = time.perf_counter()
+        while log.stat().st_size < args.size_mb * 1024 * 1024:
+            records = write_records(log, records, 1000, rng)
+        size = log.stat().st_size
+        print(f"generated {size / 1e6:.0f} MB, {records} records in {time.perf_counter() - start:.1f}s")
+
+        state = watcher.new_state()
+        tail = watcher.LogTail(log)
+        start = time.perf_counter()
+        state = watcher.process_all(state, tail)
+        elapsed = time.perf_counter() - start
+        assert state["offset"] == size
+        print(f"catch-up:           {elapsed:6.2f}s  {size / 1e6 / elapsed:6.1f} MB/s  {records / elapsed:8.0f} records/s")
+
+        tail_seconds = []
+        for _ in range(args.events):
+            records = write_records(log, records, args.batch, rng)
+            start = time.perf_counter()
+            state = watcher.process_all(state, tail)
+            tail_seconds.append(time.perf_counter() - start)
+        assert state["offset"] == log.stat().st_size
+        print(f"tail, per event:    {sum(tail_seconds) / len(tail_seconds) * 1000:8.2f} ms  ({args.batch} new records)")
+
+        start = time.perf_counter()
+        assert full_reparse(watcher, log, records - args.batch) == args.batch
+        reparse = time.perf_counter() - start
+        print(f"full re-parse, per event: {reparse * 1000:8.0f} ms  (parse only, no output written)")
+        print(f"speedup per event: {reparse / (sum(tail_seconds) / len(tail_seconds)):.0f}x")
+        os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
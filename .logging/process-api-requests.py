@@ -16,6 +16,8 @@ Options:
     --no-clear          Don't clear the log file after processing
     --output-dir PATH   Output directory (default: .logging)
     --verbose          Enable verbose debug output
+    --stream           Single pass with bounded memory via per-session JSONL shards
+    --no-compact       With --stream, leave the shards (the next run compacts them)
     --help             Show this help message
 """
 
@@ -23,14 +25,18 @@ from __future__ import annotations
 import json
 import argparse
 import re
+import sqlite3
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any
 from collections import defaultdict
 
 import ijson
 from filelock import FileLock, Timeout
 
+from session_catalog import SessionCatalog, session_id_of
+from session_files import write_session_file
+
 # ---------- Configuration ----------
 BASE = Path(".")
 LOG_FILE = BASE / ".logging" / "log.jsonl"
@@ -78,6 +84,36 @@ def load_session_file(file_path: Path) -> List[dict]:
         print(f"⚠️  Warning: Could not load {file_path.name}: {e}")
         return []
 
+def record_session_file(output_file: Path, first_entry: Optional[dict]):
+    """Update the viewer's session catalog (session_catalog.py) for a file just written."""
+    try:
+        catalog = _catalogs.get(output_file.parent)
+        if catalog is None:
+            catalog = _catalogs[output_file.parent] = SessionCatalog(output_file.parent)
+        catalog.record(output_file, session_id_of(first_entry))
+    except sqlite3.Error as e:
+        print(f"⚠️  Warning: Could not update session catalog: {e}")
+
+_catalogs = {}  # output directory -> SessionCatalog
+
+def entry_prompt_id(entry: dict) -> Optional[str]:
+    """Extract prompt_id from a session file entry's request, response, or error attributes."""
+    if entry.get("request") and "prompt_id" in entry["request"]:
+        return entry["request"]["prompt_id"]
+    elif entry.get("response") and "prompt_id" in entry["response"]:
+        return entry["response"]["prompt_id"]
+    elif entry.get("error") and "prompt_id" in entry["error"]:
+        return entry["error"]["prompt_id"]
+    return None
+
+def index_by_prompt_id(entries: List[dict], session_data: dict) -> dict:
+    """Add session file entries to session_data, keyed by prompt_id (entries without one are dropped)."""
+    for entry in entries:
+        prompt_id = entry_prompt_id(entry)
+        if prompt_id:
+            session_data[prompt_id] = entry
+    return session_data
+
 def extract_attributes(record: dict) -> dict:
     """Extract attributes from OTLP-style record."""
     return record.get("attributes", {}) if isinstance(record.get("attributes"), dict) else {}
@@ -160,17 +196,15 @@ def save_session_data(session_id: str, session_data: dict, first_timestamp: str,
         if verbose:
             print(f"   💾 Updating: {output_file.name}")
 
-        # For existing files, just overwrite with updated data
-        temp_file = output_file.with_suffix(".tmp")
-        with temp_file.open("w", encoding="utf-8") as f:
-            json.dump(data_list, f, ensure_ascii=False, indent=2)
-        temp_file.replace(output_file)
+        # For existing files, just overwrite with updated data (and its .gz/.idx siblings)
+        write_session_file(data_list, output_file)
     else:
         # Create new file
         if verbose:
             print(f"   💾 Creating new session file")
         output_file = save_session_file(data_list, session_id, first_timestamp or "", output_dir)
 
+    record_session_file(output_file, data_list[0] if data_list else None)
     return output_file
 
 def process_log_file(log_path: Path, output_dir: Path, verbose: bool = False) -> Dict[str, any]:
@@ -265,20 +299,7 @@ def process_log_file(log_path: Path, output_dir: Path, verbose: bool = False) ->
                     # Load existing data if session file exists
                     if session_id in existing_sessions:
                         print(f"   ↪ Appending to existing session file")
-                        existing_data = load_session_file(existing_sessions[session_id])
-                        # Convert list to dict keyed by prompt_id
-                        for entry in existing_data:
-                            # Extract prompt_id from request, response, or error attributes
-                            entry_prompt_id = None
-                            if entry.get("request") and "prompt_id" in entry["request"]:
-                                entry_prompt_id = entry["request"]["prompt_id"]
-                            elif entry.get("response") and "prompt_id" in entry["response"]:
-                                entry_prompt_id = entry["response"]["prompt_id"]
-                            elif entry.get("error") and "prompt_id" in entry["error"]:
-                                entry_prompt_id = entry["error"]["prompt_id"]
-
-                            if entry_prompt_id:
-                                current_session_data[entry_prompt_id] = entry
+                        index_by_prompt_id(load_session_file(existing_sessions[session_id]), current_session_data)
 
                 # Track first timestamp for this session
                 if current_session_first_timestamp is None and timestamp:
@@ -372,13 +393,11 @@ def format_output(grouped_events: Dict[str, Dict[str, any]], parse_json: bool =
 
     return output
 
-def save_session_file(data: List[dict], session_id: str, first_timestamp: str, output_dir: Path) -> Path:
+def session_file_path(session_id: str, first_timestamp: str, output_dir: Path) -> Path:
     """
-    Save session data to file.
+    Path of a new session file.
     Filename format: {first_timestamp}-{session_id}.json
     """
-    output_dir.mkdir(parents=True, exist_ok=True)
-
     # Format timestamp for filename (YYYY-MM-DD_HH-MM-SS)
     try:
         # Parse ISO timestamp and format for filename
@@ -388,18 +407,320 @@ def save_session_file(data: List[dict], session_id: str, first_timestamp: str, o
         # Fallback to current time if parsing fails
         timestamp_str = timestamp_now()
 
-    output_file = output_dir / f"{timestamp_str}-{session_id}.json"
+    return output_dir / f"{timestamp_str}-{session_id}.json"
 
-    # Write to temp file first, then replace (atomic operation)
-    temp_file = output_file.with_suffix(".tmp")
-
-    with temp_file.open("w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+def save_session_file(data: List[dict], session_id: str, first_timestamp: str, output_dir: Path) -> Path:
+    """
+    Save session data to file.
+    Filename format: {first_timestamp}-{session_id}.json
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_file = session_file_path(session_id, first_timestamp, output_dir)
 
-    temp_file.replace(output_file)
+    # Write to temp files first, then replace (atomic operation), with the .gz/.idx siblings
+    write_session_file(data, output_file)
 
     return output_file
 
+# ---------- Streaming Mode ----------
+# --stream reads the log once and keeps only the prompts still in flight in
+# memory. Each session's events go to an append-only JSONL shard,
+# <output-dir>/.shards/<session_id>.jsonl, one line per:
+#   {"segment": ..., "existing": name}    start of a run of records of the session
+#                                          (name of its file if it existed before the run)
+#   {"first_timestamp": ts}                first timestamp of that run
+#   {"prompt_id": ..., "seq": n, ...}      request/response/error of a prompt, written as soon
+#                                          as its response or error arrives (or the run ends);
+#                                          n orders prompts by first appearance
+# Closed runs are listed, in order, in <output-dir>/.shards/segments.jsonl, with
+# the byte offset of their "segment" line. compact_shards() replays them into
+# the grouped JSON session files, byte for byte what process_log_file writes,
+# and removes the shards. A run that was never closed (an interrupted --stream)
+# is not listed, so the offsets let compaction step over it.
+
+SHARDS_DIRNAME = ".shards"
+SEGMENTS_FILE = "segments.jsonl"
+COMPLETING_EVENTS = {EVENT_RESPONSE: "response", EVENT_ERROR: "error"}
+EVENT_FIELDS = {EVENT_REQUEST: "request", **COMPLETING_EVENTS}
+
+def stream_log_file(log_path: Path, output_dir: Path, verbose: bool = False) -> Dict[str, any]:
+    """
+    Single pass over the log, writing per-session shards (see above).
+    Memory holds only the prompts without a response or error yet.
+
+    Returns:
+        Dict with processing statistics (session_files is filled in by compaction)
+    """
+    if not log_path.exists():
+        print(f"❌ Log file not found: {log_path}")
+        return {}
+
+    existing_sessions = get_existing_sessions(output_dir)
+    print(f"📂 Found {len(existing_sessions)} existing session file(s)")
+    shards_dir = output_dir / SHARDS_DIRNAME
+    shards_dir.mkdir(parents=True, exist_ok=True)
+
+    stats = {
+        "total_records": 0,
+        "requests": 0,
+        "responses": 0,
+        "errors": 0,
+        "skipped": 0,
+        "sessions_processed": 0,
+        "sessions_updated": 0,
+        "sessions_created": 0
+    }
+
+    current_session_id = None
+    shard = None
+    segment_offset = 0  # Where the current segment starts in its shard
+    in_flight = {}  # prompt_id -> shard line being built
+    next_seq = 0
+    first_timestamp_seen = False
+
+    def emit(line: dict):
+        shard.write((json.dumps(line, ensure_ascii=False) + "\n").encode("utf-8"))
+
+    def close_segment():
+        for line in in_flight.values():
+            emit(line)
+        in_flight.clear()
+        shard.close()
+        with (shards_dir / SEGMENTS_FILE).open("a", encoding="utf-8") as segments:
+            segments.write(json.dumps({"session_id": current_session_id, "offset": segment_offset}) + "\n")
+        stats["sessions_processed"] += 1
+        if current_session_id in existing_sessions:
+            stats["sessions_updated"] += 1
+        else:
+            stats["sessions_created"] += 1
+
+    print(f"📖 Reading log file: {log_path}")
+    print(f"⏳ Streaming events...")
+
+    with log_path.open("rb") as f:
+        try:
+            for record in ijson.items(f, "", multiple_values=True):
+                stats["total_records"] += 1
+
+                # Progress indicator
+                if verbose and stats["total_records"] % 100 == 0:
+                    print(f"   Processed {stats['total_records']} records...")
+
+                event_name = get_event_name(record)
+                attrs = extract_attributes(record)
+                prompt_id = get_prompt_id(attrs)
+                session_id = get_session_id(attrs)
+                timestamp = get_event_timestamp(record)
+
+                # Skip records without session_id or prompt_id
+                if not session_id or not prompt_id:
+                    stats["skipped"] += 1
+                    continue
+
+                if session_id != current_session_id:
+                    if current_session_id is not None:
+                        close_segment()
+                    current_session_id = session_id
+                    print(f"🔄 Processing session: {session_id}")
+                    existing = existing_sessions.get(session_id)
+                    if existing:
+                        print(f"   ↪ Appending to existing session file")
+                    shard = (shards_dir / f"{session_id}.jsonl").open("ab")
+                    segment_offset = shard.tell()  # After any segment an interrupted run left unlisted
+                    emit({"segment": stats["sessions_processed"], "existing": existing.name if existing else None})
+                    next_seq = 0
+                    first_timestamp_seen = False
+
+                if not first_timestamp_seen and timestamp:
+                    emit({"first_timestamp": timestamp})
+                    first_timestamp_seen = True
+
+                line = in_flight.get(prompt_id)
+                if line is None:
+                    line = in_flight[prompt_id] = {"prompt_id": prompt_id, "seq": next_seq}
+                    next_seq += 1
+
+                field = EVENT_FIELDS.get(event_name)
+                if field is None:
+                    stats["skipped"] += 1
+                    continue
+                line[field] = parse_json_fields(attrs, JSON_STRING_FIELDS, verbose)
+                stats[field + "s"] += 1
+                if verbose:
+                    print(f"   ✓ {field.capitalize()}: {prompt_id}")
+                if event_name in COMPLETING_EVENTS:
+                    emit(in_flight.pop(prompt_id))
+
+        except Exception as e:
+            print(f"⚠️  Warning: Error parsing log file: {e}")
+            if verbose:
+                import traceback
+                traceback.print_exc()
+
+        # The records read so far are complete; keep them even after a parse error
+        if current_session_id is not None:
+            close_segment()
+
+    stats["session_files"] = []
+    return stats
+
+class _SegmentIndex:
+    """
+    prompt_id -> (seq, shard line offsets) of one segment, in a private temporary
+    SQLite database (which spills to disk), so memory stays flat however many
+    prompts the segment holds.
+    """
+
+    def __init__(self):
+        self.db = sqlite3.connect("")
+        self.db.execute("CREATE TABLE lines (prompt_id TEXT NOT NULL, seq INTEGER NOT NULL, offset INTEGER NOT NULL)")
+        self.db.execute("CREATE INDEX lines_by_prompt ON lines (prompt_id, offset)")
+
+    def add(self, prompt_id: str, seq: int, offset: int):
+        self.db.execute("INSERT INTO lines VALUES (?, ?, ?)", (prompt_id, seq, offset))
+
+    def __bool__(self) -> bool:
+        return self.db.execute("SELECT 1 FROM lines LIMIT 1").fetchone() is not None
+
+    def pop(self, prompt_id: str) -> Optional[List[int]]:
+        """Line offsets of a prompt, in order, removing it from the index; None if absent."""
+        offsets = [offset for (offset,) in self.db.execute(
+            "SELECT offset FROM lines WHERE prompt_id = ? ORDER BY offset", (prompt_id,))]
+        if not offsets:
+            return None
+        self.db.execute("DELETE FROM lines WHERE prompt_id = ?", (prompt_id,))
+        return offsets
+
+    def remaining(self) -> Iterable[List[int]]:
+        """Line offsets of each prompt left, in order of first appearance (seq)."""
+        prompt_ids = self.db.execute("SELECT prompt_id FROM lines GROUP BY prompt_id ORDER BY MIN(seq)")
+        for (prompt_id,) in prompt_ids:
+            yield [offset for (offset,) in self.db.execute(
+                "SELECT offset FROM lines WHERE prompt_id = ? ORDER BY offset", (prompt_id,))]
+
+    def close(self):
+        self.db.close()
+
+def _index_segment(shard, offset: int) -> tuple[dict, Optional[str], _SegmentIndex, int]:
+    """
+    Index the segment of an open shard that starts at byte offset:
+    (header, first timestamp, prompt index, offset of the next segment).
+    Only offsets are kept; compaction rereads the lines as it writes them.
+    """
+    shard.seek(offset)
+    header = json.loads(shard.readline())
+    first_timestamp = None
+    index = _SegmentIndex()
+    while True:
+        position = shard.tell()
+        raw = shard.readline()
+        if not raw:
+            break
+        line = json.loads(raw)
+        if "segment" in line:
+            return header, first_timestamp, index, position
+        if "first_timestamp" in line:
+            first_timestamp = line["first_timestamp"]
+            continue
+        index.add(line["prompt_id"], line["seq"], position)
+    return header, first_timestamp, index, shard.tell()
+
+def _prompt_fields(shard, line_offsets: List[int]) -> dict:
+    """Request/response/error of a prompt, folded from its shard lines in order."""
+    fields = {}
+    for offset in line_offsets:
+        shard.seek(offset)
+        line = json.loads(shard.readline())
+        fields.update((field, line[field]) for field in ("request", "response", "error") if field in line)
+    return fields
+
+def iter_session_file(file_path: Path) -> Iterable[tuple[str, dict]]:
+    """
+    (prompt_id, entry) pairs of a session file in the order index_by_prompt_id
+    leaves them, read one entry at a time. A file that repeats a prompt_id, or
+    that ijson rejects (e.g. integers beyond 64 bits), is loaded whole.
+    """
+    if not file_path.exists():
+        return []
+    try:
+        with file_path.open("rb") as f:
+            prompt_ids = [entry_prompt_id(entry) for entry in ijson.items(f, "item", use_float=True)]
+    except Exception:
+        prompt_ids = None  # Let json.load decide, as process_log_file does
+    known = [prompt_id for prompt_id in prompt_ids or () if prompt_id]
+    if prompt_ids is None or len(set(known)) != len(known):
+        return index_by_prompt_id(load_session_file(file_path), {}).items()
+    return _stream_session_file(file_path)
+
+def _stream_session_file(file_path: Path) -> Iterable[tuple[str, dict]]:
+    with file_path.open("rb") as f:
+        for entry in ijson.items(f, "item", use_float=True):
+            prompt_id = entry_prompt_id(entry)
+            if prompt_id:
+                yield prompt_id, entry
+
+def compact_shards(output_dir: Path, verbose: bool = False) -> List[Path]:
+    """
+    Fold the shards left by stream_log_file into the grouped JSON session files,
+    in the order their segments were closed, then delete the shards. Entries are
+    written one at a time, so memory holds a segment's prompt ids, not its events.
+    Returns the session files written.
+    """
+    shards_dir = output_dir / SHARDS_DIRNAME
+    segments_file = shards_dir / SEGMENTS_FILE
+    if not segments_file.exists():
+        return []
+
+    print(f"🗜️  Compacting session shards...")
+    session_files = []
+    offsets = defaultdict(int)  # session_id -> offset of its next segment, for listings without one
+    with segments_file.open("r", encoding="utf-8") as segments:
+        for raw in segments:
+            segment = json.loads(raw)
+            session_id = segment["session_id"]
+            with (shards_dir / f"{session_id}.jsonl").open("rb") as shard:
+                header, first_timestamp, index, offsets[session_id] = _index_segment(
+                    shard, segment.get("offset", offsets[session_id]))
+                if not index:
+                    index.close()
+                    continue
+
+                # The file the session had before the streaming run, as process_log_file would have found it
+                if header["existing"]:
+                    output_file = output_dir / header["existing"]
+                    existing_entries = iter_session_file(output_file)
+                    if verbose:
+                        print(f"   💾 Updating: {output_file.name}")
+                else:
+                    output_file = session_file_path(session_id, first_timestamp or "", output_dir)
+                    existing_entries = []
+                    if verbose:
+                        print(f"   💾 Creating new session file")
+
+                def entries():
+                    for prompt_id, entry in existing_entries:
+                        line_offsets = index.pop(prompt_id)
+                        if line_offsets:
+                            entry.update(_prompt_fields(shard, line_offsets))
+                        yield entry
+                    # New prompts follow the file's entries in order of first appearance
+                    for line_offsets in index.remaining():
+                        entry = {"request": None, "response": None, "error": None}
+                        entry.update(_prompt_fields(shard, line_offsets))
+                        yield entry
+
+                try:
+                    record_session_file(output_file, write_session_file(entries(), output_file))
+                finally:
+                    index.close()
+                session_files.append(output_file)
+
+    # Every shard goes, including those holding only an interrupted run's unlisted segment
+    for path in shards_dir.iterdir():
+        path.unlink()
+    shards_dir.rmdir()
+    return session_files
+
 def clear_log_file(log_path: Path, verbose: bool = False):
     """Clear the log file content."""
     if verbose:
@@ -464,6 +785,16 @@ def main():
         action="store_true",
         help="Keep JSON strings as-is (don't parse to objects)"
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream events to per-session JSONL shards (memory bounded by in-flight prompts), then compact them"
+    )
+    parser.add_argument(
+        "--no-compact",
+        action="store_true",
+        help="With --stream, leave the shards uncompacted"
+    )
 
     args = parser.parse_args()
 
@@ -476,8 +807,8 @@ def main():
         print(f"   Make sure Gemini CLI has run with telemetry enabled.")
         return 1
 
-    # Check if log file is empty
-    if LOG_FILE.stat().st_size == 0:
+    # Check if log file is empty (shards left by --no-compact still need compacting)
+    if LOG_FILE.stat().st_size == 0 and not (args.output_dir / SHARDS_DIRNAME / SEGMENTS_FILE).exists():
         print(f"⚠️  Warning: Log file is empty: {LOG_FILE}")
         print(f"   No data to process.")
         return 0
@@ -490,8 +821,21 @@ def main():
         with lock:
             print(f"✓ Lock acquired\n")
 
+            # Shards left by a --no-compact or interrupted --stream run hold older events than the log
+            leftover_files = compact_shards(args.output_dir, args.verbose)
+            if leftover_files:
+                print(f"✓ Compacted {len(leftover_files)} session file(s) from an earlier --stream run\n")
+            if LOG_FILE.stat().st_size == 0:
+                print(f"⚠️  Warning: Log file is empty: {LOG_FILE}")
+                return 0
+
             # Process log file
-            stats = process_log_file(LOG_FILE, args.output_dir, args.verbose)
+            if args.stream:
+                stats = stream_log_file(LOG_FILE, args.output_dir, args.verbose)
+                if not args.no_compact:
+                    stats["session_files"] = compact_shards(args.output_dir, args.verbose)
+            else:
+                stats = process_log_file(LOG_FILE, args.output_dir, args.verbose)
 
             if stats.get('sessions_processed', 0) == 0:
                 print(f"\n⚠️  No sessions found in log file.")
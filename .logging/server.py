@@ -7,7 +7,10 @@
 Simple HTTP server for API Request Viewer
 
 Serves the .logging directory with CORS headers enabled and automatically
-opens the viewer in your default browser.
+opens the viewer in your default browser. Each connection has its own
+thread, and at most WORKER_THREADS requests are handled at once, so neither
+a slow download or file scan nor an idle browser connection holds up other
+viewer tabs.
 
 Usage:
     uv run .logging/server.py [port]
@@ -17,12 +20,23 @@ Default port: 8000
 """
 
 import sys
+import os
 import json
 import re
+import threading
 import webbrowser
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+from contextlib import nullcontext
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from urllib.parse import unquote, quote
+from urllib.parse import unquote, quote, urlsplit, parse_qs
+
+from session_catalog import SessionCatalog, parse_session_filename
+from session_files import GZIP_SUFFIX, INDEX_SUFFIX, build_index, fresh_gzip, open_index, sibling
+
+RANGE_PATTERN = re.compile(r'bytes=(\d*)-(\d*)$')
+COPY_CHUNK_SIZE = 64 * 1024
+WORKER_THREADS = 16  # Requests handled at once
+REQUEST_TIMEOUT = 30  # Seconds a connection may stall before it is closed
 
 
 def to_kebab_case(text):
@@ -63,44 +77,6 @@ def sanitize_title(title):
     return to_kebab_case(title)
 
 
-def parse_session_filename(filename):
-    """Parse session filename to extract timestamp and title.
-    
-    Handles both new and old formats:
-    - New: {timestamp}-{kebab-title}.json
-    - Old: {timestamp}-{session_id}--{title}.json (backwards compatibility)
-    
-    Returns:
-        dict with 'timestamp' and 'title', or None if invalid
-        Note: session_id is NOT in new filenames, must be loaded from JSON
-    """
-    name = filename.replace(".json", "")
-    
-    # Check for old format with '--' separator
-    if "--" in name:
-        base_part, title_part = name.split("--", 1)
-        # Convert title back from kebab-case (replace - with spaces)
-        title = title_part.replace("-", " ")
-    else:
-        # New format: timestamp-title (no -- separator)
-        base_part = name
-        title = None
-    
-    # Extract timestamp (always first part: YYYY-MM-DD_HH-MM-SS)
-    match = re.match(r"(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})-(.+)$", base_part)
-    if match:
-        timestamp_str, title_or_id = match.groups()
-        
-        # If no title was found from '--' separator, use the part after timestamp
-        if title is None:
-            # This is the kebab-case title (or session ID for untitled sessions)
-            title = title_or_id
-        
-        return {"timestamp": timestamp_str, "title": title}
-    
-    return None
-
-
 def build_session_filename(timestamp, session_id, title=None):
     """Build session filename in format: {timestamp}-{kebab-title}.json
     
@@ -122,71 +98,287 @@ def build_session_filename(timestamp, session_id, title=None):
     return f"{timestamp}-{session_id}.json"
 
 
+class FileSlice:
+    """An open file positioned at the start of a byte range; reads stop at its end."""
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+class BoundedThreadingHTTPServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer that handles at most `workers` requests at a time.
+
+    Each connection gets its own (daemon) thread, which does nothing but wait
+    for the client's next request; only reading and answering a request takes
+    one of the `workers` slots (see CORSRequestHandler.handle_one_request).
+    Idle or preconnected browser sockets therefore cost a sleeping thread,
+    not a slot, while a burst of downloads or scans is still bounded.
+    """
+
+    def __init__(self, server_address, handler_class, workers=WORKER_THREADS):
+        super().__init__(server_address, handler_class)
+        self.workers = workers
+        self.slots = threading.BoundedSemaphore(workers)
+
+
 class CORSRequestHandler(SimpleHTTPRequestHandler):
     """HTTP request handler with CORS headers enabled."""
 
+    catalog = None  # SessionCatalog of requests/, set by main()
+    # Idle or preconnected browser sockets would otherwise keep their thread forever
+    timeout = REQUEST_TIMEOUT
+    files_lock = threading.Lock()  # Renames and deletes check, then change requests/
+    serving_file = False  # Set while answering for a file, which accepts byte ranges
+
+    def handle_one_request(self):
+        """Wait for the next request without a slot, then handle it in one."""
+        try:
+            if not self.rfile.peek(1):
+                self.close_connection = True  # Client closed the connection
+                return
+        except (TimeoutError, ConnectionError):
+            self.close_connection = True
+            return
+        with getattr(self.server, 'slots', None) or nullcontext():
+            super().handle_one_request()
+
     def end_headers(self):
         """Add CORS headers to all responses."""
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, PUT, DELETE, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Range')
+        self.send_header('Access-Control-Expose-Headers', 'X-Total-Count, Content-Range, Accept-Ranges')
+        if self.serving_file:
+            self.send_header('Accept-Ranges', 'bytes')
         self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate')
         super().end_headers()
 
     def do_GET(self):
         """Handle GET requests, including API endpoints."""
-        # API endpoint to list JSON files
-        if self.path == '/api/files':
+        # API endpoint to list JSON files, answered from the session catalog
+        url = urlsplit(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        if url.path == '/api/files':
+            page = self.parse_page(params)
+            if page is None:
+                return
+            limit, offset = page
+
+            # Picks up files changed without the catalog; a single stat when nothing did
+            self.catalog.sync()
+            files, total = self.catalog.list_files(
+                limit, offset,
+                query=params.get('q'),
+                session_id=params.get('session'),
+                since=params.get('from'),
+                until=params.get('to'),
+            )
+            body = json.dumps(files).encode()
+
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('X-Total-Count', str(total))
             self.end_headers()
+            self.wfile.write(body)
+            return
 
-            # Get all JSON files from requests/ folder
-            requests_dir = Path('requests')
-            if requests_dir.exists():
-                files = []
-                for json_file in sorted(requests_dir.glob('*.json'), reverse=True):
-                    stat = json_file.stat()
-
-                    # Parse filename to extract timestamp and title
-                    parsed = parse_session_filename(json_file.name)
-                    if parsed:
-                        timestamp_str = parsed['timestamp']
-                        year, month, day = timestamp_str.split('_')[0].split('-')
-                        time_part = timestamp_str.split('_')[1]
-                        hour, minute, second = time_part.split('-')
-                        timestamp = f"{year}-{month}-{day}T{hour}:{minute}:{second}"
-                        
-                        # Extract session ID from JSON content
-                        session_id = None
-                        try:
-                            with json_file.open('r', encoding='utf-8') as f:
-                                data = json.load(f)
-                                # Get session.id from first request
-                                if data and len(data) > 0:
-                                    first_item = data[0]
-                                    if 'request' in first_item and first_item['request']:
-                                        session_id = first_item['request'].get('session.id')
-                        except Exception:
-                            # If we can't read the file, use title as fallback
-                            session_id = parsed['title']
-
-                        files.append({
-                            'filename': json_file.name,
-                            'timestamp': timestamp,
-                            'sessionId': session_id,
-                            'title': parsed['title'],
-                            'size': stat.st_size
-                        })
-
-                self.wfile.write(json.dumps(files).encode())
-            else:
-                self.wfile.write(b'[]')
+        # API endpoint to read a slice of a session file's entries
+        if url.path.startswith('/api/session/'):
+            page = self.parse_page(params)
+            if page is not None:
+                self.send_session_slice(unquote(url.path[len('/api/session/'):]), *page)
             return
 
         # Default file serving
         super().do_GET()
 
+    def parse_page(self, params):
+        """limit and offset query parameters (limit None: all), or None after a 400 response."""
+        try:
+            limit = int(params['limit']) if 'limit' in params else None
+            offset = int(params.get('offset', 0))
+            if offset < 0 or (limit is not None and limit < 0):
+                raise ValueError
+        except ValueError:
+            self.send_error(400, 'limit and offset must be non-negative integers')
+            return None
+        return limit, offset
+
+    def send_session_slice(self, filename, limit, offset):
+        """Send entries offset .. offset+limit-1 of a session file as a JSON array.
+
+        The bytes are copied straight from the file using its record-offset
+        index (built on first use for files written without one); the total
+        number of entries goes in X-Total-Count.
+        """
+        if not filename.endswith('.json') or filename.startswith('.') or '/' in filename or '\\' in filename:
+            self.send_error(404, 'File not found')
+            return
+        path = Path('requests') / filename
+        try:
+            f = path.open('rb')
+        except OSError:
+            self.send_error(404, 'File not found')
+            return
+
+        with f:
+            # Everything is checked against the file as opened, even if it is replaced meanwhile
+            stat = os.fstat(f.fileno())
+            index = open_index(path, stat)
+            if index is None:
+                try:
+                    build_index(path)
+                except OSError:
+                    pass
+                index = open_index(path, stat)
+
+            if index is None:
+                # Not laid out as the processor writes files: parse it
+                try:
+                    data = json.loads(f.read())
+                except ValueError:
+                    self.send_error(500, 'Invalid session file')
+                    return
+                entries = data[offset:] if limit is None else data[offset:offset + limit]
+                body = json.dumps(entries, ensure_ascii=False, indent=2).encode('utf-8')
+                self.send_session_head(len(body), len(data))
+                self.wfile.write(body)
+                return
+
+            byte_range = index.byte_range(offset, limit)
+            if byte_range is None:
+                self.send_session_head(2, index.count)
+                self.wfile.write(b'[]')
+                return
+            start, end = byte_range
+            self.send_session_head(len(b'[\n  ') + end - start + len(b'\n]'), index.count)
+            self.wfile.write(b'[\n  ')
+            f.seek(start)
+            remaining = end - start
+            while remaining:
+                chunk = f.read(min(remaining, COPY_CHUNK_SIZE))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+            self.wfile.write(b'\n]')
+
+    def send_session_head(self, length, total):
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(length))
+        self.send_header('X-Total-Count', str(total))
+        self.end_headers()
+
+    def send_head(self):
+        """Serve files with single byte ranges, and session files gzipped when accepted."""
+        path = self.translate_path(self.path)
+        if path.endswith('/') or not os.path.isfile(path):
+            return super().send_head()
+        self.serving_file = True
+        try:
+            return self.send_file_head(path)
+        finally:
+            self.serving_file = False
+
+    def send_file_head(self, path):
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            self.send_error(404, 'File not found')
+            return None
+        try:
+            stat = os.fstat(f.fileno())
+            last_modified = self.date_time_string(stat.st_mtime)
+            byte_range = self.requested_range(stat.st_size, last_modified)
+
+            if byte_range is None:
+                gzip_file = fresh_gzip(path) if path.endswith('.json') and self.accepts_gzip() else None
+                if gzip_file is None:
+                    f.close()
+                    return super().send_head()
+                f.close()
+                f = gzip_file.open('rb')
+                self.send_response(200)
+                self.send_header('Content-type', self.guess_type(path))
+                self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(os.fstat(f.fileno()).st_size))
+                self.send_header('Last-Modified', last_modified)
+                self.send_header('Vary', 'Accept-Encoding')
+                self.end_headers()
+                return f
+
+            start, end = byte_range
+            if start >= stat.st_size:
+                f.close()
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{stat.st_size}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return None
+            f.seek(start)
+            self.send_response(206)
+            self.send_header('Content-type', self.guess_type(path))
+            self.send_header('Content-Range', f'bytes {start}-{end}/{stat.st_size}')
+            self.send_header('Content-Length', str(end - start + 1))
+            self.send_header('Last-Modified', last_modified)
+            self.end_headers()
+            return FileSlice(f, end - start + 1)
+        except:
+            f.close()
+            raise
+
+    def requested_range(self, size, last_modified):
+        """First and last byte of a single Range (start >= size if unsatisfiable), or None for the whole file.
+
+        Several ranges, malformed ranges and an If-Range for another version
+        of the file all get the whole file.
+        """
+        header = self.headers.get('Range')
+        if not header:
+            return None
+        if_range = self.headers.get('If-Range')
+        if if_range is not None and if_range != last_modified:
+            return None
+        match = RANGE_PATTERN.match(header.strip())
+        if not match or match.groups() == ('', ''):
+            return None
+        first, last = match.groups()
+        if not first:
+            # Suffix range: the last n bytes
+            return max(size - int(last), 0) if int(last) else size, size - 1
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        return start, min(int(last), size - 1) if last else size - 1
+
+    def accepts_gzip(self):
+        """Whether Accept-Encoding lists gzip with a non-zero quality."""
+        for coding in self.headers.get('Accept-Encoding', '').split(','):
+            name, _, parameters = coding.partition(';')
+            if name.strip().lower() not in ('gzip', 'x-gzip'):
+                continue
+            quality = parameters.strip()
+            if not quality.startswith('q='):
+                return True
+            try:
+                return float(quality[2:]) > 0
+            except ValueError:
+                return False
+        return False
+
     def do_PUT(self):
         """Handle PUT requests for API endpoints."""
         # API endpoint to rename session file
@@ -229,15 +421,22 @@ class CORSRequestHandler(SimpleHTTPRequestHandler):
                 old_path = requests_dir / current_filename
                 new_path = requests_dir / new_filename
 
-                if not old_path.exists():
-                    self.send_error(404, 'File not found')
-                    return
+                with self.files_lock:
+                    if not old_path.exists():
+                        self.send_error(404, 'File not found')
+                        return
 
-                if new_path.exists() and new_path != old_path:
-                    self.send_error(409, 'File with that name already exists')
-                    return
+                    if new_path.exists() and new_path != old_path:
+                        self.send_error(409, 'File with that name already exists')
+                        return
 
-                old_path.rename(new_path)
+                    old_path.rename(new_path)
+                    if new_path != old_path:
+                        # The siblings stay valid: a rename keeps the file's size and mtime
+                        for suffix in (GZIP_SUFFIX, INDEX_SUFFIX):
+                            if sibling(old_path, suffix).exists():
+                                sibling(old_path, suffix).replace(sibling(new_path, suffix))
+                    self.catalog.rename(current_filename, new_filename)
 
                 # Return success with new filename
                 self.send_response(200)
@@ -293,12 +492,16 @@ class CORSRequestHandler(SimpleHTTPRequestHandler):
                     self.send_error(400, 'Invalid file path')
                     return
 
-                if not file_path.exists():
-                    self.send_error(404, 'File not found')
-                    return
+                with self.files_lock:
+                    if not file_path.exists():
+                        self.send_error(404, 'File not found')
+                        return
 
-                # Delete the file
-                file_path.unlink()
+                    # Delete the file
+                    file_path.unlink()
+                    for suffix in (GZIP_SUFFIX, INDEX_SUFFIX):
+                        sibling(file_path, suffix).unlink(missing_ok=True)
+                    self.catalog.remove(file_path.name)
 
                 # Return success
                 self.send_response(200)
@@ -327,7 +530,7 @@ class CORSRequestHandler(SimpleHTTPRequestHandler):
 
     def log_message(self, format, *args):
         """Customize log messages to be more concise."""
-        if args[1] == '200':
+        if len(args) > 1 and args[1] == '200':
             # Only log non-200 responses to reduce noise
             return
         super().log_message(format, *args)
@@ -352,12 +555,15 @@ def main():
 
     # Change to .logging directory
     script_dir = Path(__file__).parent
-    import os
     os.chdir(script_dir)
 
+    # Catalog of the session files, brought up to date before the first request
+    CORSRequestHandler.catalog = SessionCatalog(Path('requests'))
+    CORSRequestHandler.catalog.sync()
+
     # Create server
     server_address = ('localhost', port)
-    httpd = HTTPServer(server_address, CORSRequestHandler)
+    httpd = BoundedThreadingHTTPServer(server_address, CORSRequestHandler)
 
     # Print startup message
     url = f'http://localhost:{port}/api-viewer.html'
@@ -366,6 +572,7 @@ def main():
     print('='*60)
     print(f'Server running at: http://localhost:{port}')
     print(f'Viewer URL: {url}')
+    print(f'Concurrent requests: {WORKER_THREADS}')
     print('\nPress Ctrl+C to stop the server')
     print('='*60)
 
@@ -378,7 +585,7 @@ def main():
         httpd.serve_forever()
     except KeyboardInterrupt:
         print('\n\n👋 Shutting down server...')
-        httpd.shutdown()
+        httpd.server_close()
         print('✅ Server stopped')
 
 
@@ -0,0 +1,229 @@
+"""
+Session catalog for the API Request Viewer
+
+A small SQLite index, .requests.catalog.sqlite3 next to requests/, of the
+session files: filename, timestamp, title, session id, size and mtime.
+process-api-requests.py records every file it writes and server.py records the
+renames and deletes it performs, so /api/files is answered from the catalog
+without opening session files.
+
+Files added, removed or renamed behind the catalog's back (copied in, an older
+processor) are picked up by sync(): it does nothing while the directory's mtime
+is unchanged, and otherwise stats the files and reads only those whose size or
+mtime no longer match. The catalog lives outside the directory because SQLite
+creates and removes its -wal and -shm files on every connection, which would
+change that mtime each time. An in-place edit leaves the directory's mtime
+alone, so it is only noticed by the next scan.
+
+Standard library only, imported by both scripts from this directory.
+"""
+
+import json
+import os
+import re
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+CATALOG_SUFFIX = '.catalog.sqlite3'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    filename TEXT PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    title TEXT,
+    session_id TEXT,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_timestamp ON sessions (timestamp);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER
+);
+"""
+
+
+def parse_session_filename(filename):
+    """Parse session filename to extract timestamp and title.
+
+    Handles both new and old formats:
+    - New: {timestamp}-{kebab-title}.json
+    - Old: {timestamp}-{session_id}--{title}.json (backwards compatibility)
+
+    Returns:
+        dict with 'timestamp' and 'title', or None if invalid
+        Note: session_id is NOT in new filenames, must be loaded from JSON
+    """
+    name = filename.replace(".json", "")
+
+    # Check for old format with '--' separator
+    if "--" in name:
+        base_part, title_part = name.split("--", 1)
+        # Convert title back from kebab-case (replace - with spaces)
+        title = title_part.replace("-", " ")
+    else:
+        # New format: timestamp-title (no -- separator)
+        base_part = name
+        title = None
+
+    # Extract timestamp (always first part: YYYY-MM-DD_HH-MM-SS)
+    match = re.match(r"(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})-(.+)$", base_part)
+    if match:
+        timestamp_str, title_or_id = match.groups()
+
+        # If no title was found from '--' separator, use the part after timestamp
+        if title is None:
+            # This is the kebab-case title (or session ID for untitled sessions)
+            title = title_or_id
+
+        return {"timestamp": timestamp_str, "title": title}
+
+    return None
+
+
+def iso_timestamp(timestamp_str):
+    """Convert a filename timestamp (YYYY-MM-DD_HH-MM-SS) to YYYY-MM-DDTHH:MM:SS."""
+    date_part, time_part = timestamp_str.split('_')
+    return f"{date_part}T{time_part.replace('-', ':')}"
+
+
+def session_id_of(first_entry):
+    """Session id shown for a session file: session.id of its first entry's request."""
+    if first_entry and first_entry.get('request'):
+        return first_entry['request'].get('session.id')
+    return None
+
+
+def read_session_id(path, fallback=None):
+    """Load a session file to find its session id (fallback if it can't be read)."""
+    try:
+        with path.open('r', encoding='utf-8') as f:
+            data = json.load(f)
+        return session_id_of(data[0]) if data else None
+    except Exception:
+        return fallback
+
+
+class SessionCatalog:
+    """SQLite catalog of the session files in one directory.
+
+    Each call opens its own connection, so a catalog can be shared by threads
+    and by the processor and the server at the same time (WAL journal).
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        # Beside the directory, not in it: see the module docstring
+        self.path = self.directory.parent / f'.{self.directory.name}{CATALOG_SUFFIX}'
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.executescript(SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def _row(self, path, session_id):
+        parsed = parse_session_filename(path.name)
+        if not parsed:
+            return None
+        stat = path.stat()
+        return (path.name, iso_timestamp(parsed['timestamp']), parsed['title'], session_id,
+                stat.st_size, stat.st_mtime_ns)
+
+    def record(self, path, session_id):
+        """Add or update a session file just written (files not named like sessions are ignored)."""
+        row = self._row(Path(path), session_id)
+        if row:
+            with closing(self._connect()) as connection, connection:
+                connection.execute('INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?)', row)
+
+    def rename(self, old_filename, new_filename):
+        """Move a session's entry to its new filename, keeping its session id."""
+        with closing(self._connect()) as connection, connection:
+            found = connection.execute('SELECT session_id FROM sessions WHERE filename = ?', (old_filename,)).fetchone()
+            connection.execute('DELETE FROM sessions WHERE filename = ?', (old_filename,))
+            new_path = self.directory / new_filename
+            parsed = parse_session_filename(new_filename)
+            session_id = found[0] if found else read_session_id(new_path, parsed and parsed['title'])
+            row = self._row(new_path, session_id)
+            if row:
+                connection.execute('INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?)', row)
+
+    def remove(self, filename):
+        """Drop a deleted session file."""
+        with closing(self._connect()) as connection, connection:
+            connection.execute('DELETE FROM sessions WHERE filename = ?', (filename,))
+
+    def sync(self):
+        """Catch up with changes made without the catalog. Returns the number of files (re)read."""
+        # Read the mtime before scanning: a change during the scan moves it again
+        directory_mtime = os.stat(self.directory).st_mtime_ns
+        with closing(self._connect()) as connection, connection:
+            known = connection.execute("SELECT value FROM meta WHERE key = 'directory_mtime_ns'").fetchone()
+            if known and known[0] == directory_mtime:
+                return 0
+
+            catalogued = {filename: (size, mtime_ns) for filename, size, mtime_ns
+                          in connection.execute('SELECT filename, size, mtime_ns FROM sessions')}
+            read = 0
+            for entry in os.scandir(self.directory):
+                if not entry.name.endswith('.json') or not entry.is_file():
+                    continue
+                parsed = parse_session_filename(entry.name)
+                if not parsed:
+                    continue
+                stat = entry.stat()
+                if catalogued.pop(entry.name, None) == (stat.st_size, stat.st_mtime_ns):
+                    continue
+                path = Path(entry.path)
+                row = self._row(path, read_session_id(path, parsed['title']))
+                connection.execute('INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?)', row)
+                read += 1
+            connection.executemany('DELETE FROM sessions WHERE filename = ?', [(name,) for name in catalogued])
+            connection.execute("INSERT OR REPLACE INTO meta VALUES ('directory_mtime_ns', ?)", (directory_mtime,))
+        return read
+
+    def list_files(self, limit=None, offset=0, query=None, session_id=None, since=None, until=None):
+        """Session files, newest first, as /api/files returns them.
+
+        Args:
+            limit: Page size (None for all)
+            offset: Number of matching files to skip
+            query: Case-insensitive substring of the title, session id or filename
+            session_id: Exact session id
+            since: Earliest timestamp (YYYY-MM-DDTHH:MM:SS or a prefix of it), inclusive
+            until: Latest timestamp, inclusive (a prefix covers the whole day/hour/...)
+
+        Returns:
+            (list of file dicts, total number of matching files)
+        """
+        conditions, parameters = [], []
+        if query:
+            pattern = '%' + query.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            conditions.append("(lower(title) LIKE ? ESCAPE '\\' OR lower(session_id) LIKE ? ESCAPE '\\'"
+                              " OR lower(filename) LIKE ? ESCAPE '\\')")
+            parameters += [pattern] * 3
+        if session_id:
+            conditions.append('session_id = ?')
+            parameters.append(session_id)
+        if since:
+            conditions.append('timestamp >= ?')
+            parameters.append(since)
+        if until:
+            conditions.append('timestamp <= ?')
+            parameters.append(until + '\uffff')  # A prefix includes everything under it
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+        with closing(self._connect()) as connection:
+            total = connection.execute(f'SELECT count(*) FROM sessions {where}', parameters).fetchone()[0]
+            rows = connection.execute(
+                f'SELECT filename, timestamp, session_id, title, size FROM sessions {where} '
+                'ORDER BY filename DESC LIMIT ? OFFSET ?',
+                parameters + [-1 if limit is None else limit, offset],
+            ).fetchall()
+
+        files = [{'filename': filename, 'timestamp': timestamp, 'sessionId': session, 'title': title, 'size': size}
+                 for filename, timestamp, session, title, size in rows]
+        return files, total
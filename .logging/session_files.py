@@ -0,0 +1,180 @@
+"""
+Session files and their siblings, for process-api-requests.py and server.py
+
+Every session file the processor writes gets two siblings, written in the
+same pass:
+
+    <name>.json.gz   the same bytes gzip-compressed, served to browsers that
+                     accept gzip
+    <name>.json.idx  record-offset index: where each entry of the JSON array
+                     starts, so a slice of records is served by seeking
+                     instead of parsing
+
+The index header holds the size and mtime of the JSON file it was built for
+(and the size of the .gz written with it), so a session file changed any
+other way is detected and its siblings ignored. Files written before the
+siblings existed get an index built on first use by scanning their lines.
+
+Standard library only, imported by both scripts from this directory.
+"""
+
+import gzip
+import json
+import os
+import struct
+import threading
+from array import array
+from pathlib import Path
+
+GZIP_SUFFIX = '.gz'
+INDEX_SUFFIX = '.idx'
+INDEX_MAGIC = b'SIDX\x01\x00\x00\x00'
+# magic, JSON size, JSON mtime_ns, .gz size (0: none), number of entries;
+# then per entry the byte offsets of its first byte and just past its last
+INDEX_HEADER = struct.Struct('<8sQQQQ')
+ENTRY_SPAN = struct.Struct('<QQ')
+GZIP_LEVEL = 6
+
+
+def sibling(path, suffix):
+    """The .gz or .idx sibling of a session file."""
+    path = Path(path)
+    return path.with_name(path.name + suffix)
+
+
+def write_session_file(entries, output_file):
+    """
+    Write entries one at a time, byte for byte as json.dump(list(entries), f,
+    ensure_ascii=False, indent=2) would to a text file, together with the .gz
+    and .idx siblings. Each file goes through a temp file.
+    Returns the first entry (None if there were none).
+    """
+    output_file = Path(output_file)
+    temp_file = output_file.with_suffix('.tmp')
+    temp_gzip = sibling(output_file, GZIP_SUFFIX + '.tmp')
+    first_entry = None
+    spans = array('Q')
+    position = 0
+
+    with temp_file.open('wb') as f, temp_gzip.open('wb') as gz_raw, \
+            gzip.GzipFile(fileobj=gz_raw, mode='wb', compresslevel=GZIP_LEVEL, mtime=0) as gz:
+        def write(text):
+            nonlocal position
+            # Text mode would translate newlines, so do the same
+            data = text.replace('\n', os.linesep).encode('utf-8')
+            f.write(data)
+            gz.write(data)
+            position += len(data)
+
+        separator = '[\n  '
+        for entry in entries:
+            if first_entry is None:
+                first_entry = entry
+            write(separator)
+            spans.append(position)
+            # Strings never contain a raw newline, so this only indents the entry's lines
+            write(json.dumps(entry, ensure_ascii=False, indent=2).replace('\n', '\n  '))
+            spans.append(position)
+            separator = ',\n  '
+        write('[]' if first_entry is None else '\n]')
+
+    temp_file.replace(output_file)
+    temp_gzip.replace(sibling(output_file, GZIP_SUFFIX))
+    _write_index(output_file, output_file.stat(), spans, sibling(output_file, GZIP_SUFFIX).stat().st_size)
+    return first_entry
+
+
+def _write_index(json_file, stat, spans, gzip_size):
+    # Written last: an index that matches the JSON file vouches for the .gz too.
+    # stat is the JSON file's as the spans were taken from it.
+    temp_index = sibling(json_file, f'{INDEX_SUFFIX}.{os.getpid()}-{threading.get_ident()}.tmp')
+    with temp_index.open('wb') as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, gzip_size, len(spans) // 2))
+        spans.tofile(f)
+    temp_index.replace(sibling(json_file, INDEX_SUFFIX))
+
+
+class SessionIndex:
+    """Record-offset index of a session file (see open_index)."""
+
+    def __init__(self, path, count, gzip_size):
+        self.path = path
+        self.count = count
+        self.gzip_size = gzip_size
+
+    def byte_range(self, offset, limit=None):
+        """
+        Bytes [start, end) of the file holding entries offset .. offset+limit-1,
+        joined as in the file (separators included), or None if that is no entries.
+        """
+        stop = self.count if limit is None else min(self.count, offset + limit)
+        if offset >= stop:
+            return None
+        with self.path.open('rb') as f:
+            f.seek(INDEX_HEADER.size + ENTRY_SPAN.size * offset)
+            start, _ = ENTRY_SPAN.unpack(f.read(ENTRY_SPAN.size))
+            f.seek(INDEX_HEADER.size + ENTRY_SPAN.size * (stop - 1))
+            _, end = ENTRY_SPAN.unpack(f.read(ENTRY_SPAN.size))
+        return start, end
+
+
+def open_index(json_file, stat=None):
+    """
+    The index of a session file, or None if it is missing or no longer matches
+    the file. stat, if given, is checked instead of the file's current one
+    (that of a file already opened, say).
+    """
+    json_file = Path(json_file)
+    index_file = sibling(json_file, INDEX_SUFFIX)
+    try:
+        stat = stat or json_file.stat()
+        with index_file.open('rb') as f:
+            magic, size, mtime_ns, gzip_size, count = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+    except (OSError, struct.error):
+        return None
+    if magic != INDEX_MAGIC or (size, mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+        return None
+    return SessionIndex(index_file, count, gzip_size)
+
+
+def build_index(json_file):
+    """
+    Index a session file written before the siblings existed, from its lines:
+    json.dump(..., indent=2) opens every entry with a '  {' line and closes it
+    with '  }' or '  },'. Returns None for a file laid out any other way.
+    """
+    json_file = Path(json_file)
+    spans = array('Q')
+    with json_file.open('rb') as f:
+        stat = os.fstat(f.fileno())  # The file scanned, even if it is replaced meanwhile
+        first = f.readline().rstrip(b'\r\n')
+        if first not in (b'[', b'[]'):
+            return None
+        position = f.tell()
+        for line in f:
+            stripped = line.rstrip(b'\r\n')
+            if stripped == b'  {' and len(spans) % 2 == 0:
+                spans.append(position + 2)
+            elif stripped in (b'  }', b'  },') and len(spans) % 2 == 1:
+                spans.append(position + 3)
+            elif stripped.startswith(b'  ') and not stripped.startswith(b'   '):
+                return None  # Something other than an object at the top level
+            position += len(line)
+    if len(spans) % 2:
+        return None
+    _write_index(json_file, stat, spans, 0)
+    return open_index(json_file)
+
+
+def fresh_gzip(json_file):
+    """The .gz sibling of a session file if it was written with the file as it is now."""
+    index = open_index(json_file)
+    gzip_file = sibling(json_file, GZIP_SUFFIX)
+    if index is None or not index.gzip_size:
+        return None
+    try:
+        if gzip_file.stat().st_size != index.gzip_size:
+            return None
+    except OSError:
+        return None
+    return gzip_file
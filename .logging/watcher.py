@@ -1,12 +1,15 @@
 #!/usr/bin/env -S uv run --script
 # /// script
 # requires-python = ">=3.10"
-# dependencies = ["ijson>=3.2.3","watchfiles>=0.21"]
+# dependencies = ["watchfiles>=0.21"]
 # ///
 """
-Gemini telemetry watcher using ijson (streaming, multi-value) + watchfiles.
+Gemini telemetry watcher: incremental byte-offset tailing + watchfiles.
 
 - Input: .logging/log.jsonl  (actually pretty-printed JSON objects, back-to-back)
+  Only the bytes appended since the last event are parsed: the state file keeps
+  the byte offset just past the last complete record, and a record still being
+  written is carried over (in memory) to the next event.
 - Output per session:
     .logging/sessions/<YYYY-MM-DD_HH-mm-ss>/
         prompts.log
@@ -21,13 +24,12 @@ This script NEVER launches Gemini. Start Gemini yourself.
 """
 
 from __future__ import annotations
+import codecs
 import json
+import re
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Tuple
-
-import ijson
-from watchfiles import awatch, Change
+from typing import Iterator
 
 BASE = Path(".")
 LOG_FILE = BASE / ".logging" / "log.jsonl"
@@ -35,6 +37,9 @@ SESS_BASE = BASE / ".logging" / "sessions"
 STATE_FILE = BASE / ".logging" / ".state.json"
 SESS_BASE.mkdir(parents=True, exist_ok=True)
 
+READ_CHUNK_BYTES = 1 << 20      # Bytes read (and decoded) at a time
+MAX_PENDING_BYTES = 64 << 20    # An unterminated "record" this long is garbage: skip to the next one
+
 # ---------- helpers ----------
 def ts_folder(val) -> str:
     """Return 'YYYY-MM-DD_HH-mm-ss' from ISO string or epoch (ms/sec)."""
@@ -98,11 +103,11 @@ def open_session_folder(first_info: dict, suffix_bump: int = 0) -> Path:
     return folder
 
 def write_prompt(folder: Path, info: dict):
-    with (folder / "prompts.log").open("a", encoding="utf-8") as f:
+    with (folder / "prompts.log").open("a", encoding="utf-8", errors="replace") as f:
         f.write(f"[{ts_folder(info['time'])}] session={info['sid']}\n{info['prompt'].rstrip()}\n---\n")
 
 def write_resp(folder: Path, info: dict):
-    with (folder / "responses.log").open("a", encoding="utf-8") as f:
+    with (folder / "responses.log").open("a", encoding="utf-8", errors="replace") as f:
         f.write(
             f"[{ts_folder(info['time'])}] session={info['sid']} model={info['model']} "
             f"tokens(in={info['in_tok']},out={info['out_tok']})\n{info['resp'].rstrip()}\n---\n"
@@ -113,96 +118,155 @@ def write_tool(folder: Path, info: dict):
         args_s = json.dumps(info["tool_args"], ensure_ascii=False)
     except Exception:
         args_s = str(info["tool_args"])
-    with (folder / "tools.log").open("a", encoding="utf-8") as f:
+    with (folder / "tools.log").open("a", encoding="utf-8", errors="replace") as f:
         f.write(
             f"[{ts_folder(info['time'])}] session={info['sid']} tool={info['tool_name']} "
             f"success={info['tool_ok']} duration_ms={info['tool_dur']}\nargs={args_s}\n---\n"
         )
 
+# ---------- incremental reading ----------
+_JSON = json.JSONDecoder()
+_WS = re.compile(r"\s*")
+
+class LogTail:
+    """
+    Reads the JSON values appended to the log since the last call.
+    `offset` is the byte offset just past the last complete value; text read
+    beyond it (a record still being written) is kept for the next call.
+    """
+
+    def __init__(self, path: Path, offset: int = 0):
+        self.path = path
+        self.reset(offset)
+
+    def reset(self, offset: int = 0):
+        self.offset = offset
+        self.read_offset = offset  # Bytes of the file read so far
+        self._pending = ""          # Decoded text past `offset`
+        self._utf8 = codecs.getincrementaldecoder("utf-8")(errors="surrogateescape")
+
+    def read_new(self) -> Iterator[dict]:
+        """Yield every complete value appended since the last call, advancing `offset`."""
+        with self.path.open("rb") as f:
+            f.seek(self.read_offset)
+            while True:
+                chunk = f.read(READ_CHUNK_BYTES)
+                if not chunk:
+                    break
+                self.read_offset += len(chunk)
+                text = self._pending + self._utf8.decode(chunk)
+                pos = 0
+                end = len(text)
+                while True:
+                    pos = _WS.match(text, pos).end()
+                    if pos == end:
+                        break
+                    try:
+                        value, pos_after = _JSON.raw_decode(text, pos)
+                    except json.JSONDecodeError as e:
+                        resume = text.find("\n{", pos + 1)
+                        if resume < 0 or e.pos >= end:
+                            break  # Incomplete: the rest of the record is in the next chunk or event
+                        # Malformed: a later record has started, so this one never completes
+                        skipped = text[pos:resume].encode("utf-8", "surrogateescape")
+                        print(f"Skipping {len(skipped)} bytes of unparseable log at offset "
+                              f"{self.offset + len(text[:pos].encode('utf-8', 'surrogateescape'))}")
+                        pos = resume
+                        continue
+                    pos = pos_after
+                    yield value
+                self.offset += len(text[:pos].encode("utf-8", "surrogateescape"))
+                self._pending = text[pos:]
+                if len(self._pending) > MAX_PENDING_BYTES:
+                    self._skip_garbage()
+
+    def _skip_garbage(self):
+        # Drop everything up to the next line that starts a record
+        resume = self._pending.find("\n{", 1)
+        if resume < 0:
+            return
+        print(f"Skipping {resume} bytes of unparseable log at offset {self.offset}")
+        self.offset += len(self._pending[:resume].encode("utf-8", "surrogateescape"))
+        self._pending = self._pending[resume:]
+
 # ---------- state handling ----------
+def new_state() -> dict:
+    return {"offset": 0, "inode": None, "current_sid": None, "session_folder": None}
+
 def load_state() -> dict:
     if STATE_FILE.exists():
         try:
-            return json.loads(STATE_FILE.read_text(encoding="utf-8"))
+            return {**new_state(), **json.loads(STATE_FILE.read_text(encoding="utf-8"))}
         except Exception:
             pass
-    return {"processed_count": 0, "last_size": 0, "current_sid": None, "session_folder": None}
+    return new_state()
 
 def save_state(state: dict):
     STATE_FILE.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
 
 # ---------- processing ----------
-def process_all(state: dict) -> dict:
+def handle_record(rec: dict, state: dict) -> None:
+    """Route one record to its session folder, rolling the folder over on a new session id."""
+    info = normalize(rec)
+
+    # rotate session folder on session id change or if none yet
+    if info["sid"] != state["current_sid"] or state["session_folder"] is None:
+        # new folder based on this record's timestamp
+        state["session_folder"] = str(open_session_folder(info))
+        state["current_sid"] = info["sid"]
+    session_folder = Path(state["session_folder"])
+
+    # route by event
+    ev = info["event"]
+    if ev == "gemini_cli.user_prompt":
+        write_prompt(session_folder, info)
+    elif ev == "gemini_cli.api_response":
+        write_resp(session_folder, info)
+    elif ev == "gemini_cli.tool_call":
+        write_tool(session_folder, info)
+    # else ignore other events (config, metrics, etc.)
+
+def process_all(state: dict, tail: LogTail) -> dict:
     """
-    Re-parse the file and process only NEW objects by skipping first N=processed_count.
-    This avoids partial-object issues and keeps the code simple.
+    Process the records appended since the last call, starting at state["offset"].
     """
     if not LOG_FILE.exists():
         return state
 
-    size = LOG_FILE.stat().st_size
-    # Detect truncation/rotation
-    if size < state.get("last_size", 0):
-        state["processed_count"] = 0
-        state["current_sid"] = None
-        state["session_folder"] = None
-
-    processed = 0
-    new_objs = 0
-    session_folder: Optional[Path] = Path(state["session_folder"]) if state.get("session_folder") else None
-    current_sid = state.get("current_sid")
+    stat = LOG_FILE.stat()
+    # Detect truncation/rotation: the file shrank below what we have read, or was replaced
+    if stat.st_size < tail.read_offset or (state.get("inode") not in (None, stat.st_ino)):
+        state.update(new_state())
+        tail.reset()
+    state["inode"] = stat.st_ino
 
-    with LOG_FILE.open("rb") as f:
-        try:
-            # ijson will iterate over multiple concatenated JSON values
-            records = ijson.items(f, "", multiple_values=True)
-            for rec in records:
-                processed += 1
-                if processed <= state.get("processed_count", 0):
-                    continue  # already handled in a previous run
-
-                info = normalize(rec)
-
-                # rotate session folder on session id change or if none yet
-                if info["sid"] != current_sid or session_folder is None:
-                    # new folder based on this record's timestamp
-                    session_folder = open_session_folder(info)
-                    current_sid = info["sid"]
-
-                # route by event
-                ev = info["event"]
-                if ev == "gemini_cli.user_prompt":
-                    write_prompt(session_folder, info)
-                elif ev == "gemini_cli.api_response":
-                    write_resp(session_folder, info)
-                elif ev == "gemini_cli.tool_call":
-                    write_tool(session_folder, info)
-                # else ignore other events (config, metrics, etc.)
-
-                new_objs += 1
+    # State files from the record-counting version: skip the records they had processed
+    skip = state.pop("processed_count", 0)
+    state.pop("last_size", None)
 
-        except Exception:
-            # Likely trailing incomplete JSON while Gemini is writing; ignore for now.
-            print("Failed to parse line:", rec)
-            pass
+    offset = tail.offset
+    for rec in tail.read_new():
+        if skip:
+            skip -= 1
+            continue
+        handle_record(rec, state)
 
-    # update state
-    state["processed_count"] = processed
-    state["last_size"] = size
-    state["current_sid"] = current_sid
-    state["session_folder"] = str(session_folder) if session_folder else None
-    if new_objs:
+    state["offset"] = tail.offset
+    if tail.offset != offset:
         save_state(state)
     return state
 
 # ---------- watcher main ----------
 async def main():
+    from watchfiles import awatch, Change
+
     # Ensure folder exists; don’t create/clear the log (user controls it)
     LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
 
     # Prime once (in case the file already has content)
     state = load_state()
-    state = process_all(state)
+    tail = LogTail(LOG_FILE, state["offset"])
+    state = process_all(state, tail)
 
     # React to changes
     async for changes in awatch(LOG_FILE.parent, debounce=150):
@@ -212,11 +276,12 @@ async def main():
             continue
         # if deleted, just reset counters and wait for re-creation
         if any(chg == Change.deleted and str(p) == str(LOG_FILE) for chg, p in changes):
-            state = {"processed_count": 0, "last_size": 0, "current_sid": None, "session_folder": None}
+            state = new_state()
+            tail.reset()
             save_state(state)
             continue
-        # modified/added → (re)process
-        state = process_all(state)
+        # modified/added → read what was appended
+        state = process_all(state, tail)
 
 if __name__ == "__main__":
     import asyncio
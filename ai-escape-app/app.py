@@ -2,9 +2,12 @@ from dotenv import load_dotenv
 
 load_dotenv(dotenv_path='.flaskenv') # take environment variables from .env.
 from flask import Flask, render_template
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import QueuePool
 from models import Base
+from services.schema_migrations import upgrade_schema
+import logging
 import os
 from routes import bp
 
@@ -12,6 +15,20 @@ from routes import bp
 class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL") or "sqlite:///default.db"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Connection pool settings (ignored for in-memory SQLite, which needs a single connection)
+    SQLALCHEMY_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+    SQLALCHEMY_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 20))
+    SQLALCHEMY_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true"
+    SQLALCHEMY_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800)) # Seconds
+    # SQLite connection profile, applied to every new connection (see build_sqlite_pragmas).
+    # WAL lets readers proceed while a write commits; NORMAL sync is durable in WAL
+    # mode except for the last commits before a power loss.
+    SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)) # Bytes
+    SQLITE_CACHE_SIZE = int(os.environ.get("SQLITE_CACHE_SIZE", -64000)) # Pages, or KiB if negative
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000))
+    SQLITE_FOREIGN_KEYS = os.environ.get("SQLITE_FOREIGN_KEYS", "true").lower() == "true"
 
 
 class TestConfig(Config):
@@ -21,19 +38,98 @@ class TestConfig(Config):
     )
 
 
+def _is_memory_sqlite(database_uri: str) -> bool:
+    return database_uri.startswith("sqlite") and (
+        ":memory:" in database_uri or database_uri == "sqlite://"
+    )
+
+
+def build_engine_options(config) -> dict:
+    """
+    Builds the keyword arguments for create_engine from the app config.
+    Config objects without pool settings fall back to the Config defaults.
+    """
+    database_uri = config["SQLALCHEMY_DATABASE_URI"]
+    options = {
+        "pool_pre_ping": config.get("SQLALCHEMY_POOL_PRE_PING", Config.SQLALCHEMY_POOL_PRE_PING),
+        "pool_recycle": config.get("SQLALCHEMY_POOL_RECYCLE", Config.SQLALCHEMY_POOL_RECYCLE),
+    }
+
+    if _is_memory_sqlite(database_uri):
+        # Every pooled connection would open its own empty in-memory database,
+        # so keep SQLAlchemy's default per-thread connection pool here.
+        return options
+
+    options["poolclass"] = QueuePool
+    options["pool_size"] = config.get("SQLALCHEMY_POOL_SIZE", Config.SQLALCHEMY_POOL_SIZE)
+    options["max_overflow"] = config.get("SQLALCHEMY_MAX_OVERFLOW", Config.SQLALCHEMY_MAX_OVERFLOW)
+    if database_uri.startswith("sqlite"):
+        # Pooled connections are handed to whichever worker thread checks them out.
+        options["connect_args"] = {"check_same_thread": False}
+    return options
+
+
+def build_sqlite_pragmas(config) -> list[tuple[str, object]]:
+    """
+    Returns the (pragma, value) pairs to run on each new SQLite connection, in order.
+    Journal mode and mmap do not apply to in-memory databases and are left out there.
+    Config objects without SQLite settings fall back to the Config defaults.
+    """
+    def setting(name):
+        return config.get(name, getattr(Config, name))
+
+    pragmas = []
+    if not _is_memory_sqlite(config["SQLALCHEMY_DATABASE_URI"]):
+        pragmas.append(("journal_mode", setting("SQLITE_JOURNAL_MODE")))
+        pragmas.append(("mmap_size", setting("SQLITE_MMAP_SIZE")))
+    pragmas.append(("synchronous", setting("SQLITE_SYNCHRONOUS")))
+    pragmas.append(("cache_size", setting("SQLITE_CACHE_SIZE")))
+    pragmas.append(("busy_timeout", setting("SQLITE_BUSY_TIMEOUT_MS")))
+    pragmas.append(("foreign_keys", "ON" if setting("SQLITE_FOREIGN_KEYS") else "OFF"))
+    return pragmas
+
+
+def apply_sqlite_pragmas(engine, pragmas: list[tuple[str, object]]) -> None:
+    """
+    Runs the pragmas on every connection the engine opens.
+    """
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
 def create_app(config_object=Config):
+    # Basic logging configuration (no-op if the host, e.g. gunicorn or pytest, already configured it)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
     app = Flask(__name__)
     app.config.from_object(config_object)
 
-    engine = create_engine(app.config["SQLALCHEMY_DATABASE_URI"])
-    Session = sessionmaker(bind=engine)
-    session = Session()
+    engine = create_engine(
+        app.config["SQLALCHEMY_DATABASE_URI"], **build_engine_options(app.config)
+    )
+    if engine.dialect.name == "sqlite":
+        apply_sqlite_pragmas(engine, build_sqlite_pragmas(app.config))
+    # One session per thread/request instead of a single session shared by all workers
+    Session = scoped_session(sessionmaker(bind=engine))
 
-    # Create tables if they don't exist
+    # Create tables if they don't exist, then bring older databases up to date
     Base.metadata.create_all(engine)
-
-    # Attach session to app context for easy access
-    app.session = session
+    upgrade_schema(engine)
+
+    # Attach the session registry to the app; it proxies query/add/commit
+    # to the session that belongs to the current request.
+    app.engine = engine
+    app.session_factory = Session
+    app.session = Session
+
+    @app.teardown_appcontext
+    def remove_session(exception=None):
+        # Close the request's session and return its connection to the pool
+        Session.remove()
 
     @app.route("/")
     def index():
@@ -0,0 +1,82 @@
+"""
+Benchmark: hint status computation and the /hint and session GET paths.
+
+Times the status computation on its own, once as the routes used to do it
+(parse an ISO last_hint_timestamp, subtract datetimes) and once with HintStatus
+(integer expiry), for a session on cooldown. Then times GET
+/game_session/<id>/hint (on cooldown, so no state changes) and GET
+/game_session/<id> through the Flask test client.
+
+Run from the ai-escape-app directory:
+    python benchmarks/bench_hint_status.py [--iterations 200000] [--requests 2000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import timeit
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import Config, create_app
+from services.hint_status import HINT_COOLDOWN_KEY, HINT_COOLDOWN_SECONDS, HintStatus
+
+
+def iso_timestamp_status(narrative_state: dict) -> dict:
+    # The computation previously repeated in get_hint_route, get_session and get_a_hint
+    hints_remaining = narrative_state.get("hints_remaining", 0)
+    remaining_hint_cooldown = 0
+    hint_status_display_text = "Click for a hint"
+    last_hint_timestamp_str = narrative_state.get("last_hint_timestamp")
+    if hints_remaining <= 0:
+        hint_status_display_text = "No more hints available."
+    elif last_hint_timestamp_str:
+        time_since_last_hint = datetime.now(timezone.utc) - datetime.fromisoformat(last_hint_timestamp_str)
+        if time_since_last_hint < timedelta(seconds=HINT_COOLDOWN_SECONDS):
+            remaining_hint_cooldown = int(HINT_COOLDOWN_SECONDS - time_since_last_hint.total_seconds())
+            hint_status_display_text = f"Hint on cooldown ({remaining_hint_cooldown}s)"
+    return {
+        "hints_remaining": hints_remaining,
+        "remaining_hint_cooldown": remaining_hint_cooldown,
+        "hint_status_display_text": hint_status_display_text,
+    }
+
+
+def time_requests(client, url: str, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        assert client.get(url).status_code == 200
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200_000)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    iso_state = {"hints_remaining": 3, "last_hint_timestamp": datetime.now(timezone.utc).isoformat()}
+    epoch_state = {"hints_remaining": 3, HINT_COOLDOWN_KEY: int(time.time()) + HINT_COOLDOWN_SECONDS}
+    iso_us = timeit.timeit(lambda: iso_timestamp_status(iso_state), number=args.iterations) / args.iterations * 1e6
+    epoch_us = timeit.timeit(lambda: HintStatus.of(epoch_state).to_dict(), number=args.iterations) / args.iterations * 1e6
+    print(f"status (ISO timestamp): {iso_us:.3f} us/call")
+    print(f"status (HintStatus):    {epoch_us:.3f} us/call  ({iso_us / epoch_us:.1f}x)")
+
+    with tempfile.TemporaryDirectory() as directory:
+        config = type("BenchConfig", (Config,), {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(directory, 'bench.db')}"})
+        app = create_app(config)
+        client = app.test_client()
+        session_id = client.post("/start_game", json={
+            "player_id": "bench", "theme": "forgotten_library", "location": "forgotten_library_entrance",
+        }).get_json()["session_id"]
+        client.get(f"/game_session/{session_id}/hint") # Spend one hint: every later call is on cooldown
+
+        print(f"GET /hint (cooldown):   {time_requests(client, f'/game_session/{session_id}/hint', args.requests):.0f} us/request")
+        print(f"GET /game_session:      {time_requests(client, f'/game_session/{session_id}', args.requests):.0f} us/request")
+        app.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark: compiled intent matcher vs. the original hand-written
+_normalize_player_attempt phrase scans.
+
+Run from the ai-escape-app directory:
+    python benchmarks/bench_intent_matcher.py [--attempts 100000] [--seed 7]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from data.rooms import ROOM_DATA
+from services.ai_service import _normalize_player_attempt
+
+
+def legacy_normalize_player_attempt(player_attempt: str) -> str:
+    """
+    The phrase-list implementation that _normalize_player_attempt replaced,
+    kept here only as the benchmark baseline.
+    """
+    normalized_attempt = player_attempt.strip().lower()
+
+    if any(phrase in normalized_attempt for phrase in ["examine symbol", "inspect symbol", "touch eye", "look at eye"]):
+        return "examine_glowing_symbol"
+    if any(phrase == normalized_attempt for phrase in ["eyetears"]) or \
+       any(phrase in normalized_attempt for phrase in ["input eyetears", "type eyetears", "enter eyetears", "solve door", "solve symbol"]):
+        return "eyetears"
+    if any(phrase in normalized_attempt for phrase in ["inspect desk", "examine desk", "look at desk"]):
+        return "inspect_desk"
+    if any(phrase == normalized_attempt for phrase in ["7"]) or \
+       any(phrase in normalized_attempt for phrase in ["input 7", "type 7", "enter 7", "open desk"]):
+        return "7"
+    if any(phrase in normalized_attempt for phrase in ["escape library", "exit library", "escape"]):
+        return "escape_the_library"
+
+    if normalized_attempt.startswith("use "):
+        parts = normalized_attempt.split(" on ", 1)
+        if len(parts) == 2:
+            item_id = parts[0].replace("use ", "").strip().replace(' ', '_')
+            target_name = parts[1].strip().replace(' ', '_')
+            return f"use_{item_id}_on_{target_name}"
+        item_id = normalized_attempt.replace("use ", "").strip().replace(' ', '_')
+        return f"use_{item_id}"
+
+    return normalized_attempt
+
+
+FILLER = ["i want to", "let me", "please", "quickly", "carefully", "now", "hmm"]
+
+
+def synthetic_attempts(count: int, seed: int) -> list[tuple[str, str, str]]:
+    """
+    Builds (attempt, theme, room_id) tuples from every room's labels, synonyms
+    and answers, wrapped in random filler words, plus some pure noise.
+    """
+    rng = random.Random(seed)
+    phrases = []
+    for theme_id, theme_data in ROOM_DATA.items():
+        for room_id, room_info in theme_data["rooms"].items():
+            for puzzle in room_info.get("puzzles", {}).values():
+                answer = puzzle.get("expected_answer") or str(puzzle.get("solution", "")).lower()
+                phrases.append((f"enter {answer}", theme_id, room_id))
+                for synonym in puzzle.get("synonyms", []):
+                    phrases.append((synonym, theme_id, room_id))
+            for interactable in room_info.get("interactables", {}).values():
+                for action in interactable.get("actions", []):
+                    phrases.append((action["label"], theme_id, room_id))
+                    for synonym in action.get("synonyms", []):
+                        phrases.append((synonym, theme_id, room_id))
+
+    attempts = []
+    for _ in range(count):
+        phrase, theme_id, room_id = rng.choice(phrases)
+        roll = rng.random()
+        if roll < 0.15:
+            phrase = " ".join(rng.choices(FILLER, k=rng.randint(2, 6)))
+        elif roll < 0.25:
+            phrase = f"use {rng.choice(['brass key', 'lantern', 'map'])} on {rng.choice(['door', 'desk'])}"
+        else:
+            phrase = f"{rng.choice(FILLER)} {phrase} {rng.choice(FILLER)}"
+        attempts.append((phrase, theme_id, room_id))
+    return attempts
+
+
+def _time(label: str, func, attempts) -> float:
+    start = time.perf_counter()
+    for attempt, theme_id, room_id in attempts:
+        func(attempt, theme_id, room_id)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed:8.3f}s  {len(attempts) / elapsed:12,.0f} attempts/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--attempts", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    attempts = synthetic_attempts(args.attempts, args.seed)
+    print(f"{len(attempts):,} synthetic attempts")
+    legacy = _time("legacy phrase scans", lambda a, t, r: legacy_normalize_player_attempt(a), attempts)
+    matcher = _time("intent matcher (room scoped)", _normalize_player_attempt, attempts)
+    _time("intent matcher (unscoped)", lambda a, t, r: _normalize_player_attempt(a), attempts)
+    print(f"speedup vs legacy (scoped):     {legacy / matcher:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark: bytes written per save, delta-encoded saves vs. full to_dict snapshots.
+
+Plays a forgotten_library session (wrong attempts, hints, solves, room moves)
+and saves after every few actions, then compares the JSON written by
+save_game_state with the size a full snapshot would have had.
+
+Run from the ai-escape-app directory:
+    python benchmarks/bench_save_delta.py [--saves 200] [--actions-per-save 3]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models import Base
+from services.game_logic import (
+    create_game_session,
+    get_game_session,
+    load_game_state,
+    save_game_state,
+    solve_puzzle,
+)
+
+
+def _stored_bytes(value) -> int:
+    # SQLAlchemy's JSON type serializes with the default json.dumps separators
+    return len(json.dumps(value).encode("utf-8"))
+
+
+def _scripted_actions():
+    """
+    Endless sequence of (puzzle_id, attempt) pairs: a few wrong guesses per
+    puzzle, then the answer, then wrong guesses at the next room's puzzle.
+    """
+    script = [
+        ("ancient_symbol_door_puzzle", "open"),
+        ("ancient_symbol_door_puzzle", "tears"),
+        ("ancient_symbol_door_puzzle", "EYETEARS"),
+    ]
+    yield from script
+    index = 0
+    while True:
+        yield ("silent_word_puzzle", f"guess {index}")
+        index += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--saves", type=int, default=200)
+    parser.add_argument("--actions-per-save", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    db_session = sessionmaker(bind=engine)()
+
+    game_session, _ = create_game_session(db_session, "bench_player", "forgotten_library", "forgotten_library_entrance")
+    actions = _scripted_actions()
+
+    full_bytes = 0
+    stored_bytes = 0
+    keyframes = 0
+    save_seconds = 0.0
+    saves = []
+    for save_index in range(args.saves):
+        for _ in range(args.actions_per_save):
+            puzzle_id, attempt = next(actions)
+            solve_puzzle(db_session, game_session.id, puzzle_id, attempt)
+
+        full_bytes += _stored_bytes(get_game_session(db_session, game_session.id).to_dict())
+        start = time.perf_counter()
+        saved_game = save_game_state(db_session, game_session.id, f"Save {save_index}")
+        save_seconds += time.perf_counter() - start
+        saves.append(saved_game.id)
+        if saved_game.is_keyframe:
+            keyframes += 1
+            stored_bytes += _stored_bytes(saved_game.game_state)
+        else:
+            stored_bytes += _stored_bytes(saved_game.state_delta)
+
+    start = time.perf_counter()
+    for saved_game_id in saves:
+        load_game_state(db_session, saved_game_id)
+    load_seconds = time.perf_counter() - start
+
+    print(f"saves: {args.saves} ({keyframes} keyframes), actions per save: {args.actions_per_save}")
+    print(f"full snapshots : {full_bytes / args.saves:10.1f} bytes/save  ({full_bytes} total)")
+    print(f"delta encoded  : {stored_bytes / args.saves:10.1f} bytes/save  ({stored_bytes} total)")
+    print(f"reduction      : {full_bytes / max(stored_bytes, 1):10.2f}x")
+    print(f"save latency   : {save_seconds / args.saves * 1000:10.3f} ms/save")
+    print(f"load latency   : {load_seconds / args.saves * 1000:10.3f} ms/load (includes delta replay)")
+
+
+if __name__ == "__main__":
+    main()
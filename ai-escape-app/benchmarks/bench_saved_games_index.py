@@ -0,0 +1,102 @@
+"""
+Benchmark: /saved_games?player_id= latency on a large saved_games table.
+
+Seeds a file-backed SQLite database with --rows saved games (default 1M) spread
+over --players players, then times GET /saved_games?player_id= for random
+players through the Flask test client. Exits with status 1 if the p95 latency
+exceeds --budget-ms. With --without-index the player index is dropped first,
+to show the full-table-scan baseline.
+
+Run from the ai-escape-app directory:
+    python benchmarks/bench_saved_games_index.py [--rows 1000000] [--players 10000] [--budget-ms 50]
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import Config, create_app
+
+
+def seed(database_path: str, rows: int, players: int) -> None:
+    connection = sqlite3.connect(database_path)
+    connection.execute("PRAGMA journal_mode=OFF")
+    connection.execute("PRAGMA synchronous=OFF")
+    connection.executemany(
+        "INSERT INTO game_sessions (id, player_id, current_room, theme, location, difficulty, "
+        "inventory, game_history, narrative_state, puzzle_state) "
+        "VALUES (?, ?, 'forgotten_library_entrance', 'forgotten_library', 'forgotten_library', 'medium', "
+        "'[]', '[]', '{}', '{}')",
+        ((player + 1, f"player_{player}") for player in range(players)),
+    )
+    game_state = json.dumps({"current_room": "forgotten_library_entrance", "location": "forgotten_library", "inventory": []})
+
+    def saved_game_rows():
+        for row in range(rows):
+            player = row % players
+            saved_at = f"2025-{1 + row % 12:02d}-{1 + row % 28:02d} {row % 24:02d}:{row % 60:02d}:00"
+            yield (row + 1, f"player_{player}", player + 1, f"Save {row}", saved_at, game_state)
+
+    connection.executemany(
+        "INSERT INTO saved_games (id, player_id, session_id, save_name, saved_at, game_state, keyframe_distance) "
+        "VALUES (?, ?, ?, ?, ?, ?, 0)",
+        saved_game_rows(),
+    )
+    connection.commit()
+    connection.execute("ANALYZE")
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--players", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    parser.add_argument("--without-index", action="store_true")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = os.path.join(directory, "bench.db")
+        config = type("BenchConfig", (Config,), {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{database_path}"})
+        app = create_app(config) # Creates the schema (and its indexes)
+
+        start = time.perf_counter()
+        seed(database_path, args.rows, args.players)
+        print(f"seeded {args.rows} saved games for {args.players} players in {time.perf_counter() - start:.1f}s")
+
+        if args.without_index:
+            with sqlite3.connect(database_path) as connection:
+                connection.execute("DROP INDEX ix_saved_games_player_id_saved_at")
+
+        rng = random.Random(args.seed)
+        client = app.test_client()
+        latencies = []
+        for _ in range(args.requests):
+            player_id = f"player_{rng.randrange(args.players)}"
+            start = time.perf_counter()
+            response = client.get(f"/saved_games?player_id={player_id}")
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200
+
+        app.engine.dispose()
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"index: {'dropped' if args.without_index else 'ix_saved_games_player_id_saved_at'}")
+    print(f"rows per player: {args.rows // args.players}")
+    print(f"p50: {statistics.median(latencies):.2f} ms  p95: {p95:.2f} ms  max: {latencies[-1]:.2f} ms")
+    print(f"budget (p95): {args.budget_ms:.2f} ms -> {'OK' if p95 <= args.budget_ms else 'EXCEEDED'}")
+    sys.exit(0 if p95 <= args.budget_ms else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: per-worker action throughput, write-through vs write-behind session state.
+
+Creates --sessions game sessions in a file-backed SQLite database and replays
+--actions player actions round-robin over them through the Flask test client
+(one worker thread): inventory changes, wrong puzzle attempts via /interact and
+session reads. Runs the same workload once per durability mode and reports actions per
+second and database writes per action.
+
+Run from the ai-escape-app directory:
+    python benchmarks/bench_session_cache.py [--sessions 20] [--actions 3000] [--flush-interval 5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import event
+
+from app import Config, create_app
+from services.session_cache import DURABILITY_MODES, SessionStateCache, set_session_cache
+
+
+def _action(client, session_id: int, step: int):
+    kind = step % 4
+    if kind == 0:
+        return client.post(f"/game_session/{session_id}/inventory", json={"item": f"item_{step % 7}", "action": "add"})
+    if kind == 1:
+        # Option 5 in the library entrance is "Solve Ancient Symbol Door Puzzle"
+        return client.post(f"/game_session/{session_id}/interact", json={"option_index": 5, "player_attempt": f"guess {step}"})
+    if kind == 2:
+        return client.post(f"/game_session/{session_id}/inventory", json={"item": f"item_{step % 7}", "action": "remove"})
+    return client.get(f"/game_session/{session_id}")
+
+
+def run(mode: str, sessions: int, actions: int, flush_interval: float) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        config = type("BenchConfig", (Config,), {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(directory, 'bench.db')}"})
+        app = create_app(config)
+        cache = SessionStateCache(mode=mode, flush_interval_seconds=flush_interval)
+        set_session_cache(cache)
+        client = app.test_client()
+
+        session_ids = []
+        for index in range(sessions):
+            response = client.post("/start_game", json={"player_id": f"bench_{index}", "theme": "forgotten_library", "location": "forgotten_library_entrance"})
+            session_ids.append(response.get_json()["session_id"])
+
+        writes = []
+        event.listen(app.engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: writes.append(statement) if statement.startswith(("UPDATE", "INSERT")) else None)
+
+        start = time.perf_counter()
+        for step in range(actions):
+            response = _action(client, session_ids[step % sessions], step)
+            assert response.status_code == 200, response.get_data(as_text=True)
+        elapsed = time.perf_counter() - start
+
+        set_session_cache(None) # Shutdown flush, counted in the writes but not the timing
+        app.engine.dispose()
+
+    return {"mode": mode, "actions_per_second": actions / elapsed, "writes_per_action": len(writes) / actions}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--actions", type=int, default=3000)
+    parser.add_argument("--flush-interval", type=float, default=5.0)
+    args = parser.parse_args()
+
+    results = [run(mode, args.sessions, args.actions, args.flush_interval) for mode in DURABILITY_MODES]
+    for result in results:
+        print(f"{result['mode']:>13}: {result['actions_per_second']:8.0f} actions/s  {result['writes_per_action']:.3f} writes/action")
+    print(f"speedup: {results[1]['actions_per_second'] / results[0]['actions_per_second']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark: /interact throughput from many threads, SQLite defaults vs the tuned profile.
+
+Creates one game session per thread in a file-backed SQLite database, then has
+--threads threads send --requests /interact requests each through their own
+Flask test client: three reads ("Look around the room") for every write (a wrong
+puzzle attempt). Runs once with SQLite's own defaults (rollback journal,
+synchronous=FULL, no mmap, 2 MB cache) and once with the Config profile (WAL,
+synchronous=NORMAL, mmap, 64 MB cache), and reports requests per second.
+
+Run from the ai-escape-app directory:
+    python benchmarks/bench_sqlite_concurrency.py [--threads 16] [--requests 200]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import Config, create_app
+from services.session_cache import WRITE_THROUGH, SessionStateCache, set_session_cache
+
+# SQLite's built-in settings, i.e. what create_engine gave us before the profile
+SQLITE_DEFAULTS = {
+    "SQLITE_JOURNAL_MODE": "DELETE",
+    "SQLITE_SYNCHRONOUS": "FULL",
+    "SQLITE_MMAP_SIZE": 0,
+    "SQLITE_CACHE_SIZE": -2000,
+}
+
+# Contextual option indexes in the library entrance
+LOOK_AROUND_OPTION = 4
+SOLVE_DOOR_OPTION = 5
+
+
+def run(profile: str, threads: int, requests_per_thread: int) -> dict:
+    overrides = SQLITE_DEFAULTS if profile == "sqlite defaults" else {}
+    with tempfile.TemporaryDirectory() as directory:
+        config = type("BenchConfig", (Config,), {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(directory, 'bench.db')}",
+            "SQLALCHEMY_POOL_SIZE": threads,
+            **overrides,
+        })
+        app = create_app(config)
+        set_session_cache(SessionStateCache(mode=WRITE_THROUGH)) # Measure the database, not the cache
+
+        setup_client = app.test_client()
+        session_ids = [
+            setup_client.post("/start_game", json={
+                "player_id": f"bench_{index}", "theme": "forgotten_library", "location": "forgotten_library_entrance",
+            }).get_json()["session_id"]
+            for index in range(threads)
+        ]
+
+        failures = []
+        barrier = threading.Barrier(threads + 1)
+
+        def worker(session_id: int):
+            client = app.test_client()
+            barrier.wait()
+            for step in range(requests_per_thread):
+                option = SOLVE_DOOR_OPTION if step % 4 == 0 else LOOK_AROUND_OPTION
+                response = client.post(f"/game_session/{session_id}/interact", json={"option_index": option, "player_attempt": f"guess {step}"})
+                if response.status_code != 200:
+                    failures.append(response.status_code)
+
+        workers = [threading.Thread(target=worker, args=(session_id,)) for session_id in session_ids]
+        for thread in workers:
+            thread.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        set_session_cache(None)
+        app.engine.dispose()
+
+    total = threads * requests_per_thread
+    return {"profile": profile, "requests_per_second": total / elapsed, "failures": len(failures)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    results = [run(profile, args.threads, args.requests) for profile in ("sqlite defaults", "tuned profile")]
+    for result in results:
+        print(f"{result['profile']:>15}: {result['requests_per_second']:8.0f} requests/s  ({result['failures']} failed)")
+    print(f"speedup: {results[1]['requests_per_second'] / results[0]['requests_per_second']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# data/room_index.py
+
+# Precompiled lookup tables over ROOM_DATA.
+#
+# ROOM_DATA is a large nested dict that the game logic used to walk linearly on
+# every action (matching action labels, resolving "Go to <room>" and
+# "solve <puzzle>" names, collecting every puzzle in a theme to check for a win).
+# RoomIndex flattens it once at import time into hash maps so all of those
+# lookups are O(1). ROOM_DATA stays the source of truth; the index only holds
+# references into it, so it must be rebuilt if ROOM_DATA is mutated.
+
+from data.rooms import ROOM_DATA
+
+
+class RoomIndex:
+    """
+    Hash-map index over a ROOM_DATA-shaped dict. All name and label lookups are
+    case-insensitive, matching how player actions were compared before.
+    """
+
+    def __init__(self, room_data: dict):
+        self.room_data = room_data
+        # (theme_id, room_id) -> {action label (lowercase): action dict with "label"/"effect"}
+        self.actions_by_label = {}
+        # theme_id -> {room name (lowercase): room_id}
+        self.room_ids_by_name = {}
+        # (theme_id, room_id) -> {puzzle name (lowercase): puzzle_id}
+        self.puzzle_ids_by_name = {}
+        # (theme_id, puzzle_id) -> (theme_id, room_id, puzzle definition)
+        # Keyed by theme because ids such as "final_escape_puzzle" repeat across themes.
+        self.puzzle_locations = {}
+        # theme_id -> escape chamber room id
+        self.escape_chamber_ids = {}
+        # theme_id -> puzzle ids that must be solved before entering the escape chamber
+        self.escape_puzzle_ids = {}
+        # (theme_id, room_id) -> narrative flags set by solving that room's puzzles
+        self.outcome_flags = {}
+
+        for theme_id, theme_data in room_data.items():
+            rooms = theme_data.get("rooms", {})
+            escape_chamber_id = f"{theme_id}_escape_chamber"
+            self.escape_chamber_ids[theme_id] = escape_chamber_id
+            room_names = self.room_ids_by_name.setdefault(theme_id, {})
+            escape_puzzles = set()
+
+            for room_id, room_info in rooms.items():
+                # setdefault keeps the first match, like the linear scans it replaces
+                room_names.setdefault(room_info.get("name", "").lower(), room_id)
+
+                room_actions = self.actions_by_label.setdefault((theme_id, room_id), {})
+                for interactable_data in room_info.get("interactables", {}).values():
+                    for action in interactable_data.get("actions", []):
+                        room_actions.setdefault(action["label"].lower(), action)
+
+                puzzle_names = self.puzzle_ids_by_name.setdefault((theme_id, room_id), {})
+                outcomes = set()
+                for puzzle_id, puzzle_definition in room_info.get("puzzles", {}).items():
+                    outcomes.update(puzzle_definition.get("outcomes", []))
+                    puzzle_names.setdefault(puzzle_definition.get("name", "").lower(), puzzle_id)
+                    self.puzzle_locations.setdefault(
+                        (theme_id, puzzle_id), (theme_id, room_id, puzzle_definition)
+                    )
+                    if room_id != escape_chamber_id:
+                        escape_puzzles.add(puzzle_id)
+                self.outcome_flags[(theme_id, room_id)] = frozenset(outcomes)
+
+            self.escape_puzzle_ids[theme_id] = frozenset(escape_puzzles)
+
+    def theme(self, theme_id: str) -> dict | None:
+        return self.room_data.get(theme_id)
+
+    def room(self, theme_id: str, room_id: str) -> dict | None:
+        theme_data = self.room_data.get(theme_id)
+        if not theme_data:
+            return None
+        return theme_data["rooms"].get(room_id)
+
+    def find_action(self, theme_id: str, room_id: str, label: str) -> dict | None:
+        """
+        Returns the interactable action in the room whose label matches, or None.
+        """
+        return self.actions_by_label.get((theme_id, room_id), {}).get(label.lower())
+
+    def find_room_id(self, theme_id: str, room_name: str) -> str | None:
+        return self.room_ids_by_name.get(theme_id, {}).get(room_name.lower())
+
+    def find_puzzle_id(self, theme_id: str, room_id: str, puzzle_name: str) -> str | None:
+        return self.puzzle_ids_by_name.get((theme_id, room_id), {}).get(puzzle_name.lower())
+
+    def locate_puzzle(self, theme_id: str, puzzle_id: str) -> tuple[str, str, dict] | None:
+        """
+        Returns (theme_id, room_id, puzzle_definition) for a puzzle, or None.
+        """
+        return self.puzzle_locations.get((theme_id, puzzle_id))
+
+    def room_outcome_flags(self, theme_id: str, room_id: str) -> frozenset:
+        """
+        Returns the narrative flags that solving the room's puzzles can set.
+        """
+        return self.outcome_flags.get((theme_id, room_id), frozenset())
+
+    def escape_chamber_id(self, theme_id: str) -> str:
+        return self.escape_chamber_ids.get(theme_id, f"{theme_id}_escape_chamber")
+
+    def puzzles_required_for_escape(self, theme_id: str) -> frozenset:
+        return self.escape_puzzle_ids.get(theme_id, frozenset())
+
+
+ROOM_INDEX = RoomIndex(ROOM_DATA)
@@ -11,6 +11,11 @@
 # The AI will interpret this solution, evaluate player attempts against it,
 # provide feedback, and guide multi-step puzzles, updating the dynamic
 # 'puzzle_state' in the game session accordingly.
+#
+# Puzzles and interactable actions may define an optional 'synonyms' list of
+# phrases. services/intent_matcher.py compiles these (together with each action
+# label and "input/type/enter <answer>" forms of each solution) into the
+# matcher that normalizes free-text player attempts.
 
 ROOM_DATA = {
     "forgotten_library": {
@@ -27,6 +32,7 @@ ROOM_DATA = {
                         "description": "The heavy door is sealed by an intricate glowing symbol, an eye weeping three tears, etched into its surface. To open it, you must enter the correct word.",
                         "solution": "EYETEARS", # Direct answer for the puzzle - now a single string
                         "expected_answer": "eyetears", # Direct answer for the puzzle - now a single string
+                        "synonyms": ["solve door", "solve symbol"], # Extra phrases that count as the answer
                         "hint_levels": [
                             "Focus on the main components of the symbol. What literal images do you see?",
                             "You see an 'EYE' and 'THREE TEARS'. Can you form a single word from these observations?",
@@ -48,6 +54,7 @@ ROOM_DATA = {
                         "actions": [
                             {
                                 "label": "Examine Glowing Symbol",
+                                "synonyms": ["examine symbol", "inspect symbol", "touch eye", "look at eye"],
                                 "effect": {
                                     "type": "trigger_puzzle",
                                     "puzzle_id": "ancient_symbol_door_puzzle",
@@ -239,6 +246,7 @@ ROOM_DATA = {
                         "name": "Final Escape",
                         "description": "The path to freedom lies ahead. Simply choose to escape.",
                         "solution": ["ESCAPE_THE_LIBRARY"],
+                        "synonyms": ["escape library", "exit library", "escape"],
                         "type": "action_trigger",
                         "difficulty": "easy",
                         "prerequisites": [],
@@ -1084,6 +1092,10 @@ ROOM_DATA = {
                         ]
                     }
                 },
+                "exits": {}
+            }
+        }
+    },
     "kids_room": {
         "intro_story": "A disorienting burst of color and a cacophony of distorted nursery rhymes greet you as you regain consciousness. Everything is enormous – giant building blocks tower over you, and a colossal teddy bear looms menacingly in the corner. You've somehow shrunk and are trapped in a gargantuan child's room. Your goal: find a way to return to your normal size and escape this whimsical, yet terrifying, prison before playtime truly begins. The air smells faintly of forgotten candy and plastic.",
         "start_room": "kids_room_play_area",
@@ -4,6 +4,8 @@ from sqlalchemy import (
     String,
     DateTime,
     JSON,
+    Boolean,
+    Index,
     func,
     ForeignKey,
 )
@@ -18,7 +20,7 @@ class GameSession(Base):
     __tablename__ = "game_sessions"
 
     id = Column(Integer, primary_key=True)
-    player_id = Column(String, nullable=False)
+    player_id = Column(String, nullable=False, index=True) # Sessions are looked up per player
     current_room = Column(String, default="start_room")
     current_room_description = Column(String)
 
@@ -36,6 +38,8 @@ class GameSession(Base):
     theme = Column(String, default="mystery")
     location = Column(String, default="mansion")
     difficulty = Column(String, default="medium")
+    # Bumped on every committed change; the session GET derives its ETag from it
+    revision = Column(Integer, nullable=False, default=0, server_default="0")
 
     # Relationship to saved games
     saved_games = relationship("SavedGame", back_populates="game_session")
@@ -68,27 +72,87 @@ class SavedGame(Base):
 
     id = Column(Integer, primary_key=True)
     player_id = Column(String, nullable=False)
-    session_id = Column(Integer, ForeignKey("game_sessions.id"), nullable=False)
+    session_id = Column(Integer, ForeignKey("game_sessions.id"), nullable=False, index=True) # Previous-save lookup
     save_name = Column(String, nullable=False)
     saved_at = Column(DateTime(timezone=True), default=func.now())
-    game_state = Column(JSON, nullable=False)
+    # Keyframes store the full state in game_state. Other saves store only
+    # state_delta, an op log (services.save_delta) against base_save_id.
+    game_state = Column(JSON, nullable=True)
+    base_save_id = Column(Integer, ForeignKey("saved_games.id"), nullable=True)
+    state_delta = Column(JSON, nullable=True)
+    keyframe_distance = Column(Integer, default=0) # Number of deltas since the last keyframe
+    # Small listing summary (room, theme, progress) so /saved_games never reads the state
+    summary = Column(JSON, nullable=True)
 
     game_session = relationship("GameSession", back_populates="saved_games")
 
-    def to_dict(self):
+    @property
+    def is_keyframe(self) -> bool:
+        return self.base_save_id is None
+
+    def to_dict(self, game_state: dict | None = None):
+        """
+        game_state: the rebuilt state for delta saves (see game_logic.get_saved_game_state).
+        """
         return {
             "id": self.id,
             "player_id": self.player_id,
             "session_id": self.session_id,
             "save_name": self.save_name,
             "saved_at": self.saved_at.isoformat(),
-            "game_state": self.game_state,
+            "game_state": game_state if game_state is not None else self.game_state,
+        }
+
+    def to_summary_dict(self):
+        return {
+            "id": self.id,
+            "session_id": self.session_id,
+            "save_name": self.save_name,
+            "saved_at": self.saved_at.isoformat() if self.saved_at else None,
+            "summary": self.summary,
         }
 
     def __repr__(self):
         return f"<SavedGame(id={self.id}, session_id={self.session_id}, save_name='{self.save_name}')>"
 
 
+# /saved_games filters by player and lists newest first
+Index("ix_saved_games_player_id_saved_at", SavedGame.player_id, SavedGame.saved_at.desc())
+
+
+class PuzzleAttempt(Base):
+    """
+    Append-only log of puzzle attempts. Kept out of game_sessions.puzzle_state,
+    which only holds small per-puzzle counters, so the session row does not grow
+    with every attempt.
+    """
+
+    __tablename__ = "puzzle_attempts"
+    __table_args__ = (Index("ix_puzzle_attempts_session_puzzle", "session_id", "puzzle_id"),)
+
+    id = Column(Integer, primary_key=True)
+    session_id = Column(Integer, ForeignKey("game_sessions.id"), nullable=False)
+    puzzle_id = Column(String, nullable=False)
+    attempted_at = Column(DateTime(timezone=True), default=func.now())
+    action = Column(String(64)) # Normalized semantic action, e.g. "eyetears" or "use_key_on_door"
+    is_correct = Column(Boolean, nullable=False, default=False)
+    hint_given = Column(Boolean, nullable=False, default=False)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "session_id": self.session_id,
+            "puzzle_id": self.puzzle_id,
+            "attempted_at": self.attempted_at.isoformat() if self.attempted_at else None,
+            "action": self.action,
+            "is_correct": self.is_correct,
+            "hint_given": self.hint_given,
+        }
+
+    def __repr__(self):
+        return f"<PuzzleAttempt(session_id={self.session_id}, puzzle_id='{self.puzzle_id}', is_correct={self.is_correct})>"
+
+
 class PlayerSettings(Base):
     __tablename__ = "player_settings"
 
@@ -1,5 +1,4 @@
-from flask import Blueprint, current_app, jsonify, request, render_template
-from datetime import datetime, timezone, timedelta
+from flask import Blueprint, Response, current_app, jsonify, request, render_template
 from services.game_logic import (
     create_game_session,
     get_game_session,
@@ -9,20 +8,29 @@ from services.game_logic import (
     get_contextual_options,
     save_game_state, # New import
     load_game_state, # New import
-    get_saved_games, # New import
+    list_saved_game_summaries,
+    SAVED_GAMES_PAGE_SIZE,
+    SAVED_GAMES_MAX_PAGE_SIZE,
     get_a_hint,
-    player_action, # New import
+    get_contextual_option_entries,
+    perform_contextual_option,
+    player_action_batch,
+    MAX_BATCH_ACTIONS,
+    enter_room,
+    room_image_url,
 )
+from services.game_events import EventStream, get_event_bus
+from services.hint_status import HintStatus
 from services.settings import get_player_settings, update_player_settings, delete_player_settings # New import
+from services.response_cache import get_response_cache
 from services.ai_service import generate_narrative, generate_room_description, generate_puzzle, evaluate_and_adapt_puzzle, adjust_difficulty_based_on_performance
-from data.rooms import ROOM_DATA, PUZZLE_SOLUTIONS
+from data.room_index import ROOM_INDEX
 from data.game_options import GAME_SETUP_OPTIONS
 from data.help_content import HELP_CONTENT # New import
 import logging
+import zlib
 from data.game_settings import GAME_SETTINGS # New import
 
-HINT_COOLDOWN_SECONDS = 45 # Define hint cooldown duration (e.g., 45 seconds)
-
 bp = Blueprint("main", __name__)
 
 
@@ -35,29 +43,9 @@ def get_hint_route(session_id):
         # If get_a_hint returned an error message, it's in 'hint'
         return jsonify({"error": hint}), 404
     
-    # After a hint is successfully provided (or cooldown is active), calculate the new status
-    hints_remaining = game_session.narrative_state.get("hints_remaining", 0)
-    remaining_hint_cooldown = 0
-    last_hint_timestamp_str = game_session.narrative_state.get("last_hint_timestamp")
-    
-    hint_status_display_text = "Click for a hint" # Default status
-
-    if hints_remaining <= 0:
-        hint_status_display_text = "No more hints available."
-    elif last_hint_timestamp_str:
-        last_hint_timestamp = datetime.fromisoformat(last_hint_timestamp_str)
-        time_since_last_hint = datetime.now(timezone.utc) - last_hint_timestamp
-        if time_since_last_hint < timedelta(seconds=HINT_COOLDOWN_SECONDS):
-            remaining_hint_cooldown = int(HINT_COOLDOWN_SECONDS - time_since_last_hint.total_seconds())
-            hint_status_display_text = f"Hint on cooldown ({remaining_hint_cooldown}s)" # Dynamic message
-    
+    # After a hint is successfully provided (or cooldown is active), report the new status
     logging.info(f"Hint provided for session {session_id}: {hint}")
-    return jsonify({
-        "hint": hint,
-        "hints_remaining": hints_remaining,
-        "remaining_hint_cooldown": remaining_hint_cooldown,
-        "hint_status_display_text": hint_status_display_text
-    }), 200
+    return jsonify({"hint": hint, **HintStatus.of(game_session.narrative_state).to_dict()}), 200
 
 
 @bp.route("/game_setup_options", methods=["GET"])
@@ -84,7 +72,7 @@ def save_game():
         return jsonify({"error": "Game session not found or failed to save"}), 404
     
     logging.info(f"Game session {session_id} saved successfully as '{save_name}'.")
-    return jsonify(saved_game.to_dict()), 201
+    return jsonify(saved_game.to_summary_dict()), 201 # The full state is only returned by /load_game
 
 @bp.route("/load_game/<int:saved_game_id>", methods=["GET"])
 def load_game(saved_game_id):
@@ -100,15 +88,36 @@ def load_game(saved_game_id):
 
 @bp.route("/saved_games", methods=["GET"])
 def list_saved_games():
+    """
+    Lists a player's saves, newest first: id, session_id, save_name, saved_at and
+    summary (room, theme, progress). Paginated with ?limit= (default 50, max 200)
+    and ?cursor=; the cursor for the next page is returned in the X-Next-Cursor header.
+    """
     player_id = request.args.get("player_id")
     logging.info(f"Received request to list saved games for player_id: {player_id}")
     if not player_id:
         logging.warning("list_saved_games: Missing player_id query parameter.")
         return jsonify({"error": "Player ID is required as a query parameter"}), 400
-    
-    saved_games = get_saved_games(current_app.session, player_id)
+
+    try:
+        limit = int(request.args.get("limit", SAVED_GAMES_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    if not 1 <= limit <= SAVED_GAMES_MAX_PAGE_SIZE:
+        return jsonify({"error": f"limit must be between 1 and {SAVED_GAMES_MAX_PAGE_SIZE}"}), 400
+
+    try:
+        saved_games, next_cursor = list_saved_game_summaries(
+            current_app.session, player_id, limit=limit, cursor=request.args.get("cursor")
+        )
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
+
     logging.info(f"Successfully retrieved {len(saved_games)} saved games for player_id: {player_id}.")
-    return jsonify([sg.to_dict() for sg in saved_games]), 200
+    response = jsonify(saved_games)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response, 200
 
 @bp.route("/help_content", methods=["GET"])
 def get_help_content():
@@ -163,6 +172,13 @@ def get_loading_messages():
     ]
     return jsonify(loading_messages), 200
 
+@bp.route("/api/ai_cache/stats", methods=["GET"])
+def get_ai_cache_stats():
+    """
+    Returns hit/miss counters and entry counts of the AI response cache, for monitoring.
+    """
+    return jsonify(get_response_cache().stats()), 200
+
 @bp.route("/start_game", methods=["POST"])
 def start_game():
     data = request.get_json()
@@ -197,65 +213,129 @@ def game_view(session_id):
 
 
 
+def _room_name(game_session, room_info):
+    return room_info.get("name") if room_info else game_session.current_room
+
+
+def _room_description(game_session, room_info):
+    return game_session.current_room_description or (room_info.get("description") if room_info else "")
+
+
+# Fields of the session payload: name -> value(game_session, current room info, hint status).
+# GET /game_session/<id>?fields=a,b computes only the requested ones.
+SESSION_FIELDS = {
+    "id": lambda game_session, room_info, hint_status: game_session.id,
+    "revision": lambda game_session, room_info, hint_status: game_session.revision,
+    "player_id": lambda game_session, room_info, hint_status: game_session.player_id,
+    "current_room": lambda game_session, room_info, hint_status: game_session.current_room,
+    "current_room_name": lambda game_session, room_info, hint_status: _room_name(game_session, room_info),
+    "current_room_description": lambda game_session, room_info, hint_status: _room_description(game_session, room_info),
+    "current_room_image": lambda game_session, room_info, hint_status: room_image_url(room_info),
+    "inventory": lambda game_session, room_info, hint_status: game_session.inventory,
+    "game_history": lambda game_session, room_info, hint_status: game_session.game_history,
+    "narrative_state": lambda game_session, room_info, hint_status: game_session.narrative_state,
+    "puzzle_state": lambda game_session, room_info, hint_status: game_session.puzzle_state,
+    "theme": lambda game_session, room_info, hint_status: game_session.theme,
+    "location": lambda game_session, room_info, hint_status: game_session.location, # This 'location' now stores the specific room ID
+    "difficulty": lambda game_session, room_info, hint_status: game_session.difficulty,
+    "start_time": lambda game_session, room_info, hint_status: game_session.start_time.isoformat(),
+    "last_updated": lambda game_session, room_info, hint_status: game_session.last_updated.isoformat(),
+    "contextual_options": lambda game_session, room_info, hint_status: get_contextual_options(game_session),
+    "hints_remaining": lambda game_session, room_info, hint_status: hint_status.hints_remaining,
+    "remaining_hint_cooldown": lambda game_session, room_info, hint_status: hint_status.remaining_cooldown,
+    "hint_status_display_text": lambda game_session, room_info, hint_status: hint_status.display_text,
+    # Objective text (hardcoded English fallback if not explicitly set in narrative_state)
+    "objective_display_text": lambda game_session, room_info, hint_status: game_session.narrative_state.get("objective") or "Explore and find clues.",
+}
+
+
+def _session_payload(game_session, fields: list[str] = None) -> dict | None:
+    """
+    The session state returned by GET /game_session/<id> (all fields, or only
+    the given ones) and sent first on its events stream. None if the session's
+    theme no longer exists.
+    """
+    if not ROOM_INDEX.theme(game_session.theme):
+        return None
+    current_room_info = ROOM_INDEX.room(game_session.theme, game_session.current_room)
+    hint_status = HintStatus.of(game_session.narrative_state)
+    return {
+        name: SESSION_FIELDS[name](game_session, current_room_info, hint_status)
+        for name in (fields or SESSION_FIELDS)
+    }
+
+
+def _parse_session_fields(fields_arg: str | None) -> tuple[list[str] | None, list[str]]:
+    """
+    Returns (fields, unknown fields) for a fields= argument. id and revision are always included.
+    """
+    if not fields_arg:
+        return None, []
+    requested = [name.strip() for name in fields_arg.split(",") if name.strip()]
+    fields = ["id", "revision"] + sorted(set(requested) - {"id", "revision"})
+    return fields, [name for name in requested if name not in SESSION_FIELDS]
+
+
+def _session_etag(game_session, hint_status: HintStatus, fields: list[str] | None) -> str:
+    # Strong validator of the exact representation: the revision covers every
+    # stored field, the remaining hint cooldown is the one value that changes
+    # with time, and a projection is a different representation.
+    etag = f"s{game_session.id}-r{game_session.revision}"
+    if hint_status.remaining_cooldown:
+        etag += f"-c{hint_status.remaining_cooldown}"
+    if fields:
+        etag += f"-f{zlib.crc32(','.join(fields).encode('utf-8')):08x}"
+    return etag
+
+
 @bp.route("/game_session/<int:session_id>", methods=["GET"])
 def get_session(session_id):
+    """
+    The session state. Optional fields=a,b,... limits the payload to those fields.
+    Responses carry a strong ETag; a matching If-None-Match gets 304 Not Modified
+    without the payload being built.
+    """
+    fields, unknown_fields = _parse_session_fields(request.args.get("fields"))
+    if unknown_fields:
+        return jsonify({"error": f"Unknown fields: {', '.join(unknown_fields)}", "fields": list(SESSION_FIELDS)}), 400
+
     game_session = get_game_session(current_app.session, session_id)
     if not game_session:
         return jsonify({"error": "Game session not found"}), 404
-    
-    contextual_options = get_contextual_options(game_session)
 
-    theme_data = ROOM_DATA.get(game_session.theme)
-    if not theme_data:
-        return jsonify({"error": "Game theme data not found for session"}), 500
+    etag = _session_etag(game_session, HintStatus.of(game_session.narrative_state), fields)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        payload = _session_payload(game_session, fields)
+        if payload is None:
+            return jsonify({"error": "Game theme data not found for session"}), 500
+        response = jsonify(payload)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache" # Browsers revalidate with If-None-Match
+    return response
 
-    current_room_info = theme_data["rooms"].get(game_session.current_room)
-    room_image = None
-    if current_room_info and "image" in current_room_info:
-        room_image = f"/static/images/{current_room_info['image']}"
 
-    # Calculate remaining hint cooldown
-    hints_remaining = game_session.narrative_state.get("hints_remaining", 0)
-    remaining_hint_cooldown = 0
-    last_hint_timestamp_str = game_session.narrative_state.get("last_hint_timestamp")
-    
-    hint_status_display_text = "Click for a hint" # Default status
-
-    if hints_remaining <= 0:
-        hint_status_display_text = "No more hints available."
-    elif last_hint_timestamp_str:
-        last_hint_timestamp = datetime.fromisoformat(last_hint_timestamp_str)
-        time_since_last_hint = datetime.now(timezone.utc) - last_hint_timestamp
-        if time_since_last_hint < timedelta(seconds=HINT_COOLDOWN_SECONDS):
-            remaining_hint_cooldown = int(HINT_COOLDOWN_SECONDS - time_since_last_hint.total_seconds())
-            hint_status_display_text = f"Hint on cooldown ({remaining_cooldown}s)" # Dynamic message
-    
-    # Objective text (hardcoded English fallback if not explicitly set in narrative_state)
-    objective_display_text = game_session.narrative_state.get("objective") or "Explore and find clues."
+@bp.route("/game_session/<int:session_id>/events", methods=["GET"])
+def session_events(session_id):
+    """
+    Server-Sent Events stream of the session: its full state, then compact
+    deltas as actions change it (see services.game_events).
+    """
+    bus = get_event_bus()
+    subscription = bus.subscribe(session_id) # Before reading the state, so no change falls in between
+    game_session = get_game_session(current_app.session, session_id)
+    payload = _session_payload(game_session) if game_session else None
+    if payload is None:
+        bus.unsubscribe(subscription)
+        if not game_session:
+            return jsonify({"error": "Game session not found"}), 404
+        return jsonify({"error": "Game theme data not found for session"}), 500
 
-    return jsonify(
-        {
-            "id": game_session.id,
-            "player_id": game_session.player_id,
-            "current_room": game_session.current_room,
-            "current_room_name": current_room_info.get("name") if current_room_info else game_session.current_room,
-            "current_room_description": game_session.current_room_description or (current_room_info.get("description") if current_room_info else ""),
-            "current_room_image": room_image,
-            "inventory": game_session.inventory,
-            "game_history": game_session.game_history,
-            "narrative_state": game_session.narrative_state,
-            "puzzle_state": game_session.puzzle_state,
-            "theme": game_session.theme,
-            "location": game_session.location, # This 'location' now stores the specific room ID
-            "difficulty": game_session.difficulty,
-            "start_time": game_session.start_time.isoformat(),
-            "last_updated": game_session.last_updated.isoformat(),
-            "contextual_options": contextual_options,
-            "hints_remaining": hints_remaining,
-            "remaining_hint_cooldown": remaining_hint_cooldown,
-            "hint_status_display_text": hint_status_display_text, # Add hardcoded English hint status
-            "objective_display_text": objective_display_text, # Add hardcoded English objective text
-        }
+    return Response(
+        EventStream(bus, subscription, payload),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}, # No proxy buffering of the stream
     )
 
 
@@ -272,12 +352,12 @@ def move_player(session_id):
         return jsonify({"error": "Game session not found"}), 404
     
     theme_id = game_session.theme
-    theme_data = ROOM_DATA.get(theme_id)
+    theme_data = ROOM_INDEX.theme(theme_id)
     if not theme_data:
         return jsonify({"error": "Game theme data not found for session"}), 500
 
     current_room_id = game_session.current_room
-    room_info = theme_data["rooms"].get(current_room_id)
+    room_info = ROOM_INDEX.room(theme_id, current_room_id)
 
     if not room_info:
         return jsonify({"error": "Current room not found in theme data"}), 500
@@ -288,60 +368,24 @@ def move_player(session_id):
         return jsonify({"error": f"Cannot move {direction} from {room_info['name']}."}), 400
     
     # Ensure the new_room_id is within the same theme
-    if new_room_id not in theme_data["rooms"]:
+    new_room_info = ROOM_INDEX.room(theme_id, new_room_id)
+    if new_room_info is None:
         return jsonify({"error": "Cannot move to a room outside the current game's theme."}), 400
 
 
-    # Generate new room description
-    new_room_info = theme_data["rooms"].get(new_room_id)
-    if not new_room_info:
-        return jsonify({"error": "New room not found in theme data"}), 500
-        
-    room_context = {
-        "name": new_room_info.get("name"),
-        "exits": list(new_room_info.get("exits", {}).keys()),
-        "puzzles": list(new_room_info.get("puzzles", {}).keys()),
-        "items": new_room_info.get("items", []),
-    }
-    
-    new_description = generate_room_description(
-        theme=game_session.theme,
-        scenario_name_for_ai_prompt=new_room_info["name"], # Pass the human-readable name of the new room
-        narrative_state=game_session.narrative_state,
-        room_context=room_context,
-        current_room_id=new_room_id,
-    )
-
-    if new_description.startswith("Error:"):
-        # Handle error in description generation, maybe fall back to static description
-        new_description = new_room_info.get("description", "A mysterious room.")
-
-    game_history = list(game_session.game_history)
-    game_history.append(current_room_id) # Append current room to history BEFORE moving
-
-    updated_session = update_game_session(
-        current_app.session,
-        session_id,
-        current_room=new_room_id,
-        current_room_description=new_description,
-        game_history=game_history, # Pass updated game history
-    )
-
+    updated_session = enter_room(current_app.session, session_id, new_room_id, new_room_info)
     if not updated_session:
         return jsonify({"error": "Game session not found after update"}), 500 # Should not happen if game_session was found
 
     # Check for game completion after moving to escape_chamber (theme-specific)
-    theme_escape_chamber_id = f"{theme_id}_escape_chamber"
+    theme_escape_chamber_id = ROOM_INDEX.escape_chamber_id(theme_id)
     if updated_session.current_room == theme_escape_chamber_id:
         # Check if all puzzles before the escape chamber are solved
         # This assumes the 'escape_chamber' has no puzzles itself, and escape is triggered
         # by solving all previous puzzles and entering the final room.
         
-        # Get all puzzle IDs from the current theme's rooms, excluding the escape chamber itself
-        all_puzzle_ids_for_escape = []
-        for r_id, r_info in theme_data["rooms"].items():
-            if r_id != theme_escape_chamber_id:
-                all_puzzle_ids_for_escape.extend(r_info["puzzles"].keys())
+        # Puzzle IDs from the current theme's rooms, excluding the escape chamber itself (precomputed)
+        all_puzzle_ids_for_escape = ROOM_INDEX.puzzles_required_for_escape(theme_id)
         
         all_previous_puzzles_solved = all(
             updated_session.puzzle_state.get(p_id, {}).get("solved", False) for p_id in all_puzzle_ids_for_escape
@@ -498,11 +542,9 @@ def evaluate_puzzle_solution_route():
 
     current_puzzle_description = "Unknown puzzle description."
     
-    theme_data = ROOM_DATA.get(theme)
-    if theme_data:
-        room_info = theme_data["rooms"].get(location) # Use location as room_id
-        if room_info and puzzle_id in room_info.get("puzzles", {}):
-            current_puzzle_description = room_info["puzzles"][puzzle_id]["description"]
+    room_info = ROOM_INDEX.room(theme, location) # Use location as room_id
+    if room_info and puzzle_id in room_info.get("puzzles", {}):
+        current_puzzle_description = room_info["puzzles"][puzzle_id]["description"]
 
     evaluation = evaluate_and_adapt_puzzle(
         puzzle_id=puzzle_id,
@@ -605,45 +647,77 @@ def interact(session_id):
     if not game_session:
         return jsonify({"error": "Game session not found"}), 404
 
-    options = get_contextual_options(game_session)
+    theme_id = game_session.theme
+    theme_data = ROOM_INDEX.theme(theme_id)
+    if not theme_data:
+        return jsonify({"error": "Game theme data not found for session"}), 500
+
+    # Cached per (theme, room, solved puzzles); each entry carries the action to dispatch
+    option_entries = get_contextual_option_entries(game_session)
+    options = [option.label for option in option_entries]
 
-    if not (0 <= selected_option_index < len(options)):
+    if not (0 <= selected_option_index < len(option_entries)):
         return jsonify({"error": "Invalid option index"}), 400
 
-    chosen_option = options[selected_option_index]
+    chosen_option = option_entries[selected_option_index]
     
     result = {"id": game_session.id, "current_room": game_session.current_room, "contextual_options": options}
     status_code = 200
 
-    theme_id = game_session.theme
-    theme_data = ROOM_DATA.get(theme_id)
-    if not theme_data:
-        return jsonify({"error": "Game theme data not found for session"}), 500
+    # This block handles all interaction types
+    is_successful, message, updated_session, ai_evaluation = perform_contextual_option(
+        current_app.session, game_session, chosen_option, player_attempt
+    )
+    
+    if not updated_session:
+        result["error"] = message
+        status_code = 404
+    elif "error" in ai_evaluation: # General AI evaluation error
+        result["error"] = message
+        result["ai_evaluation"] = ai_evaluation
+        status_code = 500
+    else:
+        result["is_successful"] = is_successful
+        result["message"] = message
+        result["ai_evaluation"] = ai_evaluation # Pass AI evaluation to frontend for detailed feedback
+        if ai_evaluation.get("game_over"):
+            result["game_over"] = True
+        if updated_session:
+            result["current_room"] = updated_session.current_room
+            result["current_room_name"] = ROOM_INDEX.room(theme_id, updated_session.current_room).get("name")
+            result["current_room_description"] = updated_session.current_room_description
+            result["contextual_options"] = get_contextual_options(updated_session)
+            result["inventory"] = updated_session.inventory
+            result["narrative_state"] = updated_session.narrative_state
+            result["puzzle_state"] = updated_session.puzzle_state # Ensure puzzle state is updated
+    return jsonify(result), status_code
+
+
+@bp.route("/game_session/<int:session_id>/interact_batch", methods=["POST"])
+def interact_batch(session_id):
+    """
+    Applies several actions in one request and one transaction, e.g. to replay a
+    session or catch up after a reconnect. Body: {"actions": [{"option_index": 3}
+    or {"option": "Look around the room"}, optionally with "player_attempt", ...]}.
+    If any step fails, nothing is applied and the response is 409 with failed_step.
+    """
+    data = request.get_json(silent=True) or {}
+    actions = data.get("actions")
+    if not isinstance(actions, list) or not actions:
+        return jsonify({"error": "A non-empty list of actions is required"}), 400
+    if len(actions) > MAX_BATCH_ACTIONS:
+        return jsonify({"error": f"At most {MAX_BATCH_ACTIONS} actions per batch"}), 400
+    for action in actions:
+        if not isinstance(action, dict) or ("option_index" in action) == ("option" in action):
+            return jsonify({"error": "Each action needs either option_index or option"}), 400
+
+    steps, game_session, failed_step = player_action_batch(current_app.session, session_id, actions)
+    if not game_session:
+        return jsonify({"error": "Game session not found"}), 404
 
-        # This block handles all interaction types
-        is_successful, message, updated_session, ai_evaluation = player_action(
-            current_app.session, session_id, chosen_option, player_attempt
-        )
-        
-        if not updated_session:
-            result["error"] = message
-            status_code = 404
-        elif "error" in ai_evaluation: # General AI evaluation error
-            result["error"] = message
-            result["ai_evaluation"] = ai_evaluation
-            status_code = 500
-        else:
-            result["is_successful"] = is_successful
-            result["message"] = message
-            result["ai_evaluation"] = ai_evaluation # Pass AI evaluation to frontend for detailed feedback
-            if ai_evaluation.get("game_over"):
-                result["game_over"] = True
-            if updated_session:
-                result["current_room"] = updated_session.current_room
-                result["current_room_name"] = theme_data["rooms"].get(updated_session.current_room).get("name")
-                result["current_room_description"] = updated_session.current_room_description
-                result["contextual_options"] = get_contextual_options(updated_session)
-                result["inventory"] = updated_session.inventory
-                result["narrative_state"] = updated_session.narrative_state
-                result["puzzle_state"] = updated_session.puzzle_state # Ensure puzzle state is updated
-    return jsonify(result), status_code
\ No newline at end of file
+    result = {"id": game_session.id, "steps": steps, "state": _session_payload(game_session)}
+    if failed_step is not None:
+        result["error"] = steps[failed_step]["error"]
+        result["failed_step"] = failed_step
+        return jsonify(result), 409
+    return jsonify(result), 200
@@ -0,0 +1,128 @@
+import os
+from abc import ABC, abstractmethod
+import threading
+import logging
+from services.llm_client import DEFAULT_BASE_URL, DEFAULT_MODEL, AsyncLLMClient
+
+# Text-generation backends for ai_service.
+#
+# The provider is the single way ai_service generates text and the single place
+# that decides whether live generation is on: it is resolved from the environment
+# on the first generation call (get_ai_provider). Live generation is opt-in
+# (AI_LIVE_GENERATION=true, plus GEMINI_API_KEY); otherwise the deterministic
+# provider is used and every generator returns its stubbed response. The Gemini
+# provider's transport is the non-blocking client in services.llm_client, so no
+# SDK is imported and calls are bounded by its concurrency limit and deadline.
+
+
+class AIProvider(ABC):
+    """
+    Interface for the text-generation backend used by ai_service.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def is_available(self) -> bool:
+        """
+        Returns True if the backend can serve generate_text calls.
+        Must be cheap: it is checked on every generation call.
+        """
+
+    @abstractmethod
+    def generate_text(self, prompt: str, fallback: str, deadline_seconds: float | None = None) -> str:
+        """
+        Returns the generated text, or fallback if the backend fails or misses the deadline.
+        """
+
+    def close(self) -> None:
+        """
+        Releases the backend's resources (called when the provider is replaced).
+        """
+
+
+class DeterministicProvider(AIProvider):
+    """
+    Provider used when live generation is off or no AI backend is configured.
+    ai_service returns its deterministic/stubbed responses whenever the provider
+    is unavailable.
+    """
+
+    name = "deterministic"
+
+    def is_available(self) -> bool:
+        return False
+
+    def generate_text(self, prompt: str, fallback: str, deadline_seconds: float | None = None) -> str:
+        return fallback
+
+
+class GeminiProvider(AIProvider):
+    """
+    Gemini backend over the REST API, using an AsyncLLMClient as transport.
+    """
+
+    name = "gemini"
+
+    def __init__(self, client: AsyncLLMClient):
+        self.client = client
+
+    def is_available(self) -> bool:
+        return bool(self.client.api_key)
+
+    def generate_text(self, prompt: str, fallback: str, deadline_seconds: float | None = None) -> str:
+        return self.client.generate_sync(prompt, fallback, deadline_seconds)
+
+    def close(self) -> None:
+        self.client.close()
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def _create_default_provider() -> AIProvider:
+    from dotenv import load_dotenv
+
+    load_dotenv(dotenv_path='ai-escape-app/.flaskenv') # Load environment variables from .flaskenv file
+
+    if os.getenv("AI_LIVE_GENERATION", "false").lower() != "true":
+        logging.info("Live AI generation is off (AI_LIVE_GENERATION). All AI functions will return deterministic/stubbed responses.")
+        return DeterministicProvider()
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        logging.warning("GEMINI_API_KEY not found in environment variables. Gemini AI features are disabled.")
+        logging.info("Gemini AI is not available. All AI functions will return deterministic/stubbed responses.")
+        return DeterministicProvider()
+    return GeminiProvider(AsyncLLMClient(
+        api_key=api_key,
+        model=os.getenv("GEMINI_MODEL", DEFAULT_MODEL),
+        base_url=os.getenv("GEMINI_API_BASE_URL", DEFAULT_BASE_URL),
+        max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", 4)),
+        deadline_seconds=float(os.getenv("LLM_DEADLINE_SECONDS", 8.0)),
+        max_retries=int(os.getenv("LLM_MAX_RETRIES", 2)),
+    ))
+
+
+def get_ai_provider() -> AIProvider:
+    """
+    Returns the process-wide AI provider, resolving it from the environment on first use.
+    """
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = _create_default_provider()
+    return _provider
+
+
+def set_ai_provider(provider: AIProvider | None) -> None:
+    """
+    Replaces the process-wide provider (e.g. in tests), closing the previous one.
+    Passing None makes the next get_ai_provider call resolve it from the environment again.
+    """
+    global _provider
+    with _provider_lock:
+        if _provider is not None and _provider is not provider:
+            _provider.close()
+        _provider = provider
@@ -1,30 +1,18 @@
-import os
-import google.generativeai as genai
-from dotenv import load_dotenv
 from data.narrative_archetypes import NARRATIVE_ARCHETYPES
+from data.room_index import ROOM_INDEX
+from services.ai_provider import get_ai_provider
+from services.response_cache import get_response_cache, make_cache_key
+from services.intent_matcher import INTENT_MATCHER
 import json # New import
 import logging # Added for structured logging
 
-# Basic logging configuration
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-
-
-load_dotenv(dotenv_path='ai-escape-app/.flaskenv') # Load environment variables from .flaskenv file
-
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-GEMINI_ENABLED = False # Initialize flag
-
-if not GEMINI_API_KEY:
-    logging.warning("GEMINI_API_KEY not found in environment variables. Gemini AI features are disabled.")
-else:
-    try:
-        genai.configure(api_key=GEMINI_API_KEY)
-        GEMINI_ENABLED = True
-        logging.info("Gemini AI features are enabled.")
-    except Exception as e:
-        logging.error(f"Failed to configure Gemini API with provided key: {e}. Gemini AI features are disabled.")
-        GEMINI_API_KEY = None # Clear key if configuration fails
-        GEMINI_ENABLED = False
+# The AI backend (Gemini or the deterministic fallback) is resolved lazily by
+# services.ai_provider on the first generation call, not when this module is imported;
+# it alone decides whether live generation is on. Each generator passes its
+# deterministic response as the fallback used when the backend is unavailable,
+# fails, or misses the per-call deadline.
+# Live responses are cached by a hash of the generator's inputs (services.response_cache);
+# fallbacks are never cached, so a missed deadline does not pin the stub text.
 
 
 def _sanitize_input(text: str) -> str:
@@ -39,78 +27,160 @@ def _sanitize_input(text: str) -> str:
     return text.replace('{', '{{').replace('}', '}}')
 
 
-# Initialize Gemini Model conditionally
-model = None
-if GEMINI_ENABLED:
+# Story flags that hold for a whole session rather than one room.
+SESSION_STORY_FLAGS = frozenset({"objective"})
+
+
+def room_story_flags(theme: str, room_id: str, narrative_state: dict) -> dict:
+    """
+    Projects narrative_state down to the flags that shape a room's description:
+    the outcomes of the room's own puzzles (ROOM_DATA) and SESSION_STORY_FLAGS.
+    Everything else is left out of the prompt and the cache key: per-session
+    bookkeeping (hints_remaining, the hint cooldown, intro_story, room_narrative)
+    would give every session its own entry, and earlier rooms' outcomes are
+    implied by having reached the room.
+    """
+    allowed = ROOM_INDEX.room_outcome_flags(theme, room_id) | SESSION_STORY_FLAGS
+    narrative_state = narrative_state or {}
+    return {flag: narrative_state[flag] for flag in sorted(allowed) if flag in narrative_state}
+
+
+def live_generation_available() -> bool:
+    """
+    True when the AI provider serves live generation (see services.ai_provider).
+    """
+    return get_ai_provider().is_available()
+
+
+def _generate_text(kind: str, inputs: dict, prompt: str, fallback: str) -> str:
+    """
+    Generates text through the response cache and AI provider, or returns
+    fallback in deterministic mode. `inputs` are the values the prompt is built
+    from; they form the cache key.
+    """
+    if not live_generation_available():
+        return fallback
+    cache = get_response_cache()
+    cache_key = make_cache_key(kind, inputs)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+    text = get_ai_provider().generate_text(prompt, fallback)
+    if text != fallback:
+        cache.set(cache_key, text)
+    return text
+
+
+def _generate_json(kind: str, inputs: dict, prompt: str, fallback: dict) -> dict:
+    """
+    Like _generate_text, for prompts that ask for a JSON object. Falls back if the
+    response is missing or is not a JSON object.
+    """
+    if not live_generation_available():
+        return fallback
+    cache = get_response_cache()
+    cache_key = make_cache_key(kind, inputs)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+    text = get_ai_provider().generate_text(prompt, "").strip()
+    if text.startswith("```"):
+        # Strip a markdown code fence (```json ... ```)
+        text = text.strip("`").removeprefix("json").strip()
     try:
-        model = genai.GenerativeModel('gemini-pro')
-    except Exception as e:
-        logging.error(f"Failed to initialize Gemini GenerativeModel: {e}. Gemini AI features are disabled.")
-        GEMINI_ENABLED = False
-        model = None
-        
-if not GEMINI_ENABLED:
-    logging.info("Gemini AI is not available. All AI functions will return deterministic/stubbed responses.")
+        parsed = json.loads(text)
+    except ValueError:
+        logging.warning("LLM response was not valid JSON; using deterministic fallback.")
+        return fallback
+    if not isinstance(parsed, dict):
+        return fallback
+    cache.set(cache_key, parsed)
+    return parsed
 
 
 def generate_narrative(prompt: str, narrative_archetype: str = None, theme: str = None, location: str = None) -> str:
     """
-    Returns a static narrative for the game.
-    If GEMINI_ENABLED, it would call AI. Otherwise, deterministic.
+    Returns a narrative for the game. Uses the LLM when live generation is enabled,
+    otherwise (or when the call misses its deadline) the static narrative.
     """
-    if GEMINI_ENABLED and model:
-        # Placeholder for actual AI call if it were to be re-enabled
-        # response = model.generate_content(...)
-        # return response.text
-        logging.info("Gemini is enabled but generate_narrative is stubbed for deterministic mode.")
-    logging.info(f"Deterministic: generate_narrative called with prompt: {prompt}")
-    return "You find yourself in a mysterious place. Your adventure begins!" # Static narrative
+    logging.info(f"generate_narrative called with prompt: {prompt}")
+    fallback = "You find yourself in a mysterious place. Your adventure begins!" # Static narrative
+    archetype_text = NARRATIVE_ARCHETYPES.get(narrative_archetype, {}).get("name", "") if narrative_archetype else ""
+    ai_prompt = (
+        f"Write a short, atmospheric escape-room narrative (2-3 sentences).\n"
+        f"Theme: {_sanitize_input(theme)}\nLocation: {_sanitize_input(location)}\n"
+        f"Narrative archetype: {archetype_text}\nPlayer context: {_sanitize_input(prompt)}"
+    )
+    inputs = {"prompt": prompt, "narrative_archetype": narrative_archetype, "theme": theme, "location": location}
+    return _generate_text("narrative", inputs, ai_prompt, fallback)
 
 
 def generate_room_description(theme: str, scenario_name_for_ai_prompt: str, narrative_state: dict, room_context: dict, current_room_id: str, narrative_archetype: str = None) -> str:
     """
-    Returns a static room description based on the provided room_context.
-    NO AI CALLS are made in this function.
+    Returns a room description. Uses the LLM when live generation is enabled,
+    otherwise (or when the call misses its deadline) the static description from room_context.
     """
-    logging.info(f"Deterministic: generate_room_description called for room {current_room_id}")
+    logging.info(f"generate_room_description called for room {current_room_id}")
     # Prioritize description from room_context, fall back to a generic message
-    return room_context.get("description", f"You are in a {scenario_name_for_ai_prompt.lower()} room. It is quite mysterious.")
+    fallback = room_context.get("description", f"You are in a {scenario_name_for_ai_prompt.lower()} room. It is quite mysterious.")
+    story_flags = room_story_flags(theme, current_room_id, narrative_state)
+    ai_prompt = (
+        f"Describe this escape-room location in 2-3 vivid sentences, keeping every listed object.\n"
+        f"Theme: {_sanitize_input(theme)}\nRoom: {_sanitize_input(room_context.get('name', current_room_id))}\n"
+        f"Base description: {_sanitize_input(fallback)}\n"
+        f"Story so far: {_sanitize_input(json.dumps(story_flags, sort_keys=True))}"
+    )
+    inputs = {
+        "theme": theme,
+        "room_id": current_room_id,
+        "room_name": room_context.get("name"),
+        "description": fallback,
+        "story_flags": story_flags,
+    }
+    return _generate_text("room_description", inputs, ai_prompt, fallback)
 
 
 def generate_puzzle(puzzle_type: str, difficulty: str, theme: str, location: str, narrative_archetype: str = None, puzzle_context: dict = None, prerequisites: list = None, outcomes: list = None) -> dict:
     """
-    Returns a static puzzle definition for the game.
-    NO AI CALLS are made in this function.
+    Returns a generated puzzle definition when live generation is enabled.
+    Otherwise (or when the call misses its deadline) returns the deterministic error dict.
     """
-    logging.info(f"Deterministic: generate_puzzle called for type {puzzle_type}, theme {theme}")
+    logging.info(f"generate_puzzle called for type {puzzle_type}, theme {theme}")
     # This function is not currently called directly in the game logic for existing puzzles,
     # but rather for dynamically generating new ones. For deterministic logic, we'll return a generic error.
-    return {"error": "Dynamic puzzle generation is disabled for deterministic mode."}
+    fallback = {"error": "Dynamic puzzle generation is disabled for deterministic mode."}
+    ai_prompt = (
+        "Create an escape-room puzzle. Respond with a JSON object with the keys "
+        "'name', 'description', 'solution' and 'hints'.\n"
+        f"Type: {_sanitize_input(puzzle_type)}\nDifficulty: {_sanitize_input(difficulty)}\n"
+        f"Theme: {_sanitize_input(theme)}\nLocation: {_sanitize_input(location)}\n"
+        f"Context: {_sanitize_input(json.dumps(puzzle_context or {}, sort_keys=True))}\n"
+        f"Prerequisites: {prerequisites or []}\nOutcomes: {outcomes or []}"
+    )
+    inputs = {
+        "puzzle_type": puzzle_type,
+        "difficulty": difficulty,
+        "theme": theme,
+        "location": location,
+        "puzzle_context": puzzle_context or {},
+        "prerequisites": prerequisites or [],
+        "outcomes": outcomes or [],
+    }
+    return _generate_json("puzzle", inputs, ai_prompt, fallback)
 
 
-def _normalize_player_attempt(player_attempt: str) -> str:
+def _normalize_player_attempt(player_attempt: str, theme: str = None, location: str = None) -> str:
     """
     Normalizes player's natural language attempt into a canonical semantic action.
+    Synonym phrases come from ROOM_DATA and are matched in a single pass by the
+    compiled intent matcher; theme/location (room id) restrict matching to that room.
     """
     normalized_attempt = player_attempt.strip().lower()
 
-    # Mappings for ancient_symbol_door_puzzle
-    if any(phrase in normalized_attempt for phrase in ["examine symbol", "inspect symbol", "touch eye", "look at eye"]):
-        return "examine_glowing_symbol"
-    if any(phrase == normalized_attempt for phrase in ["eyetears"]) or \
-       any(phrase in normalized_attempt for phrase in ["input eyetears", "type eyetears", "enter eyetears", "solve door", "solve symbol"]):
-        return "eyetears"
-    
-    # Mappings for desk_puzzle
-    if any(phrase in normalized_attempt for phrase in ["inspect desk", "examine desk", "look at desk"]):
-        return "inspect_desk"
-    if any(phrase == normalized_attempt for phrase in ["7"]) or \
-       any(phrase in normalized_attempt for phrase in ["input 7", "type 7", "enter 7", "open desk"]):
-        return "7"
-
-    # Mappings for final_escape_puzzle
-    if any(phrase in normalized_attempt for phrase in ["escape library", "exit library", "escape"]):
-        return "escape_the_library"
+    scope = (theme, location) if theme and location else None
+    matched_intent = INTENT_MATCHER.match(normalized_attempt, scope)
+    if matched_intent:
+        return matched_intent
     
     # Handle item usage normalization for the 'Use [item] on [target]' actions
     if normalized_attempt.startswith("use "):
@@ -126,6 +196,14 @@ def _normalize_player_attempt(player_attempt: str) -> str:
     return normalized_attempt # Fallback to raw attempt if no specific mapping
 
 
+def normalize_action(player_attempt: str, theme: str = None, location: str = None) -> str:
+    """
+    Returns the canonical semantic action evaluate_and_adapt_puzzle compares
+    against the solution (e.g. for logging attempts).
+    """
+    return _normalize_player_attempt(player_attempt, theme, location)
+
+
 def evaluate_and_adapt_puzzle(
     puzzle_id: str,
     player_attempt: str,
@@ -168,7 +246,7 @@ def evaluate_and_adapt_puzzle(
         return {"is_correct": True, "feedback": f"You have already solved the '{puzzle_definition['name']}' puzzle.", "puzzle_status": "solved"}
 
     # --- Handle "I need a hint" request ---
-    if _normalize_player_attempt(player_attempt) == "i need a hint":
+    if _normalize_player_attempt(player_attempt, theme, location) == "i need a hint":
         hint_message = f"Think about the description: '{current_puzzle_description}'."
         current_step_index = current_puzzle_state.get("current_step_index", 0)
         
@@ -185,7 +263,7 @@ def evaluate_and_adapt_puzzle(
         }
 
     # Normalize player attempt to a canonical semantic action
-    normalized_player_action = _normalize_player_attempt(player_attempt)
+    normalized_player_action = _normalize_player_attempt(player_attempt, theme, location)
     logging.info(f"Normalized player action: '{normalized_player_action}' for puzzle {puzzle_id}")
 
     # --- Unified single-step puzzle logic ---
@@ -258,8 +336,23 @@ def adjust_difficulty_based_on_performance(
     narrative_archetype: str = None,
 ) -> dict:
     """
-    STUB: Adjusts game difficulty based on player performance using the Gemini API.
-    Returns a structured dictionary with difficulty adjustment suggestions.
+    Adjusts game difficulty based on player performance, using the LLM when live
+    generation is enabled. Returns a structured dictionary with difficulty adjustment suggestions.
     """
-    logging.info(f"STUB: adjust_difficulty_based_on_performance called with puzzle_state {puzzle_state}")
-    return {"difficulty_adjustment": "none", "reason": "STUB: No adjustment.", "suggested_puzzle_parameters": {}}
\ No newline at end of file
+    logging.info(f"adjust_difficulty_based_on_performance called with puzzle_state {puzzle_state}")
+    fallback = {"difficulty_adjustment": "none", "reason": "STUB: No adjustment.", "suggested_puzzle_parameters": {}}
+    ai_prompt = (
+        "Given the player's puzzle performance, suggest a difficulty adjustment. Respond with a "
+        "JSON object with the keys 'difficulty_adjustment' ('easier', 'harder' or 'none'), "
+        "'reason' and 'suggested_puzzle_parameters'.\n"
+        f"Theme: {_sanitize_input(theme)}\nLocation: {_sanitize_input(location)}\n"
+        f"Overall difficulty: {_sanitize_input(overall_difficulty)}\n"
+        f"Puzzle state: {_sanitize_input(json.dumps(puzzle_state or {}, sort_keys=True, default=str))}"
+    )
+    inputs = {
+        "puzzle_state": puzzle_state or {},
+        "theme": theme,
+        "location": location,
+        "overall_difficulty": overall_difficulty,
+    }
+    return _generate_json("difficulty_adjustment", inputs, ai_prompt, fallback)
\ No newline at end of file
@@ -0,0 +1,172 @@
+import json
+import queue
+import threading
+import time
+from collections import defaultdict
+
+from services.hint_status import HintStatus
+
+# Per-session stream of compact game state changes, served as Server-Sent Events.
+#
+# game_logic publishes a list of events after each committed change, but only
+# while someone is subscribed to that session. GET /game_session/<id>/events
+# subscribes, sends the full session state once ("state") and then forwards
+# the events:
+#   room_changed        -- current_room, name, description and image
+#   inventory_changed   -- items added and removed
+#   puzzle_solved       -- ids of the newly solved puzzles
+#   options_changed     -- the new contextual options
+#   hint_status_changed -- hint fields of the session payload, plus hint_cooldown_until
+#   hint_cooldown_ended -- sent by the stream itself when the cooldown runs out
+#   state_reset         -- the subscriber fell behind; reconnect for a fresh state
+# Subscriptions live in this process, so the stream and the actions of a
+# session must be served by the same process (as with write_behind sessions).
+
+SUBSCRIBER_QUEUE_SIZE = 256
+KEEPALIVE_SECONDS = 15.0
+RETRY_MILLISECONDS = 3000
+
+
+def format_sse(event_type: str, data: dict, event_id: int = None) -> str:
+    """
+    Encodes one Server-Sent Event.
+    """
+    lines = [f"event: {event_type}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+class Subscription:
+    __slots__ = ("session_id", "queue")
+
+    def __init__(self, session_id: int, max_queued: int):
+        self.session_id = session_id
+        self.queue = queue.Queue(maxsize=max_queued)
+
+
+class GameEventBus:
+    """
+    In-process publish/subscribe of game events, keyed by session id.
+    """
+
+    def __init__(self, max_queued: int = SUBSCRIBER_QUEUE_SIZE):
+        self.max_queued = max_queued
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def subscribe(self, session_id: int) -> Subscription:
+        subscription = Subscription(session_id, self.max_queued)
+        with self._lock:
+            self._subscriptions[session_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.session_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.session_id]
+
+    def has_subscribers(self, session_id: int) -> bool:
+        return session_id in self._subscriptions # Unlocked read: a stale answer only skips or builds one delta
+
+    def publish(self, session_id: int, events: list[dict]) -> None:
+        """
+        Queues events for every subscriber of session_id. A subscriber whose
+        queue is full is sent state_reset instead, so it resynchronizes.
+        """
+        if not events:
+            return
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(session_id, ()))
+            numbered = []
+            for event in events:
+                self._next_id += 1
+                numbered.append((self._next_id, event))
+        for subscription in subscriptions:
+            try:
+                for item in numbered:
+                    subscription.queue.put_nowait(item)
+            except queue.Full:
+                with subscription.queue.mutex:
+                    subscription.queue.queue.clear()
+                subscription.queue.put_nowait((None, {"type": "state_reset"}))
+
+
+class EventStream:
+    """
+    The response body of the events endpoint: the initial state, then the
+    subscription's events, keepalive comments and hint_cooldown_ended.
+    Closing it (the server does when the client disconnects) unsubscribes.
+    """
+
+    def __init__(self, bus: GameEventBus, subscription: Subscription, state: dict,
+                 keepalive_seconds: float = KEEPALIVE_SECONDS):
+        self.bus = bus
+        self.subscription = subscription
+        self.state = state
+        self.keepalive_seconds = keepalive_seconds
+        self.hints_remaining = state.get("hints_remaining", 0)
+        remaining_cooldown = state.get("remaining_hint_cooldown") or 0
+        self.hint_cooldown_until = time.time() + remaining_cooldown if remaining_cooldown else None
+        self._closed = False
+
+    def __iter__(self):
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        yield format_sse("state", self.state)
+        while not self._closed:
+            timeout = self.keepalive_seconds
+            if self.hint_cooldown_until is not None:
+                timeout = max(0.0, min(timeout, self.hint_cooldown_until - time.time()))
+            try:
+                event_id, event = self.subscription.queue.get(timeout=timeout)
+            except queue.Empty:
+                if self.hint_cooldown_until is not None and time.time() >= self.hint_cooldown_until:
+                    self.hint_cooldown_until = None
+                    yield format_sse("hint_cooldown_ended", HintStatus(self.hints_remaining, 0).to_dict())
+                else:
+                    yield ": keepalive\n\n"
+                continue
+
+            event_type = event["type"]
+            data = {key: value for key, value in event.items() if key != "type"}
+            if event_type == "hint_status_changed":
+                self.hints_remaining = event.get("hints_remaining", self.hints_remaining)
+                cooldown_until = event.get("hint_cooldown_until") or 0
+                self.hint_cooldown_until = cooldown_until if cooldown_until > time.time() else None
+            yield format_sse(event_type, data, event_id)
+            if event_type == "state_reset":
+                return
+
+    def close(self) -> None:
+        self._closed = True
+        self.bus.unsubscribe(self.subscription)
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_event_bus() -> GameEventBus:
+    """
+    Returns the process-wide game event bus.
+    """
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                _bus = GameEventBus()
+    return _bus
+
+
+def set_event_bus(bus: GameEventBus | None) -> None:
+    """
+    Replaces the process-wide bus (e.g. in tests).
+    """
+    global _bus
+    with _bus_lock:
+        _bus = bus
@@ -1,10 +1,135 @@
+import base64
+import binascii
+import copy
+import json
 import logging
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone
+from functools import lru_cache, wraps
+from typing import NamedTuple
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 from sqlalchemy.orm.attributes import flag_modified # New import
-from models import GameSession, SavedGame
-from data.rooms import ROOM_DATA, PUZZLE_SOLUTIONS
-from services.ai_service import evaluate_and_adapt_puzzle
+from models import GameSession, SavedGame, PuzzleAttempt
+from data.room_index import ROOM_INDEX
+from services.ai_service import evaluate_and_adapt_puzzle, normalize_action
+from services.unit_of_work import ActionUnitOfWork
+from services.pregeneration import get_pregeneration_worker
+from services.session_cache import get_session_cache
+from services.hint_status import HINT_COOLDOWN_KEY, HintStatus, use_hint
+from services.game_events import get_event_bus
+from services.save_delta import apply_delta, diff_state, encoded_size
+
+# Every Nth save of a session stores the full state; the saves in between store
+# only a delta against the previous save, so loading replays at most N-1 deltas.
+SAVE_KEYFRAME_INTERVAL = 10
+
+# Default and maximum page sizes of the saved games listing
+SAVED_GAMES_PAGE_SIZE = 50
+SAVED_GAMES_MAX_PAGE_SIZE = 200
+
+# Most actions accepted by one player_action_batch call
+MAX_BATCH_ACTIONS = 200
+
+
+def _session_serialized(func):
+    """
+    Runs a read-modify-commit service function holding the session cache's lock
+    for its session (the second argument, a session id or GameSession). In
+    write_behind mode concurrent requests share one cached GameSession and would
+    otherwise interleave their changes to it.
+    """
+    @wraps(func)
+    def wrapper(db_session, session, *args, **kwargs):
+        session_id = session.id if isinstance(session, GameSession) else session
+        with get_session_cache().session_lock(db_session, session_id):
+            return func(db_session, session, *args, **kwargs)
+    return wrapper
+
+
+def schedule_next_room_pregeneration(game_session: GameSession) -> None:
+    """
+    Starts warming AI content for the room after the session's current room.
+    """
+    room_info = ROOM_INDEX.room(game_session.theme, game_session.current_room)
+    if room_info:
+        get_pregeneration_worker().schedule(
+            game_session.id, game_session.theme, room_info.get("next_room_id"), game_session.narrative_state
+        )
+
+
+def _entered_room_content(session_id: int, room_id: str, room_info: dict) -> tuple[str, dict]:
+    """
+    Returns (description, narrative flags) for a room being entered. Uses
+    pregenerated content when it is ready; otherwise the static description, without waiting.
+    """
+    pregenerated = get_pregeneration_worker().take(session_id, room_id)
+    if pregenerated is None:
+        return room_info.get("description", "A mysterious room you find yourself in."), {}
+    return pregenerated.description, {"room_narrative": pregenerated.narrative}
+
+
+def room_image_url(room_info: dict | None) -> str | None:
+    if room_info and "image" in room_info:
+        return f"/static/images/{room_info['image']}"
+    return None
+
+
+def _watched_state(game_session: GameSession) -> dict | None:
+    """
+    The parts of a session that the events stream reports changes to, or None
+    when nobody is subscribed to the session (so nothing is captured or published).
+    """
+    if not get_event_bus().has_subscribers(game_session.id):
+        return None
+    narrative_state = game_session.narrative_state or {}
+    return {
+        "room": game_session.current_room,
+        "description": game_session.current_room_description,
+        "inventory": list(game_session.inventory or []),
+        "solved": {puzzle_id for puzzle_id, state in (game_session.puzzle_state or {}).items() if state.get("solved")},
+        "hints": (narrative_state.get("hints_remaining"), narrative_state.get(HINT_COOLDOWN_KEY)),
+    }
+
+
+def publish_session_changes(game_session: GameSession, before: dict | None) -> None:
+    """
+    Publishes compact events for what changed since before (from _watched_state)
+    to the session's events stream.
+    """
+    if before is None:
+        return
+    after = _watched_state(game_session)
+    if after is None:
+        return
+
+    events = []
+    if after["room"] != before["room"] or after["description"] != before["description"]:
+        room_info = ROOM_INDEX.room(game_session.theme, game_session.current_room)
+        events.append({
+            "type": "room_changed",
+            "current_room": game_session.current_room,
+            "current_room_name": room_info.get("name") if room_info else game_session.current_room,
+            "current_room_description": game_session.current_room_description,
+            "current_room_image": room_image_url(room_info),
+        })
+    if after["inventory"] != before["inventory"]:
+        events.append({
+            "type": "inventory_changed",
+            "added": [item for item in after["inventory"] if item not in before["inventory"]],
+            "removed": [item for item in before["inventory"] if item not in after["inventory"]],
+        })
+    newly_solved = after["solved"] - before["solved"]
+    if newly_solved:
+        events.append({"type": "puzzle_solved", "puzzle_ids": sorted(newly_solved)})
+    if after["room"] != before["room"] or after["solved"] != before["solved"]:
+        events.append({"type": "options_changed", "contextual_options": get_contextual_options(game_session)})
+    if after["hints"] != before["hints"]:
+        events.append({
+            "type": "hint_status_changed",
+            **HintStatus.of(game_session.narrative_state).to_dict(),
+            "hint_cooldown_until": after["hints"][1],
+        })
+    get_event_bus().publish(game_session.id, events)
 
 
 def create_game_session(
@@ -21,21 +146,21 @@ def create_game_session(
     print(f"create_game_session received - theme: {theme}, location: {location}")
     
     selected_theme_id = theme
-    if selected_theme_id not in ROOM_DATA:
+    theme_data = ROOM_INDEX.theme(selected_theme_id)
+    if theme_data is None:
         # User-provided theme is invalid
         return None, f"Invalid theme '{selected_theme_id}'. Please choose a valid theme."
 
-    theme_data = ROOM_DATA.get(selected_theme_id)
     # This check should now always be true due to the above validation, but keeping for safety.
     if not theme_data:
         return None, "Error: Theme data not found after validation."
 
     first_room_id = location
-    if first_room_id not in theme_data["rooms"]:
+    room_info = ROOM_INDEX.room(selected_theme_id, first_room_id)
+    if room_info is None:
         # User-provided location for the theme is invalid
         return None, f"Invalid starting location '{first_room_id}' for theme '{selected_theme_id}'. Please choose a valid room for this theme."
     
-    room_info = theme_data["rooms"].get(first_room_id)
     if not room_info:
         return None, "Error: Room info not found after validation."
 
@@ -54,7 +179,7 @@ def create_game_session(
     initial_narrative_state = {
         "intro_story": theme_data.get("intro_story", ""),
         "hints_remaining": hints_budget, # Store hints_remaining in narrative_state
-        "last_hint_timestamp": None, # Store last_hint_timestamp in narrative_state
+        HINT_COOLDOWN_KEY: 0, # Epoch second the next hint becomes available (see services.hint_status)
     }
     # Potentially add other initial narrative state items based on game start
 
@@ -73,23 +198,27 @@ def create_game_session(
     db_session.add(new_session)
     db_session.commit()
     db_session.refresh(new_session)
+    schedule_next_room_pregeneration(new_session)
     return new_session, None
 
 def get_game_session(db_session: Session, session_id: int) -> GameSession | None:
     """
-    Retrieves a GameSession by its ID.
+    Retrieves a GameSession by its ID (from the session cache in write_behind mode).
     """
-    return db_session.query(GameSession).filter(GameSession.id == session_id).first()
+    return get_session_cache().get(db_session, session_id)
 
 
+@_session_serialized
 def update_game_session(
     db_session: Session, session_id: int, **kwargs
 ) -> GameSession | None:
     """
-    Updates an existing GameSession with the given keyword arguments.
+    Updates an existing GameSession with the given keyword arguments and commits.
+    A room change is written back immediately even in write_behind mode.
     """
     game_session = get_game_session(db_session, session_id)
     if game_session:
+        before = _watched_state(game_session)
         for key, value in kwargs.items():
             if hasattr(game_session, key):
                 if key == "inventory":
@@ -108,22 +237,62 @@ def update_game_session(
                     setattr(game_session, key, value)
 
         game_session.last_updated = datetime.now(timezone.utc)
+        get_session_cache().commit(db_session, game_session, checkpoint="current_room" in kwargs)
+        publish_session_changes(game_session, before)
 
     return game_session
 
 
+@_session_serialized
+def enter_room(db_session: Session, session_id: int, room_id: str, room_info: dict) -> GameSession | None:
+    """
+    Moves the session into room_id, recording the room it leaves in game_history.
+    The room gets its pregenerated description and narrative if they are ready,
+    otherwise its static description without waiting (see _entered_room_content),
+    and pregeneration of the room after it is scheduled.
+    """
+    game_session = get_game_session(db_session, session_id)
+    if not game_session:
+        return None
+    new_description, narrative_flags = _entered_room_content(session_id, room_id, room_info)
+    updates = {}
+    if narrative_flags:
+        updates["narrative_state"] = {**game_session.narrative_state, **narrative_flags}
+
+    updated_session = update_game_session(
+        db_session,
+        session_id,
+        current_room=room_id,
+        current_room_description=new_description,
+        game_history=[*game_session.game_history, game_session.current_room],
+        **updates,
+    )
+    if updated_session:
+        schedule_next_room_pregeneration(updated_session)
+    return updated_session
+
+
+@_session_serialized
 def delete_game_session(db_session: Session, session_id: int) -> bool:
     """
     Deletes a GameSession by its ID.
     """
-    game_session = get_game_session(db_session, session_id)
+    get_session_cache().discard(db_session, session_id) # Its pending changes are moot
+    game_session = db_session.query(GameSession).filter(GameSession.id == session_id).first()
     if game_session:
+        # Its attempts and saves reference it, and SQLite enforces foreign keys
+        # (Config.SQLITE_FOREIGN_KEYS), so they go first. Save chains never
+        # cross sessions, so one statement removes a whole chain.
+        db_session.query(PuzzleAttempt).filter(PuzzleAttempt.session_id == session_id).delete(synchronize_session=False)
+        db_session.query(SavedGame).filter(SavedGame.session_id == session_id).delete(synchronize_session=False)
+        db_session.expire(game_session, ["saved_games"]) # Nothing left to nullify
         db_session.delete(game_session)
         db_session.commit()
         return True
     return False
 
 
+@_session_serialized
 def update_player_inventory(
     db_session: Session, session_id: int, item: str, action: str
 ) -> GameSession | None:
@@ -135,6 +304,7 @@ def update_player_inventory(
     if not game_session:
         return None
 
+    before = _watched_state(game_session)
     inventory = list(game_session.inventory)  # Create a mutable copy
 
     if action == "add":
@@ -150,11 +320,12 @@ def update_player_inventory(
     game_session.inventory = inventory  # Reassign the modified list
     flag_modified(game_session, "inventory") # Explicitly flag the JSON field as modified
     game_session.last_updated = datetime.now(timezone.utc)
-    db_session.commit()
-    db_session.refresh(game_session)
+    get_session_cache().commit(db_session, game_session)
+    publish_session_changes(game_session, before)
     return game_session
 
 
+@_session_serialized
 def solve_puzzle(
     db_session: Session, session_id: int, puzzle_id: str, player_attempt: str = ""
 ) -> tuple[bool, str, GameSession | None, dict]:
@@ -166,15 +337,16 @@ def solve_puzzle(
     game_session = get_game_session(db_session, session_id)
     if not game_session:
         return False, "Game session not found.", None, {"error": "Game session not found."}
+    before = _watched_state(game_session)
 
     current_room_id = game_session.current_room
     theme_id = game_session.theme
     
-    theme_data = ROOM_DATA.get(theme_id)
+    theme_data = ROOM_INDEX.theme(theme_id)
     if not theme_data:
         return False, "Game theme data not found.", game_session, {"error": "Game theme data not found."}
 
-    room_info = theme_data["rooms"].get(current_room_id)
+    room_info = ROOM_INDEX.room(theme_id, current_room_id)
 
     if not room_info or puzzle_id not in room_info["puzzles"]:
         return False, "Puzzle not found in current room.", game_session, {"error": "Puzzle not found."}
@@ -195,8 +367,8 @@ def solve_puzzle(
         message = puzzle_definition.get("description", "A mysterious puzzle.")
         if current_puzzle_session_state.get("next_step_description"):
             message += f"\n{current_puzzle_session_state['next_step_description']}"
-        elif current_puzzle_session_state.get("ai_feedback"):
-            message += f"\nAI Hint: {current_puzzle_session_state['ai_feedback'].get('hint', '')}"
+        elif current_puzzle_session_state.get("last_hint"):
+            message += f"\nAI Hint: {current_puzzle_session_state['last_hint']}"
         
         # This is not a solve attempt, so return its current state
         return False, message, game_session, {"action_type": "inspect_puzzle", "status": current_puzzle_session_state.get("status", "unsolved")}
@@ -249,20 +421,24 @@ def solve_puzzle(
     new_puzzle_state_from_ai = ai_evaluation_response.get("new_puzzle_state")
     items_found = ai_evaluation_response.get("items_found", [])
     items_consumed = ai_evaluation_response.get("items_consumed", [])
-    
-    # Preserve original game_session for reference if it changes during transition
-    original_game_session = game_session 
+
+    # Every change from this attempt is collected here and written in one commit
+    unit_of_work = ActionUnitOfWork(db_session, game_session)
 
     # Initialize game_state_changes (Fix for NameError)
     game_state_changes = {} 
 
-    # --- Update puzzle_state with AI evaluation details ---
+    # --- Update puzzle_state counters; the attempt itself goes to the puzzle_attempts log ---
     new_puzzle_session_state = current_puzzle_session_state.copy() 
     
     # Always increment attempts for a solve attempt
     new_puzzle_session_state["attempts"] = new_puzzle_session_state.get("attempts", 0) + 1
-    new_puzzle_session_state["last_attempt"] = player_attempt
-    new_puzzle_session_state["ai_feedback"] = ai_evaluation_response # Store full AI feedback
+    unit_of_work.record_attempt(
+        puzzle_id,
+        normalize_action(player_attempt, game_session.theme, current_room_id),
+        is_correct,
+        bool(hint_message),
+    )
     
     if is_correct:
         new_puzzle_session_state["solved"] = True
@@ -277,25 +453,16 @@ def solve_puzzle(
     if new_puzzle_state_from_ai:
         new_puzzle_session_state.update(new_puzzle_state_from_ai)
 
-    game_session.puzzle_state[puzzle_id] = new_puzzle_session_state
-    flag_modified(game_session, "puzzle_state") # Explicitly flag the JSON field as modified
-
-    # Final commit after all changes in solve_puzzle are applied
-    db_session.add(game_session) # Add the potentially new game_session object to session
-    db_session.commit()
-    # No explicit refresh here, as game_session should already be the latest state from update_game_session
+    unit_of_work.set_puzzle_state(puzzle_id, new_puzzle_session_state)
 
     # --- Apply Game State Changes based on puzzle outcomes ---
     if is_correct:
         # Apply outcomes defined in ROOM_DATA for the solved puzzle
-        for outcome in puzzle_definition.get("outcomes", []):
-            game_session.narrative_state[outcome] = True # Set outcome flag in narrative_state
+        unit_of_work.set_narrative_flags({outcome: True for outcome in puzzle_definition.get("outcomes", [])})
         
         # Add items revealed on solve
         for item_to_reveal in puzzle_definition.get("reveal_on_solve", []):
-            update_player_inventory(db_session, session_id, item_to_reveal, "add")
-            # Re-fetch session to ensure inventory is updated for further logic
-            db_session.refresh(game_session)
+            unit_of_work.add_item(item_to_reveal)
 
         # Apply specific triggers (can be used for dynamic room description changes, unlocking exits, etc.)
         if puzzle_definition.get("triggers_event") == "unlock_door_exit":
@@ -307,65 +474,29 @@ def solve_puzzle(
         if puzzle_id == "ancient_symbol_door_puzzle" or puzzle_id == "silent_word_puzzle":
             next_room_id = room_info.get("next_room_id")
             if next_room_id:
-                next_room_info = theme_data["rooms"].get(next_room_id)
+                next_room_info = ROOM_INDEX.room(theme_id, next_room_id)
                 if next_room_info:
-                    new_room_description = next_room_info.get(
-                        "description", "A mysterious room."
-                    )
-
-                    updated_session_after_move = update_game_session(
-                        db_session,
-                        session_id,
-                        current_room=next_room_id,
-                        current_room_description=new_room_description,
-                        game_history=list(original_game_session.game_history)
-                        + [original_game_session.current_room],
+                    next_room_description, next_room_flags = _entered_room_content(session_id, next_room_id, next_room_info)
+                    unit_of_work.move_to(next_room_id, next_room_description)
+                    unit_of_work.set_narrative_flags(next_room_flags)
+                else:
+                    feedback_message += (
+                        "\nFailed to transition to the next room automatically."
                     )
 
-                    if updated_session_after_move:
-                        # Apply room change to the tracked game_session object
-                        game_session.current_room = updated_session_after_move.current_room
-                        flag_modified(game_session, "current_room")
-
-                        game_session.current_room_description = (
-                            updated_session_after_move.current_room_description
-                        )
-
-                        game_session.game_history = updated_session_after_move.game_history
-                        flag_modified(game_session, "game_history")
-
-                        # ✅ Persist room transition
-                        db_session.add(game_session)
-                        db_session.commit()
-
-                    else:
-                        feedback_message += (
-                            "\nFailed to transition to the next room automatically."
-                        )
-
-    # The remaining state changes (items_found, items_consumed, game_state_changes) happen after the conditional is_correct block
-    if items_found:
-        for item in items_found:
-            update_player_inventory(db_session, session_id, item, "add")
-            db_session.refresh(game_session)
+    # The remaining state changes (items_found, items_consumed) happen after the conditional is_correct block
+    for item in items_found:
+        unit_of_work.add_item(item)
 
-    if items_consumed:
-        for item in items_consumed:
-            update_player_inventory(db_session, session_id, item, "remove")
-            db_session.refresh(game_session)
-
-    if game_state_changes:
-        current_narrative_state = game_session.narrative_state.copy()
-        current_narrative_state.update(game_state_changes)
-        game_session.narrative_state = current_narrative_state
-        flag_modified(game_session, "narrative_state")
+    for item in items_consumed:
+        unit_of_work.remove_item(item)
 
     # --- After successful puzzle solve, check for room completion ---
     if is_correct:
         all_room_puzzles = room_info["puzzles"]
         all_puzzles_in_room_solved = True
         for p_id_in_room in all_room_puzzles:
-            if not game_session.puzzle_state.get(p_id_in_room, {}).get("solved", False):
+            if not unit_of_work.puzzle_state.get(p_id_in_room, {}).get("solved", False):
                 all_puzzles_in_room_solved = False
                 break
         
@@ -380,6 +511,13 @@ def solve_puzzle(
                 feedback_message += "\n\nCongratulations! You have successfully escaped and won the game!"
                 logging.info(f"Game won! Session {session_id}")
 
+    # Single commit (and single UPDATE of the game_sessions row) for the whole attempt.
+    # A completed room (and so a win) is written back at once, like a room change.
+    unit_of_work.commit(checkpoint=game_state_changes.get("current_room_completed", False))
+    publish_session_changes(game_session, before)
+    if game_session.current_room != current_room_id:
+        schedule_next_room_pregeneration(game_session)
+
     # Return structure: (is_solved: bool, message: str, updated_game_session: GameSession | None, ai_evaluation: dict)
     # Ensure game_state_changes (like game_over, room_completed) are in the returned ai_evaluation_response
     ai_evaluation_response["game_state_changes"] = {**ai_evaluation_response.get("game_state_changes", {}), **game_state_changes}
@@ -391,43 +529,89 @@ def solve_puzzle(
     return is_correct, feedback_message, game_session, ai_evaluation_response
 
 
-def get_contextual_options(game_session: GameSession) -> list[str]:
+class ContextualOption(NamedTuple):
     """
-    Dynamically generates a list of possible interactions based on the current room and game state.
+    One entry of the contextual options menu and the action it dispatches to.
+    action_type is "interact" (target = action label), "solve" (target = puzzle_id)
+    or "move" (target = room_id).
     """
-    options = []
-    current_room_id = game_session.current_room
-    theme_id = game_session.theme
-    
-    theme_data = ROOM_DATA.get(theme_id)
-    if not theme_data:
-        return ["Error: Game theme data not found."]
+    label: str
+    action_type: str
+    target: str
 
-    room_info = theme_data["rooms"].get(current_room_id)
-    if not room_info:
-        return ["Error: Room data not found in current theme."]
+
+def _solved_puzzle_mask(game_session: GameSession, room_info: dict) -> int:
+    """
+    Packs the solved flags of the room's puzzles (in ROOM_DATA order) into a bitmask.
+    """
+    mask = 0
+    puzzle_state = game_session.puzzle_state or {}
+    for bit, puzzle_id in enumerate(room_info.get("puzzles", {})):
+        if puzzle_state.get(puzzle_id, {}).get("solved", False):
+            mask |= 1 << bit
+    return mask
+
+
+@lru_cache(maxsize=256)
+def _build_contextual_options(theme_id: str, room_id: str, solved_mask: int) -> tuple[ContextualOption, ...]:
+    """
+    Builds the sorted, de-duplicated options for a room. The result only depends on
+    the theme, the room and which of its puzzles are solved, so it is memoized.
+    """
+    room_info = ROOM_INDEX.room(theme_id, room_id)
+    options = {}
 
     # Add actions from interactables
     for interactable_id, interactable_data in room_info.get("interactables", {}).items():
         for action in interactable_data.get("actions", []):
-            options.append(action["label"])
+            options.setdefault(action["label"], ContextualOption(action["label"], "interact", action["label"]))
 
     # Add puzzle solving option
-    for puzzle_id, puzzle_definition in room_info.get("puzzles", {}).items():
-        if not game_session.puzzle_state.get(puzzle_id, {}).get("solved", False):
-            options.append(f"Solve {puzzle_definition.get('name', 'Unknown Puzzle')}")
+    for bit, (puzzle_id, puzzle_definition) in enumerate(room_info.get("puzzles", {}).items()):
+        if not solved_mask & (1 << bit):
+            label = f"Solve {puzzle_definition.get('name', 'Unknown Puzzle')}"
+            options.setdefault(label, ContextualOption(label, "solve", puzzle_id))
 
-    # Add room transition option if main puzzle is solved
-    main_puzzle_id = next(iter(room_info.get("puzzles", {})), None)
-    if main_puzzle_id and game_session.puzzle_state.get(main_puzzle_id, {}).get("solved", False):
+    # Add room transition option if main puzzle (bit 0) is solved
+    if room_info.get("puzzles") and solved_mask & 1:
         next_room_in_sequence = room_info.get("next_room_id")
         if next_room_in_sequence:
-            next_room_info = theme_data["rooms"].get(next_room_in_sequence)
+            next_room_info = ROOM_INDEX.room(theme_id, next_room_in_sequence)
             if next_room_info:
-                options.append(f"Go to {next_room_info['name']}")
-    
-    unique_options = sorted(list(set(options)))
-    return unique_options
+                label = f"Go to {next_room_info['name']}"
+                options.setdefault(label, ContextualOption(label, "move", next_room_in_sequence))
+
+    return tuple(options[label] for label in sorted(options))
+
+
+def get_contextual_option_entries(game_session: GameSession) -> tuple[ContextualOption, ...]:
+    """
+    Returns the contextual options for the session's current room together with the
+    action each one dispatches to, in the same order as get_contextual_options.
+    Returns an empty tuple if the theme or room is unknown.
+    """
+    theme_id = game_session.theme
+    current_room_id = game_session.current_room
+    room_info = ROOM_INDEX.room(theme_id, current_room_id)
+    if not room_info:
+        return ()
+    return _build_contextual_options(theme_id, current_room_id, _solved_puzzle_mask(game_session, room_info))
+
+
+def get_contextual_options(game_session: GameSession) -> list[str]:
+    """
+    Dynamically generates a list of possible interactions based on the current room and game state.
+    """
+    theme_id = game_session.theme
+
+    theme_data = ROOM_INDEX.theme(theme_id)
+    if not theme_data:
+        return ["Error: Game theme data not found."]
+
+    if not ROOM_INDEX.room(theme_id, game_session.current_room):
+        return ["Error: Room data not found in current theme."]
+
+    return [option.label for option in get_contextual_option_entries(game_session)]
 
 def verify_puzzle_solvability(puzzles: list[dict]) -> tuple[bool, str]:
     """
@@ -477,13 +661,17 @@ def verify_puzzle_solvability(puzzles: list[dict]) -> tuple[bool, str]:
 
     return True, "Puzzle chain appears solvable based on prerequisites and outcomes."
 
+@_session_serialized
 def save_game_state(db_session: Session, session_id: int, save_name: str, saved_at: datetime = None) -> SavedGame | None:
     """
-    Saves the current state of a game session to the SavedGame table.
+    Saves the current state of a game session to the SavedGame table, as a delta
+    against the session's previous save or, every SAVE_KEYFRAME_INTERVAL saves
+    (or when the delta would not be smaller), as a full keyframe.
     """
     game_session = get_game_session(db_session, session_id)
     if not game_session:
         return None
+    get_session_cache().flush_session(db_session, session_id) # The live row matches what is saved
 
     game_state_dict = game_session.to_dict()
 
@@ -491,9 +679,31 @@ def save_game_state(db_session: Session, session_id: int, save_name: str, saved_
         player_id=game_session.player_id,
         session_id=session_id,
         save_name=save_name,
-        game_state=game_state_dict,
         saved_at=saved_at if saved_at else datetime.now(timezone.utc),
+        summary=build_save_summary(game_state_dict),
+    )
+
+    previous_save = (
+        db_session.query(SavedGame)
+        .filter(SavedGame.session_id == session_id)
+        .order_by(SavedGame.id.desc())
+        .first()
     )
+    delta = None
+    if previous_save is not None and (previous_save.keyframe_distance or 0) + 1 < SAVE_KEYFRAME_INTERVAL:
+        previous_state = get_saved_game_state(db_session, previous_save)
+        if previous_state is not None:
+            delta = diff_state(previous_state, game_state_dict)
+            if encoded_size(delta) >= encoded_size(game_state_dict):
+                delta = None
+
+    if delta is None:
+        new_saved_game.game_state = game_state_dict
+        new_saved_game.keyframe_distance = 0
+    else:
+        new_saved_game.base_save_id = previous_save.id
+        new_saved_game.state_delta = delta
+        new_saved_game.keyframe_distance = (previous_save.keyframe_distance or 0) + 1
 
     db_session.add(new_saved_game)
     db_session.commit()
@@ -501,6 +711,43 @@ def save_game_state(db_session: Session, session_id: int, save_name: str, saved_
     return new_saved_game
 
 
+def get_saved_game_state(db_session: Session, saved_game: SavedGame) -> dict | None:
+    """
+    Rebuilds the full game state of a save by replaying the deltas since its keyframe.
+    Returns a new dict, or None if the chain is broken.
+    """
+    deltas = []
+    current = saved_game
+    while current.base_save_id is not None:
+        deltas.append(current.state_delta or [])
+        current = db_session.get(SavedGame, current.base_save_id)
+        if current is None:
+            logging.error(f"Saved game {saved_game.id} has a missing base save; cannot rebuild its state.")
+            return None
+
+    state = current.game_state or {}
+    for delta in reversed(deltas):
+        state = apply_delta(state, delta)
+    return state if deltas else copy.deepcopy(state)
+
+
+def get_saved_game_states(db_session: Session, saved_games: list[SavedGame]) -> dict[int, dict]:
+    """
+    Rebuilds the states of several saves at once, reusing each rebuilt state as the
+    base of the next delta instead of replaying every chain from its keyframe.
+    Returns {saved_game_id: state}; states are shared with the saves, so treat them as read-only.
+    """
+    states = {}
+    for saved_game in sorted(saved_games, key=lambda sg: sg.id):
+        if saved_game.is_keyframe:
+            states[saved_game.id] = saved_game.game_state
+        elif saved_game.base_save_id in states:
+            states[saved_game.id] = apply_delta(states[saved_game.base_save_id], saved_game.state_delta or [])
+        else:
+            states[saved_game.id] = get_saved_game_state(db_session, saved_game)
+    return states
+
+
 def load_game_state(db_session: Session, saved_game_id: int) -> GameSession | None:
     """
     Loads a game state from a SavedGame record and applies it to the original GameSession.
@@ -509,9 +756,11 @@ def load_game_state(db_session: Session, saved_game_id: int) -> GameSession | No
     if not saved_game:
         return None
 
-    # The game state is stored in the 'game_state' field.
+    # Keyframes hold the full state; delta saves are rebuilt by replaying their chain.
     # We need to exclude fields that are not part of the GameSession model or should not be overwritten.
-    game_state_to_load = saved_game.game_state
+    game_state_to_load = get_saved_game_state(db_session, saved_game)
+    if game_state_to_load is None:
+        return None
     session_id = saved_game.session_id
 
     # We need to be careful about what we're updating. 
@@ -535,13 +784,90 @@ def get_saved_games(db_session: Session, player_id: str) -> list[SavedGame]:
     return db_session.query(SavedGame).filter(SavedGame.player_id == player_id).order_by(SavedGame.saved_at.desc()).all()
 
 
-def get_saved_games(db_session: Session, player_id: str) -> list[SavedGame]:
+def _encode_saved_games_cursor(saved_at: datetime, saved_game_id: int) -> str:
+    payload = json.dumps([saved_at.isoformat() if saved_at else None, saved_game_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_saved_games_cursor(cursor: str) -> tuple[datetime | None, int]:
     """
-    Retrieves all saved games for a given player.
+    Raises ValueError for a malformed cursor.
     """
-    return db_session.query(SavedGame).filter(SavedGame.player_id == player_id).order_by(SavedGame.saved_at.desc()).all()
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        saved_at, saved_game_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return (datetime.fromisoformat(saved_at) if saved_at else None), int(saved_game_id)
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
 
 
+def list_saved_game_summaries(
+    db_session: Session, player_id: str, limit: int = SAVED_GAMES_PAGE_SIZE, cursor: str | None = None
+) -> tuple[list[dict], str | None]:
+    """
+    Returns one page of a player's saves, newest first, as (summaries, next_cursor).
+    Only id, session_id, save_name, saved_at and summary are selected (never the
+    saved state). Pages are keyset-paginated on (saved_at DESC, id ASC), which
+    follows ix_saved_games_player_id_saved_at, so deep pages cost the same as the first.
+    next_cursor is None on the last page. Raises ValueError for a malformed cursor.
+    """
+    query = db_session.query(
+        SavedGame.id, SavedGame.session_id, SavedGame.save_name, SavedGame.saved_at, SavedGame.summary
+    ).filter(SavedGame.player_id == player_id)
+
+    if cursor:
+        cursor_saved_at, cursor_id = _decode_saved_games_cursor(cursor)
+        query = query.filter(
+            or_(
+                SavedGame.saved_at < cursor_saved_at,
+                and_(SavedGame.saved_at == cursor_saved_at, SavedGame.id > cursor_id),
+            )
+        )
+
+    rows = query.order_by(SavedGame.saved_at.desc(), SavedGame.id.asc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_saved_games_cursor(rows[-1].saved_at, rows[-1].id)
+
+    summaries = [
+        {
+            "id": row.id,
+            "session_id": row.session_id,
+            "save_name": row.save_name,
+            "saved_at": row.saved_at.isoformat() if row.saved_at else None,
+            "summary": row.summary,
+        }
+        for row in rows
+    ]
+    return summaries, next_cursor
+
+
+def build_save_summary(game_state: dict) -> dict:
+    """
+    The small summary shown in the saved games list: room, theme and puzzle progress.
+    """
+    theme_id = game_state.get("theme")
+    room_id = game_state.get("current_room")
+    room_info = ROOM_INDEX.room(theme_id, room_id) or {}
+    theme_data = ROOM_INDEX.theme(theme_id) or {}
+    puzzle_state = game_state.get("puzzle_state") or {}
+
+    puzzle_ids = [
+        puzzle_id
+        for theme_room in theme_data.get("rooms", {}).values()
+        for puzzle_id in theme_room.get("puzzles", {})
+    ]
+    solved = sum(1 for puzzle_id in puzzle_ids if puzzle_state.get(puzzle_id, {}).get("solved", False))
+    return {
+        "room": room_id,
+        "room_name": room_info.get("name"),
+        "theme": theme_id,
+        "progress": {"solved": solved, "total": len(puzzle_ids)},
+    }
+
+
+@_session_serialized
 def use_item(
     db_session: Session, session_id: int, item_id: str, target_puzzle_id: str = None
 ) -> tuple[bool, str, GameSession | None, dict]:
@@ -555,15 +881,16 @@ def use_item(
 
     if item_id not in game_session.inventory:
         return False, f"You don't have '{item_id}' in your inventory.", game_session, {"error": "Item not in inventory."}
+    before = _watched_state(game_session)
 
     current_room_id = game_session.current_room
     theme_id = game_session.theme
     
-    theme_data = ROOM_DATA.get(theme_id)
+    theme_data = ROOM_INDEX.theme(theme_id)
     if not theme_data:
         return False, "Game theme data not found.", game_session, {"error": "Game theme data not found."}
 
-    room_info = theme_data["rooms"].get(current_room_id)
+    room_info = ROOM_INDEX.room(theme_id, current_room_id)
     if not room_info:
         return False, "Room data not found.", game_session, {"error": "Room data not found."}
 
@@ -612,78 +939,77 @@ def use_item(
         return False, feedback_message, game_session, ai_evaluation_response
 
     # --- Apply Game State Changes ---
+    # All changes from this item use are collected and written in one commit
+    unit_of_work = ActionUnitOfWork(db_session, game_session)
+
     # Update inventory (add new items, remove consumed items)
     for item_to_add in items_found:
-        update_player_inventory(db_session, session_id, item_to_add, "add")
+        unit_of_work.add_item(item_to_add)
     for item_to_remove in items_consumed:
-        update_player_inventory(db_session, session_id, item_to_remove, "remove")
-
-    # Re-fetch session to get updated inventory after modification, if needed
-    db_session.refresh(game_session)
+        unit_of_work.remove_item(item_to_remove)
 
-    if game_state_changes:
-        current_narrative_state = game_session.narrative_state.copy()
-        current_narrative_state.update(game_state_changes)
-        game_session.narrative_state = current_narrative_state
-        flag_modified(game_session, "narrative_state")
+    unit_of_work.set_narrative_flags(game_state_changes)
     
     # Update puzzle state if applicable (e.g., if item use solved a puzzle step)
     if target_puzzle_id and target_puzzle_id in room_info["puzzles"]:
-        new_puzzle_state_for_session = game_session.puzzle_state.copy()
-        current_puzzle_details = new_puzzle_state_for_session.get(target_puzzle_id, {})
+        current_puzzle_details = dict(unit_of_work.puzzle_state.get(target_puzzle_id, {}))
 
         current_puzzle_details["status"] = ai_evaluation_response.get("puzzle_status", current_puzzle_details.get("status", "unsolved"))
         current_puzzle_details["solved"] = is_successful # If item use directly solves the puzzle
-        current_puzzle_details["ai_feedback"] = ai_evaluation_response
+        current_puzzle_details["attempts"] = current_puzzle_details.get("attempts", 0) + 1
+        unit_of_work.record_attempt(
+            target_puzzle_id,
+            normalize_action(player_attempt, theme_id, current_room_id),
+            is_successful,
+            bool(ai_evaluation_response.get("hint")),
+        )
         
         if ai_evaluation_response.get("new_puzzle_state"):
             current_puzzle_details.update(ai_evaluation_response["new_puzzle_state"])
-      
 
-        new_puzzle_state_for_session[target_puzzle_id] = current_puzzle_details
-        game_session.puzzle_state = new_puzzle_state_for_session
-        flag_modified(game_session, "puzzle_state")
+        unit_of_work.set_puzzle_state(target_puzzle_id, current_puzzle_details)
     # --- End Apply Game State Changes ---
 
-    db_session.add(game_session)
-    db_session.commit()
-    db_session.refresh(game_session)
+    unit_of_work.commit()
+    publish_session_changes(game_session, before)
 
     return is_successful, feedback_message, game_session, ai_evaluation_response
 
 
+def get_puzzle_attempts(db_session: Session, session_id: int, puzzle_id: str = None) -> list[PuzzleAttempt]:
+    """
+    Returns the logged puzzle attempts of a session (optionally for one puzzle), oldest first.
+    """
+    query = db_session.query(PuzzleAttempt).filter(PuzzleAttempt.session_id == session_id)
+    if puzzle_id:
+        query = query.filter(PuzzleAttempt.puzzle_id == puzzle_id)
+    return query.order_by(PuzzleAttempt.id).all()
+
+
+@_session_serialized
 def get_a_hint(db_session: Session, session_id: int) -> tuple[str, GameSession | None]:
     game_session = get_game_session(db_session, session_id)
     if not game_session:
         return "Game session not found.", None
 
     narrative_state = game_session.narrative_state
-    hints_remaining = narrative_state.get("hints_remaining", 0) # Default to 0 if not set
-    last_hint_timestamp_str = narrative_state.get("last_hint_timestamp")
+    hint_status = HintStatus.of(narrative_state)
 
-    if hints_remaining <= 0:
+    if hint_status.hints_remaining <= 0:
         return "No more hints available for this session.", game_session
 
     # Check session-level cooldown
-    if last_hint_timestamp_str:
-        # HINT_COOLDOWN_SECONDS is imported via routes, so game_logic needs to know it.
-        # Since it's a global constant for the game, it should be passed or re-imported.
-        # For minimal change, and because it's a constant, I will re-import it here.
-        from routes import HINT_COOLDOWN_SECONDS # Import the constant from routes
-        last_hint_timestamp = datetime.fromisoformat(last_hint_timestamp_str)
-        time_since_last_hint = datetime.now(timezone.utc) - last_hint_timestamp
-        if time_since_last_hint < timedelta(seconds=HINT_COOLDOWN_SECONDS):
-            remaining_cooldown = int(HINT_COOLDOWN_SECONDS - time_since_last_hint.total_seconds())
-            return f"You need a moment to think before asking for another hint. Try again in {remaining_cooldown} seconds.", game_session
+    if hint_status.remaining_cooldown:
+        return f"You need a moment to think before asking for another hint. Try again in {hint_status.remaining_cooldown} seconds.", game_session
 
     current_room_id = game_session.current_room
     theme_id = game_session.theme
     
-    theme_data = ROOM_DATA.get(theme_id)
+    theme_data = ROOM_INDEX.theme(theme_id)
     if not theme_data:
         return "Game theme data not found.", None
 
-    room_info = theme_data["rooms"].get(current_room_id)
+    room_info = ROOM_INDEX.room(theme_id, current_room_id)
     if not room_info or not room_info["puzzles"]:
         return "No puzzles in this room to get a hint for.", game_session
 
@@ -698,10 +1024,10 @@ def get_a_hint(db_session: Session, session_id: int) -> tuple[str, GameSession |
         return "All puzzles in this room are solved.", game_session
 
     puzzle_definition = room_info["puzzles"][puzzle_id]
-    
-    # Decrement hints_remaining and update timestamp for the session in narrative_state
-    narrative_state["hints_remaining"] = hints_remaining - 1
-    narrative_state["last_hint_timestamp"] = datetime.now(timezone.utc).isoformat()
+    before = _watched_state(game_session)
+
+    # Decrement hints_remaining and start the cooldown for the session in narrative_state
+    use_hint(narrative_state)
     game_session.narrative_state = narrative_state
     flag_modified(game_session, "narrative_state")
 
@@ -725,12 +1051,14 @@ def get_a_hint(db_session: Session, session_id: int) -> tuple[str, GameSession |
     else:
         hint_message = f"You search for a hint, but find none specific to this puzzle. Re-examine the room: '{puzzle_definition.get('description', 'A mysterious puzzle.')}'"
 
-    db_session.commit()
-    db_session.refresh(game_session)
+    game_session.last_updated = datetime.now(timezone.utc)
+    get_session_cache().commit(db_session, game_session)
+    publish_session_changes(game_session, before)
 
     return hint_message, game_session
 
 
+@_session_serialized
 def player_action(
     db_session: Session, session_id: int, action_phrase: str, player_attempt: str = ""
 ) -> tuple[bool, str, GameSession | None, dict]:
@@ -744,89 +1072,169 @@ def player_action(
     current_room_id = game_session.current_room
     theme_id = game_session.theme
     
-    theme_data = ROOM_DATA.get(theme_id)
+    theme_data = ROOM_INDEX.theme(theme_id)
     if not theme_data:
         return False, "Game theme data not found.", game_session, {"error": "Game theme data not found."}
 
-    room_info = theme_data["rooms"].get(current_room_id)
+    room_info = ROOM_INDEX.room(theme_id, current_room_id)
     if not room_info:
         return False, "Room data not found.", game_session, {"error": "Room data not found."}
 
-    # Find the action in the interactables
-    for interactable_id, interactable_data in room_info.get("interactables", {}).items():
-        for action in interactable_data.get("actions", []):
-            if action["label"].lower() == action_phrase.lower():
-                effect = action.get("effect")
-                if effect:
-                    effect_type = effect.get("type")
-                    effect_message = effect.get("message", "You interact with the environment.")
-
-                    if effect_type == "narrative_update":
-                        return True, effect_message, game_session, {"action_type": "narrative_update"}
-                    
-                    elif effect_type == "trigger_puzzle":
-                        puzzle_id = effect.get("puzzle_id")
-                        if not puzzle_id:
-                            return False, "Missing puzzle_id for trigger_puzzle effect.", game_session, {"error": "Missing puzzle_id."}
-
-                        is_successful, message, updated_session, ai_evaluation = solve_puzzle(
-                            db_session, session_id, puzzle_id, player_attempt
-                        )
-                        return is_successful, message, updated_session, ai_evaluation
-                    
-                    else:
-                        return False, f"Unhandled structured effect type: {effect_type}", game_session, {"error": "Unhandled effect type."}
-                else:
-                    return False, "Structured action found without defined effect.", game_session, {"error": "Missing effect."}
+    # Resolve the phrase to the same action the matching contextual option dispatches to
+    if ROOM_INDEX.find_action(theme_id, current_room_id, action_phrase):
+        option = ContextualOption(action_phrase, "interact", action_phrase)
 
     # Handle "Go to [Room Name]" action for linear progression
-    if action_phrase.startswith("Go to "):
+    elif action_phrase.startswith("Go to "):
         target_room_name = action_phrase.replace("Go to ", "").strip()
         
-        target_room_id = None
-        for r_id, r_info in theme_data["rooms"].items():
-            if r_info.get("name", "").lower() == target_room_name.lower():
-                target_room_id = r_id
-                break
-        
+        target_room_id = ROOM_INDEX.find_room_id(theme_id, target_room_name)
         if not target_room_id:
             return False, f"Could not find a room named '{target_room_name}'.", game_session, {"error": "Invalid room target."}
+        option = ContextualOption(action_phrase, "move", target_room_id)
+
+    # Handle puzzle solving directly (matches the "Solve <name>" contextual option)
+    elif action_phrase.lower().startswith("solve "):
+        puzzle_name = action_phrase[len("solve "):].strip()
+        puzzle_id = ROOM_INDEX.find_puzzle_id(theme_id, current_room_id, puzzle_name)
+        if not puzzle_id:
+            return False, f"Unknown action: {action_phrase}", game_session, {"error": "Unknown action."}
+        option = ContextualOption(action_phrase, "solve", puzzle_id)
+
+    else:
+        return False, f"Unknown action: {action_phrase}", game_session, {"error": "Unknown action."}
+
+    return perform_contextual_option(db_session, game_session, option, player_attempt)
+
+
+@_session_serialized
+def perform_contextual_option(
+    db_session: Session, game_session: GameSession, option: ContextualOption, player_attempt: str = ""
+) -> tuple[bool, str, GameSession | None, dict]:
+    """
+    Executes an already-resolved ContextualOption (e.g. one picked by index from
+    get_contextual_option_entries) without matching its label against the room again.
+    """
+    session_id = game_session.id
+    current_room_id = game_session.current_room
+    theme_id = game_session.theme
+
+    room_info = ROOM_INDEX.room(theme_id, current_room_id)
+    if not room_info:
+        return False, "Room data not found.", game_session, {"error": "Room data not found."}
+
+    if option.action_type == "interact":
+        action = ROOM_INDEX.find_action(theme_id, current_room_id, option.target)
+        if not action:
+            return False, f"Unknown action: {option.label}", game_session, {"error": "Unknown action."}
+
+        effect = action.get("effect")
+        if effect:
+            effect_type = effect.get("type")
+            effect_message = effect.get("message", "You interact with the environment.")
+
+            if effect_type == "narrative_update":
+                return True, effect_message, game_session, {"action_type": "narrative_update"}
+            
+            elif effect_type == "trigger_puzzle":
+                puzzle_id = effect.get("puzzle_id")
+                if not puzzle_id:
+                    return False, "Missing puzzle_id for trigger_puzzle effect.", game_session, {"error": "Missing puzzle_id."}
+
+                is_successful, message, updated_session, ai_evaluation = solve_puzzle(
+                    db_session, session_id, puzzle_id, player_attempt
+                )
+                return is_successful, message, updated_session, ai_evaluation
+            
+            else:
+                return False, f"Unhandled structured effect type: {effect_type}", game_session, {"error": "Unhandled effect type."}
+        else:
+            return False, "Structured action found without defined effect.", game_session, {"error": "Missing effect."}
+
+    if option.action_type == "solve":
+        is_successful, message, updated_session, ai_evaluation = solve_puzzle(
+            db_session, session_id, option.target, player_attempt
+        )
+        return is_successful, message, updated_session, ai_evaluation
+
+    if option.action_type == "move":
+        target_room_id = option.target
 
         current_room_main_puzzle_id = next(iter(room_info["puzzles"]), None)
         if current_room_main_puzzle_id and not game_session.puzzle_state.get(current_room_main_puzzle_id, {}).get("solved", False):
             return False, "You must solve the current room's main puzzle before moving on.", game_session, {"error": "Current room not completed."}
 
-        game_history = list(game_session.game_history)
-        game_history.append(current_room_id)
-
-        new_room_info = theme_data["rooms"].get(target_room_id)
+        new_room_info = ROOM_INDEX.room(theme_id, target_room_id)
         if not new_room_info:
             return False, "New room not found in theme data.", game_session, {"error": "New room not found."}
-        
-        new_description = new_room_info.get("description", "A mysterious room you find yourself in.")
-
-        updated_session = update_game_session(
-            db_session,
-            session_id,
-            current_room=target_room_id,
-            current_room_description=new_description,
-            game_history=game_history,
-        )
+
+        updated_session = enter_room(db_session, session_id, target_room_id, new_room_info)
         if updated_session:
-            db_session.commit()
             logging.info(f"Moved to room: {target_room_id} for session {session_id}")
             return True, f"You move to the {new_room_info['name']}.", updated_session, {"action_type": "move_room", "target_room": target_room_id}
         else:
             return False, "Failed to update game session for new room.", game_session, {"error": "Failed to update session."}
 
-    # Handle puzzle solving directly
-    if action_phrase.startswith("solve "):
-        puzzle_name = action_phrase.replace("solve ", "").strip()
-        for puzzle_id, puzzle_data in room_info.get("puzzles", {}).items():
-            if puzzle_data.get("name", "").lower() == puzzle_name.lower():
-                is_successful, message, updated_session, ai_evaluation = solve_puzzle(
-                    db_session, session_id, puzzle_id, player_attempt
-                )
-                return is_successful, message, updated_session, ai_evaluation
+    return False, f"Unknown action: {option.label}", game_session, {"error": "Unknown action."}
+
+
+class _BatchStepFailed(Exception):
+    pass
+
+
+def player_action_batch(
+    db_session: Session, session_id: int, actions: list[dict]
+) -> tuple[list[dict], GameSession | None, int | None]:
+    """
+    Applies an ordered list of actions to one session in a single transaction.
+    Each action is {"option_index": n} (as for /interact) or {"option": label}
+    (resolved by player_action), plus an optional "player_attempt".
+
+    Returns (steps, game_session, failed_step): one result dict per applied step,
+    the session afterwards and None, or, if a step could not be applied, the
+    steps up to and including it, the session as it was before the batch and
+    the failing step's index. A failing step rolls back the whole batch; a wrong
+    puzzle answer is not a failure.
+    """
+    game_session = get_game_session(db_session, session_id)
+    if not game_session:
+        return [], None, None
+
+    steps = []
+    try:
+        with get_session_cache().transaction(db_session, session_id):
+            for step_index, action in enumerate(actions):
+                game_session = get_game_session(db_session, session_id)
+                player_attempt = action.get("player_attempt", "")
+                option_index = action.get("option_index")
+                if option_index is not None:
+                    option_entries = get_contextual_option_entries(game_session)
+                    if not (isinstance(option_index, int) and 0 <= option_index < len(option_entries)):
+                        steps.append({"step": step_index, "error": "Invalid option index"})
+                        raise _BatchStepFailed()
+                    option = option_entries[option_index]
+                    is_successful, message, game_session, ai_evaluation = perform_contextual_option(
+                        db_session, game_session, option, player_attempt
+                    )
+                    label = option.label
+                else:
+                    label = action.get("option", "")
+                    is_successful, message, game_session, ai_evaluation = player_action(
+                        db_session, session_id, label, player_attempt
+                    )
 
-    return False, f"Unknown action: {action_phrase}", game_session, {"error": "Unknown action."}
\ No newline at end of file
+                step = {"step": step_index, "option": label, "is_successful": is_successful, "message": message}
+                if "error" in ai_evaluation:
+                    steps.append({**step, "error": ai_evaluation["error"]})
+                    raise _BatchStepFailed()
+                step["current_room"] = game_session.current_room
+                if ai_evaluation.get("game_over"):
+                    step["game_over"] = True
+                steps.append(step)
+    except _BatchStepFailed:
+        game_session = get_game_session(db_session, session_id)
+        # Subscribers were sent the rolled-back steps' events; have them reload the state
+        get_event_bus().publish(session_id, [{"type": "state_reset"}])
+        return steps, game_session, len(steps) - 1
+
+    return steps, game_session, None
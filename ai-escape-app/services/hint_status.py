@@ -0,0 +1,69 @@
+import time
+from datetime import datetime
+from typing import NamedTuple
+
+# Hint budget and cooldown, kept in the session's narrative_state:
+#   hints_remaining     -- hints the player may still ask for
+#   hint_cooldown_until -- epoch second at which the next hint becomes available
+# Storing the expiry as an integer makes the status a subtraction; nothing is
+# parsed on the hint or session GET paths.
+
+HINT_COOLDOWN_SECONDS = 45 # Seconds between two hints
+HINT_COOLDOWN_KEY = "hint_cooldown_until"
+LEGACY_HINT_TIMESTAMP_KEY = "last_hint_timestamp" # ISO string written by older versions
+
+
+def _cooldown_until(narrative_state: dict) -> int:
+    cooldown_until = narrative_state.get(HINT_COOLDOWN_KEY)
+    if cooldown_until is not None:
+        return cooldown_until
+    legacy_timestamp = narrative_state.get(LEGACY_HINT_TIMESTAMP_KEY)
+    if legacy_timestamp: # Sessions and saves from before the epoch field
+        return int(datetime.fromisoformat(legacy_timestamp).timestamp()) + HINT_COOLDOWN_SECONDS
+    return 0
+
+
+class HintStatus(NamedTuple):
+    hints_remaining: int
+    remaining_cooldown: int # Seconds, 0 when a hint can be given now
+
+    @classmethod
+    def of(cls, narrative_state: dict, now: float = None) -> "HintStatus":
+        """
+        Computes the hint status of a session from its narrative_state.
+        """
+        narrative_state = narrative_state or {}
+        remaining_cooldown = _cooldown_until(narrative_state) - int(time.time() if now is None else now)
+        return cls(narrative_state.get("hints_remaining", 0), remaining_cooldown if remaining_cooldown > 0 else 0)
+
+    @property
+    def available(self) -> bool:
+        return self.hints_remaining > 0 and not self.remaining_cooldown
+
+    @property
+    def display_text(self) -> str:
+        if self.hints_remaining <= 0:
+            return "No more hints available."
+        if self.remaining_cooldown:
+            return f"Hint on cooldown ({self.remaining_cooldown}s)"
+        return "Click for a hint"
+
+    def to_dict(self) -> dict:
+        """
+        The hint fields of the session and hint API responses.
+        """
+        return {
+            "hints_remaining": self.hints_remaining,
+            "remaining_hint_cooldown": self.remaining_cooldown,
+            "hint_status_display_text": self.display_text,
+        }
+
+
+def use_hint(narrative_state: dict, now: float = None) -> None:
+    """
+    Spends one hint and starts the cooldown, updating narrative_state in place.
+    """
+    now = int(time.time() if now is None else now)
+    narrative_state["hints_remaining"] = narrative_state.get("hints_remaining", 0) - 1
+    narrative_state[HINT_COOLDOWN_KEY] = now + HINT_COOLDOWN_SECONDS
+    narrative_state.pop(LEGACY_HINT_TIMESTAMP_KEY, None)
@@ -0,0 +1,138 @@
+from collections import deque
+from data.rooms import ROOM_DATA
+
+# Verbs players put in front of a typed answer ("enter eyetears", "type 528", ...)
+ANSWER_VERBS = ("input", "type", "enter")
+
+
+class IntentMatcher:
+    """
+    Aho-Corasick automaton that maps free-text player attempts to canonical
+    semantic actions. Every phrase is compiled into one automaton, so matching
+    an attempt is a single pass over its characters no matter how many phrases
+    are registered.
+
+    Each phrase can be scoped to a (theme_id, room_id) pair; matches outside the
+    requested scope are ignored, so the same phrase can mean different things in
+    different rooms. When several phrases match, the longest (most specific) one
+    wins, and ties go to the phrase that was registered first.
+    """
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        # Per node: list of (phrase_length, registration_order, intent, scope)
+        self._outputs = [[]]
+        self._phrase_count = 0
+        self._compiled = False
+
+    def add_phrase(self, phrase: str, intent: str, scope: tuple[str, str] | None = None) -> None:
+        phrase = phrase.strip().lower()
+        if not phrase:
+            return
+        node = 0
+        for char in phrase:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            node = next_node
+        self._outputs[node].append((len(phrase), self._phrase_count, intent, scope))
+        self._phrase_count += 1
+        self._compiled = False
+
+    def compile(self) -> "IntentMatcher":
+        """
+        Builds the failure links (breadth-first) and merges each node's outputs
+        with those of its failure node.
+        """
+        queue = deque()
+        for next_node in self._goto[0].values():
+            self._fail[next_node] = 0
+            queue.append(next_node)
+
+        while queue:
+            node = queue.popleft()
+            for char, next_node in self._goto[node].items():
+                queue.append(next_node)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_node] = self._goto[fallback].get(char, 0)
+                self._outputs[next_node] = self._outputs[next_node] + self._outputs[self._fail[next_node]]
+
+        self._compiled = True
+        return self
+
+    def match(self, text: str, scope: tuple[str, str] | None = None) -> str | None:
+        """
+        Returns the intent of the best phrase found in text, or None.
+        With a scope, only phrases registered for that scope (or unscoped phrases)
+        are considered; without one, every phrase is.
+        """
+        if not self._compiled:
+            self.compile()
+
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        best = None
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for output in outputs[node]:
+                output_scope = output[3]
+                if scope is not None and output_scope is not None and output_scope != scope:
+                    continue
+                if best is None or output[0] > best[0] or (output[0] == best[0] and output[1] < best[1]):
+                    best = output
+        return best[2] if best else None
+
+
+def _canonical_solution(solution: str | list[str]) -> str:
+    # Same flattening evaluate_and_adapt_puzzle applies before comparing attempts
+    if isinstance(solution, list):
+        return "".join(solution).lower()
+    return str(solution).lower()
+
+
+def build_intent_matcher(room_data: dict) -> IntentMatcher:
+    """
+    Compiles every synonym phrase in a ROOM_DATA-shaped dict into an IntentMatcher.
+
+    Per room:
+      - each puzzle's "input/type/enter <answer>" forms and its optional 'synonyms'
+        map to the puzzle's canonical solution;
+      - each interactable action label and its optional 'synonyms' map to the
+        label as a snake_case action (e.g. "Escape the Library" -> "escape_the_library").
+    """
+    matcher = IntentMatcher()
+    for theme_id, theme_data in room_data.items():
+        for room_id, room_info in theme_data.get("rooms", {}).items():
+            scope = (theme_id, room_id)
+
+            for puzzle_definition in room_info.get("puzzles", {}).values():
+                if "solution" not in puzzle_definition:
+                    continue
+                answer = _canonical_solution(puzzle_definition["solution"])
+                for verb in ANSWER_VERBS:
+                    matcher.add_phrase(f"{verb} {answer}", answer, scope)
+                for synonym in puzzle_definition.get("synonyms", []):
+                    matcher.add_phrase(synonym, answer, scope)
+
+            for interactable_data in room_info.get("interactables", {}).values():
+                for action in interactable_data.get("actions", []):
+                    intent = action["label"].strip().lower().replace(" ", "_")
+                    matcher.add_phrase(action["label"], intent, scope)
+                    for synonym in action.get("synonyms", []):
+                        matcher.add_phrase(synonym, intent, scope)
+
+    return matcher.compile()
+
+
+INTENT_MATCHER = build_intent_matcher(ROOM_DATA)
@@ -0,0 +1,235 @@
+import asyncio
+import concurrent.futures
+import contextlib
+import json
+import logging
+import random
+import ssl
+import threading
+from urllib.parse import urlsplit
+
+# Non-blocking client for the Gemini REST API (models/<model>:generateContent),
+# the transport of services.ai_provider.GeminiProvider.
+#
+# Flask workers are synchronous, so generate_sync() hands each call to one shared
+# background event loop. All calls, from every worker thread, go through the same
+# semaphore, so the number of in-flight LLM requests per process is bounded.
+# Every call has a deadline (semaphore wait + all retries). When the deadline
+# is missed or the backend keeps failing, the caller's deterministic fallback
+# text is returned, so a slow LLM never stalls a request for more than the deadline.
+
+DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+DEFAULT_MODEL = "gemini-pro"
+
+# How much longer than the deadline generate_sync waits for the background loop.
+# generate() itself returns by the deadline; this only bounds the wait when the
+# loop stops (close()) while a call is pending.
+SYNC_RESULT_MARGIN_SECONDS = 1.0
+
+# HTTP statuses worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class LLMRequestError(Exception):
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class AsyncLLMClient:
+    """
+    asyncio client with a semaphore-bounded concurrency limit, per-call deadlines
+    and retries with full-jitter exponential backoff.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = DEFAULT_MODEL,
+        base_url: str = DEFAULT_BASE_URL,
+        max_concurrency: int = 4,
+        deadline_seconds: float = 8.0,
+        max_retries: int = 2,
+        backoff_base_seconds: float = 0.25,
+        backoff_max_seconds: float = 2.0,
+    ):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.deadline_seconds = deadline_seconds
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self._semaphore = None
+        self._semaphore_loop = None
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        self._ssl_context = None
+
+    # --- Public API ---
+
+    async def generate(self, prompt: str, fallback: str, deadline_seconds: float | None = None) -> str:
+        """
+        Returns the generated text, or fallback if the deadline is missed or
+        the request fails after all retries.
+        """
+        deadline = self.deadline_seconds if deadline_seconds is None else deadline_seconds
+        try:
+            return await asyncio.wait_for(self._bounded_generate(prompt), timeout=deadline)
+        except asyncio.TimeoutError:
+            logging.warning(f"LLM call missed its {deadline}s deadline; using deterministic fallback.")
+        except LLMRequestError as e:
+            logging.warning(f"LLM call failed ({e}); using deterministic fallback.")
+        return fallback
+
+    def generate_sync(self, prompt: str, fallback: str, deadline_seconds: float | None = None) -> str:
+        """
+        Blocking wrapper for synchronous (Flask) callers. Runs generate() on the
+        shared background loop and waits for it, never longer than the deadline.
+        """
+        deadline = self.deadline_seconds if deadline_seconds is None else deadline_seconds
+        future = asyncio.run_coroutine_threadsafe(
+            self.generate(prompt, fallback, deadline), self._get_loop()
+        )
+        try:
+            return future.result(timeout=deadline + SYNC_RESULT_MARGIN_SECONDS)
+        except (concurrent.futures.TimeoutError, concurrent.futures.CancelledError):
+            future.cancel()
+            logging.warning("LLM call was abandoned (client closed); using deterministic fallback.")
+            return fallback
+
+    def close(self) -> None:
+        """
+        Stops the background event loop used by generate_sync, if it was started.
+        """
+        with self._loop_lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._stop_loop, self._loop)
+                self._loop = None
+
+    # --- Internals ---
+
+    @staticmethod
+    def _stop_loop(loop: asyncio.AbstractEventLoop) -> None:
+        # Pending calls are cancelled first, so their generate_sync callers get the fallback now
+        pending = asyncio.all_tasks(loop)
+        for task in pending:
+            task.cancel()
+        if pending:
+            asyncio.gather(*pending, return_exceptions=True).add_done_callback(lambda _: loop.stop())
+        else:
+            loop.stop()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._loop_lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    thread = threading.Thread(target=loop.run_forever, name="llm-client-loop", daemon=True)
+                    thread.start()
+                    self._loop = loop
+        return self._loop
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # A semaphore belongs to one event loop; generate_sync always uses the same
+        # loop, but direct awaits (e.g. asyncio.run in tests) may come from another.
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _bounded_generate(self, prompt: str) -> str:
+        async with self._get_semaphore():
+            return await self._generate_with_retries(prompt)
+
+    def _backoff_delay(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, min(max, base * 2^attempt)]
+        return random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * (2 ** attempt)))
+
+    async def _generate_with_retries(self, prompt: str) -> str:
+        attempt = 0
+        while True:
+            try:
+                return await self._generate_once(prompt)
+            except LLMRequestError as e:
+                if not e.retryable or attempt >= self.max_retries:
+                    raise
+            except (OSError, asyncio.IncompleteReadError) as e:
+                if attempt >= self.max_retries:
+                    raise LLMRequestError(f"Connection error: {e}") from e
+            await asyncio.sleep(self._backoff_delay(attempt))
+            attempt += 1
+
+    async def _generate_once(self, prompt: str) -> str:
+        url = f"{self.base_url}/models/{self.model}:generateContent"
+        payload = {"contents": [{"parts": [{"text": prompt}]}]}
+        # A header, not ?key=, so the key stays out of access logs and proxies
+        status, body = await self._post_json(url, payload, {"x-goog-api-key": self.api_key})
+
+        if status != 200:
+            raise LLMRequestError(f"HTTP {status}", retryable=status in RETRYABLE_STATUSES)
+        try:
+            data = json.loads(body)
+            return data["candidates"][0]["content"]["parts"][0]["text"]
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise LLMRequestError(f"Malformed response: {e}", retryable=False) from e
+
+    async def _post_json(self, url: str, payload: dict, extra_headers: dict | None = None) -> tuple[int, bytes]:
+        """
+        Minimal HTTP/1.1 POST over asyncio streams (one connection per request).
+        """
+        parts = urlsplit(url)
+        secure = parts.scheme == "https"
+        if secure and self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context()
+        port = parts.port or (443 if secure else 80)
+        reader, writer = await asyncio.open_connection(
+            parts.hostname, port, ssl=self._ssl_context if secure else None
+        )
+        try:
+            body = json.dumps(payload).encode("utf-8")
+            path = parts.path + (f"?{parts.query}" if parts.query else "")
+            head = (
+                f"POST {path} HTTP/1.1\r\n"
+                f"Host: {parts.netloc}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                + "".join(f"{name}: {value}\r\n" for name, value in (extra_headers or {}).items())
+                + "Connection: close\r\n\r\n"
+            )
+            writer.write(head.encode("latin-1") + body)
+            await writer.drain()
+
+            status_line = await reader.readline()
+            if not status_line:
+                raise LLMRequestError("Empty response")
+            status = int(status_line.split()[1])
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            if headers.get("transfer-encoding", "").lower() == "chunked":
+                chunks = []
+                while True:
+                    size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+                    if size == 0:
+                        break
+                    chunks.append(await reader.readexactly(size))
+                    await reader.readline() # Trailing CRLF after each chunk
+                data = b"".join(chunks)
+            elif "content-length" in headers:
+                data = await reader.readexactly(int(headers["content-length"]))
+            else:
+                data = await reader.read()
+            return status, data
+        finally:
+            writer.close()
+            with contextlib.suppress(Exception):
+                await writer.wait_closed()
@@ -0,0 +1,152 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from data.room_index import ROOM_INDEX
+from services.ai_service import generate_narrative, generate_room_description, live_generation_available
+
+# Background pregeneration of AI content for the room a session will enter next.
+#
+# Every theme is a linear next_room_id chain, so when a session enters a room the
+# next room is already known. schedule() starts generating its description and
+# narrative in a thread pool. Room transitions then call take(), which never
+# blocks: it returns the content if it is ready and None otherwise, and the
+# caller falls back to the static room description.
+#
+# In deterministic mode there is nothing to warm, so schedule() does nothing.
+
+
+class PregeneratedRoom(NamedTuple):
+    description: str
+    narrative: str
+
+
+def room_context(room_info: dict) -> dict:
+    """
+    The room_context passed to generate_room_description. Room transitions build
+    it here too, so their cache key matches the pregenerated one.
+    """
+    return {
+        "name": room_info.get("name"),
+        "description": room_info.get("description", "A mysterious room you find yourself in."),
+        "exits": list(room_info.get("exits", {}).keys()),
+        "puzzles": list(room_info.get("puzzles", {}).keys()),
+        "items": room_info.get("items", []),
+    }
+
+
+def generate_room_content(theme_id: str, room_id: str, room_info: dict, narrative_state: dict) -> PregeneratedRoom:
+    description = generate_room_description(
+        theme=theme_id,
+        scenario_name_for_ai_prompt=room_info.get("name", room_id),
+        narrative_state=narrative_state,
+        room_context=room_context(room_info),
+        current_room_id=room_id,
+    )
+    narrative = generate_narrative(
+        f"The player enters the {room_info.get('name', room_id)}.", theme=theme_id, location=room_id
+    )
+    return PregeneratedRoom(description, narrative)
+
+
+class PregenerationWorker:
+    """
+    Thread pool plus a bounded table of pending results keyed by (session_id, room_id).
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 1024):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._pending = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pregeneration")
+        return self._executor
+
+    def schedule(self, session_id: int, theme_id: str, room_id: str | None, narrative_state: dict) -> bool:
+        """
+        Starts generating content for room_id unless it is already pending.
+        Returns True if a job was submitted.
+        """
+        if not room_id or not live_generation_available():
+            return False
+        room_info = ROOM_INDEX.room(theme_id, room_id)
+        if room_info is None:
+            return False
+
+        key = (session_id, room_id)
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending[key] = self._get_executor().submit(
+                generate_room_content, theme_id, room_id, room_info, dict(narrative_state or {})
+            )
+            while len(self._pending) > self.max_pending:
+                _, stale_future = self._pending.popitem(last=False)
+                stale_future.cancel()
+        return True
+
+    def take(self, session_id: int, room_id: str) -> PregeneratedRoom | None:
+        """
+        Removes and returns the pregenerated content for room_id if it is ready.
+        Never waits: unfinished jobs are cancelled and None is returned. A job
+        that has already started cannot be cancelled; it finishes in the
+        background and stores its description in the response cache, where the
+        caller's own generate_room_description (or a later one) finds it.
+        """
+        with self._lock:
+            future = self._pending.pop((session_id, room_id), None)
+        if future is None:
+            return None
+        if not future.done():
+            future.cancel()
+            return None
+        if future.cancelled() or future.exception() is not None:
+            if not future.cancelled():
+                logging.warning(f"Pregeneration for room {room_id} failed: {future.exception()}")
+            return None
+        return future.result()
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def shutdown(self, wait: bool = False) -> None:
+        with self._lock:
+            self._pending.clear()
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_pregeneration_worker() -> PregenerationWorker:
+    """
+    Returns the process-wide pregeneration worker (PREGENERATION_WORKERS threads).
+    """
+    global _worker
+    if _worker is None:
+        with _worker_lock:
+            if _worker is None:
+                _worker = PregenerationWorker(max_workers=int(os.environ.get("PREGENERATION_WORKERS", 2)))
+    return _worker
+
+
+def set_pregeneration_worker(worker: PregenerationWorker | None) -> None:
+    """
+    Replaces the process-wide worker (e.g. in tests), shutting down the previous one.
+    """
+    global _worker
+    with _worker_lock:
+        if _worker is not None and _worker is not worker:
+            _worker.shutdown()
+        _worker = worker
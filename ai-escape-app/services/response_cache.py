@@ -0,0 +1,218 @@
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Content-addressed cache for generated AI responses.
+#
+# Generation inputs repeat heavily (same theme, room, archetype and a small set of
+# narrative flags), so responses are stored under a hash of the normalized inputs.
+# Lookups go through an in-process LRU tier first and then, if configured
+# (RESPONSE_CACHE_DB), a SQLite tier that survives restarts and is shared by workers.
+
+# Bump to invalidate every stored response (e.g. when the prompts change)
+CACHE_KEY_VERSION = 1
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return " ".join(value.split()) # Collapse whitespace differences
+    if isinstance(value, dict):
+        return {str(key): _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def make_cache_key(kind: str, inputs: dict) -> str:
+    """
+    Returns a stable SHA-256 key for a generation kind and its inputs. Dict key
+    order and whitespace differences do not change the key.
+    """
+    canonical = json.dumps(_normalize(inputs), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{CACHE_KEY_VERSION}:{kind}:{canonical}".encode("utf-8")).hexdigest()
+
+
+class LRUTier:
+    """
+    Thread-safe in-process LRU of cache key -> response.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteTier:
+    """
+    Persistent tier. Entries older than ttl_seconds are treated as misses and
+    deleted; once the table holds more than max_entries rows, the oldest are evicted.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 86400, max_entries: int = 10000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_response_cache_created_at ON response_cache (created_at)"
+        )
+        self._connection.commit()
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, created_at FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if time.time() - row[1] > self.ttl_seconds:
+                self._connection.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                self._connection.commit()
+                return None
+            return json.loads(row[0])
+
+    def set(self, key: str, value) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time()),
+            )
+            self._connection.execute(
+                "DELETE FROM response_cache WHERE key IN ("
+                "SELECT key FROM response_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._connection.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM response_cache")
+            self._connection.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class ResponseCache:
+    """
+    Two-tier cache with hit/miss counters. Persistent hits are promoted to the LRU tier.
+    """
+
+    def __init__(self, memory_tier: LRUTier, persistent_tier: SQLiteTier | None = None):
+        self.memory_tier = memory_tier
+        self.persistent_tier = persistent_tier
+        self._counter_lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "persistent_hits": 0, "misses": 0, "stores": 0}
+
+    def _count(self, name: str) -> None:
+        with self._counter_lock:
+            self._counters[name] += 1
+
+    def get(self, key: str):
+        value = self.memory_tier.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return copy.deepcopy(value)
+        if self.persistent_tier is not None:
+            value = self.persistent_tier.get(key)
+            if value is not None:
+                self._count("persistent_hits")
+                self.memory_tier.set(key, value)
+                return copy.deepcopy(value)
+        self._count("misses")
+        return None
+
+    def set(self, key: str, value) -> None:
+        self._count("stores")
+        self.memory_tier.set(key, copy.deepcopy(value))
+        if self.persistent_tier is not None:
+            self.persistent_tier.set(key, value)
+
+    def stats(self) -> dict:
+        with self._counter_lock:
+            counters = dict(self._counters)
+        lookups = counters["memory_hits"] + counters["persistent_hits"] + counters["misses"]
+        counters["hit_rate"] = (lookups - counters["misses"]) / lookups if lookups else 0.0
+        counters["memory_entries"] = len(self.memory_tier)
+        counters["persistent_entries"] = len(self.persistent_tier) if self.persistent_tier is not None else None
+        return counters
+
+    def clear(self) -> None:
+        self.memory_tier.clear()
+        if self.persistent_tier is not None:
+            self.persistent_tier.clear()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def _create_default_cache() -> ResponseCache:
+    persistent_tier = None
+    database_path = os.environ.get("RESPONSE_CACHE_DB")
+    if database_path:
+        persistent_tier = SQLiteTier(
+            database_path,
+            ttl_seconds=float(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", 86400)),
+            max_entries=int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", 10000)),
+        )
+    return ResponseCache(LRUTier(int(os.environ.get("RESPONSE_CACHE_SIZE", 1024))), persistent_tier)
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Returns the process-wide response cache, configured from the environment on first use.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = _create_default_cache()
+    return _cache
+
+
+def set_response_cache(cache: ResponseCache | None) -> None:
+    """
+    Replaces the process-wide cache (e.g. in tests). Passing None makes the next
+    get_response_cache call build it from the environment again.
+    """
+    global _cache
+    with _cache_lock:
+        _cache = cache
@@ -0,0 +1,71 @@
+import copy
+import json
+
+# Compact op log used to store a saved game as a delta against the previous save.
+#
+# Ops are short JSON arrays so the stored delta stays small:
+#   ["s", path, value]  set the value at path (creating missing parents)
+#   ["d", path]         delete the key at path
+#   ["a", path, items]  extend the list at path (game_history, inventory, ...)
+# A path is a list of dict keys from the root of the state.
+
+SET, DELETE, APPEND = "s", "d", "a"
+
+
+def diff_state(old: dict, new: dict, path: list | None = None) -> list:
+    """
+    Returns the ops that turn old into new.
+    """
+    path = path or []
+    ops = []
+    for key, old_value in old.items():
+        if key not in new:
+            ops.append([DELETE, path + [key]])
+    for key, new_value in new.items():
+        key_path = path + [key]
+        if key not in old:
+            ops.append([SET, key_path, new_value])
+            continue
+        old_value = old[key]
+        if old_value == new_value:
+            continue
+        if isinstance(old_value, dict) and isinstance(new_value, dict):
+            ops.extend(diff_state(old_value, new_value, key_path))
+        elif (
+            isinstance(old_value, list)
+            and isinstance(new_value, list)
+            and len(new_value) > len(old_value)
+            and new_value[: len(old_value)] == old_value
+        ):
+            ops.append([APPEND, key_path, new_value[len(old_value):]])
+        else:
+            ops.append([SET, key_path, new_value])
+    return ops
+
+
+def apply_delta(state: dict, ops: list) -> dict:
+    """
+    Returns a copy of state with the ops applied.
+    """
+    state = copy.deepcopy(state)
+    for op in ops:
+        kind, path = op[0], op[1]
+        parent = state
+        for key in path[:-1]:
+            parent = parent.setdefault(key, {})
+        if kind == SET:
+            parent[path[-1]] = copy.deepcopy(op[2])
+        elif kind == DELETE:
+            parent.pop(path[-1], None)
+        elif kind == APPEND:
+            parent.setdefault(path[-1], []).extend(copy.deepcopy(op[2]))
+        else:
+            raise ValueError(f"Unknown saved game delta op: {kind}")
+    return state
+
+
+def encoded_size(value) -> int:
+    """
+    Size in bytes of value as stored in a JSON column.
+    """
+    return len(json.dumps(value, separators=(",", ":")).encode("utf-8"))
@@ -0,0 +1,148 @@
+import logging
+from datetime import datetime, timezone
+from typing import Callable, NamedTuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from models import GameSession, SavedGame
+
+# Schema migrations for databases created before a model change.
+#
+# Alembic-style: each migration has a revision id and the id it follows
+# (down_revision), and the applied revisions are recorded in the
+# schema_migrations table. create_app runs upgrade_schema() after create_all.
+# create_all creates missing tables (with their indexes) but never alters
+# existing ones. Migrations are written to be no-ops on a database that
+# create_all already built with the current schema, so a fresh database is
+# simply stamped.
+#
+# Run by hand against DATABASE_URL with:
+#     python -m services.schema_migrations
+
+
+class Migration(NamedTuple):
+    revision: str
+    down_revision: str | None
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def _column_names(connection: Connection, table_name: str) -> set[str]:
+    return {column["name"] for column in inspect(connection).get_columns(table_name)}
+
+
+def _upgrade_saved_game_deltas(connection: Connection) -> None:
+    """
+    Adds base_save_id, state_delta and keyframe_distance to saved_games and
+    makes game_state nullable (delta saves store no full state).
+    """
+    if "state_delta" in _column_names(connection, "saved_games"):
+        return
+
+    if connection.dialect.name == "sqlite":
+        # SQLite cannot drop a NOT NULL constraint in place: rebuild the table
+        connection.execute(text("ALTER TABLE saved_games RENAME TO _saved_games_pre_delta"))
+        SavedGame.__table__.create(connection)
+        connection.execute(text(
+            "INSERT INTO saved_games (id, player_id, session_id, save_name, saved_at, game_state, keyframe_distance) "
+            "SELECT id, player_id, session_id, save_name, saved_at, game_state, 0 FROM _saved_games_pre_delta"
+        ))
+        connection.execute(text("DROP TABLE _saved_games_pre_delta"))
+    else:
+        connection.execute(text("ALTER TABLE saved_games ADD COLUMN base_save_id INTEGER REFERENCES saved_games (id)"))
+        connection.execute(text("ALTER TABLE saved_games ADD COLUMN state_delta JSON"))
+        connection.execute(text("ALTER TABLE saved_games ADD COLUMN keyframe_distance INTEGER DEFAULT 0"))
+        connection.execute(text("ALTER TABLE saved_games ALTER COLUMN game_state DROP NOT NULL"))
+
+
+def _upgrade_player_scoped_indexes(connection: Connection) -> None:
+    """
+    Creates ix_game_sessions_player_id, ix_saved_games_session_id and
+    ix_saved_games_player_id_saved_at (player_id, saved_at DESC).
+    """
+    for table in (GameSession.__table__, SavedGame.__table__):
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+def _upgrade_saved_game_summaries(connection: Connection) -> None:
+    """
+    Adds saved_games.summary and backfills it for existing saves, so the saved
+    games listing never has to read or rebuild saved states.
+    """
+    if "summary" not in _column_names(connection, "saved_games"):
+        connection.execute(text("ALTER TABLE saved_games ADD COLUMN summary JSON"))
+
+    from services.game_logic import build_save_summary, get_saved_game_states # Deferred: heavy import
+
+    db_session = Session(bind=connection)
+    saved_games = db_session.query(SavedGame).filter(SavedGame.summary.is_(None)).order_by(SavedGame.id).all()
+    states = get_saved_game_states(db_session, saved_games)
+    for saved_game in saved_games:
+        if states.get(saved_game.id) is not None:
+            saved_game.summary = build_save_summary(states[saved_game.id])
+    db_session.flush()
+    db_session.close()
+
+
+def _upgrade_session_revisions(connection: Connection) -> None:
+    """
+    Adds game_sessions.revision, the per-session change counter behind the session ETag.
+    """
+    if "revision" not in _column_names(connection, "game_sessions"):
+        connection.execute(text("ALTER TABLE game_sessions ADD COLUMN revision INTEGER NOT NULL DEFAULT 0"))
+
+
+MIGRATIONS = [
+    Migration("0001_saved_game_deltas", None, "Delta-encoded saved games", _upgrade_saved_game_deltas),
+    Migration("0002_player_scoped_indexes", "0001_saved_game_deltas", "Player-scoped lookup indexes", _upgrade_player_scoped_indexes),
+    Migration("0003_saved_game_summaries", "0002_player_scoped_indexes", "Saved game listing summaries", _upgrade_saved_game_summaries),
+    Migration("0004_session_revisions", "0003_saved_game_summaries", "Session revision counter", _upgrade_session_revisions),
+]
+
+
+def _ensure_version_table(connection: Connection) -> None:
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations (revision VARCHAR PRIMARY KEY, applied_at VARCHAR NOT NULL)"
+    ))
+
+
+def applied_revisions(engine: Engine) -> list[str]:
+    with engine.begin() as connection:
+        _ensure_version_table(connection)
+        return [row[0] for row in connection.execute(text("SELECT revision FROM schema_migrations ORDER BY revision"))]
+
+
+def upgrade_schema(engine: Engine) -> list[str]:
+    """
+    Applies every migration not yet recorded in schema_migrations, in order,
+    each in its own transaction. Returns the revisions that were applied.
+    """
+    applied = set(applied_revisions(engine))
+    newly_applied = []
+    for migration in MIGRATIONS:
+        if migration.revision in applied:
+            continue
+        with engine.begin() as connection:
+            migration.upgrade(connection)
+            connection.execute(
+                text("INSERT INTO schema_migrations (revision, applied_at) VALUES (:revision, :applied_at)"),
+                {"revision": migration.revision, "applied_at": datetime.now(timezone.utc).isoformat()},
+            )
+        logging.info(f"Applied schema migration {migration.revision}: {migration.description}")
+        newly_applied.append(migration.revision)
+    return newly_applied
+
+
+if __name__ == "__main__":
+    import os
+    from sqlalchemy import create_engine
+    from models import Base
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    engine = create_engine(os.environ.get("DATABASE_URL") or "sqlite:///default.db")
+    Base.metadata.create_all(engine)
+    applied = upgrade_schema(engine)
+    print(f"Applied: {', '.join(applied) if applied else 'nothing (schema is up to date)'}")
@@ -0,0 +1,373 @@
+import atexit
+import copy
+import logging
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+
+from sqlalchemy import inspect, update
+from sqlalchemy.orm import Session
+
+from models import GameSession
+
+# Write-behind cache of active GameSession state.
+#
+# Every player action reads the session's game_sessions row and writes it back,
+# and an active session is touched every few seconds. In write_behind mode the
+# session is loaded once, kept in memory (detached from any request's database
+# session) and changed there; commit() only marks it dirty and queues any new
+# rows (puzzle attempts). Dirty sessions are written back:
+#   - every SESSION_FLUSH_INTERVAL_SECONDS by a background thread,
+#   - immediately when a change is a checkpoint (the player changed room),
+#   - before a save (save_game_state flushes the session first),
+#   - when a dirty session is evicted, and at interpreter shutdown.
+# A crash loses at most the changes since the last flush. The cache is per
+# process, so write_behind assumes a session's requests reach the same process.
+# Concurrent requests for one session share the cached object, so game_logic
+# holds session_lock() around each read-modify-commit and transaction() holds
+# it for its whole block.
+#
+# In write_through mode (the default) nothing is cached: get() queries and
+# commit() commits, exactly as before.
+#
+# transaction() groups the commits of several actions into one database
+# transaction (see player_action_batch).
+
+WRITE_THROUGH = "write_through"
+WRITE_BEHIND = "write_behind"
+DURABILITY_MODES = (WRITE_THROUGH, WRITE_BEHIND)
+
+# Every mapped column except the primary key is written back on flush
+_FLUSHED_COLUMNS = tuple(attr.key for attr in inspect(GameSession).column_attrs if attr.key != "id")
+
+# db_session.info key of the open transaction(): the ids of sessions to checkpoint at its end
+_TRANSACTION_KEY = "session_cache_transaction"
+
+# Sessions are mapped onto a fixed set of locks; two sessions sharing one only wait for each other
+_SESSION_LOCK_STRIPES = 64
+
+
+def _next_revision(game_session: GameSession):
+    # A stored row is bumped by the UPDATE itself (revision = revision + 1): every
+    # write_through request holds its own copy of the row, and two of them adding
+    # 1 in Python would give two different states the same revision (and ETag).
+    if inspect(game_session).persistent:
+        return GameSession.revision + 1
+    return (game_session.revision or 0) + 1
+
+
+class _CachedSession:
+    __slots__ = ("game_session", "bind", "dirty", "pending_rows", "in_transaction")
+
+    def __init__(self, game_session: GameSession, bind):
+        self.game_session = game_session
+        self.bind = bind
+        self.dirty = False
+        self.pending_rows = []
+        self.in_transaction = False
+
+
+class SessionStateCache:
+    """
+    Per-process cache of GameSession objects with dirty tracking and batched write-back.
+    """
+
+    def __init__(self, mode: str = WRITE_THROUGH, flush_interval_seconds: float = 5.0, max_entries: int = 10000):
+        if mode not in DURABILITY_MODES:
+            raise ValueError(f"Unknown session durability mode '{mode}'. Expected one of: {', '.join(DURABILITY_MODES)}")
+        self.mode = mode
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock() # One write-back at a time keeps row order per session
+        self._session_locks = tuple(threading.RLock() for _ in range(_SESSION_LOCK_STRIPES))
+        self._stop = threading.Event()
+        self._timer = None
+        self.hits = 0
+        self.misses = 0
+        self.flushes = 0
+        self.sessions_flushed = 0
+
+    @property
+    def write_behind(self) -> bool:
+        return self.mode == WRITE_BEHIND
+
+    def session_lock(self, db_session: Session, session_id: int):
+        """
+        Returns the (reentrant) lock to hold while reading, changing and committing
+        a session. In write_through mode every request loads its own GameSession,
+        so this is a no-op context.
+        """
+        if not self.write_behind:
+            return nullcontext()
+        return self._session_locks[hash((db_session.get_bind(), session_id)) % len(self._session_locks)]
+
+    def get(self, db_session: Session, session_id: int) -> GameSession | None:
+        """
+        Returns the GameSession with session_id, from memory in write_behind mode.
+        """
+        if not self.write_behind:
+            return db_session.query(GameSession).filter(GameSession.id == session_id).first()
+
+        key = (db_session.get_bind(), session_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.game_session
+
+        game_session = db_session.query(GameSession).filter(GameSession.id == session_id).first()
+        if game_session is None:
+            return None
+        db_session.expunge(game_session) # Lives in the cache now, not in the request's session
+
+        with self._lock:
+            self.misses += 1
+            entry = self._entries.get(key)
+            if entry is None: # Another request may have loaded it meanwhile; keep the first copy
+                entry = self._entries[key] = _CachedSession(game_session, key[0])
+            evicted = self._evict_overflow()
+        self._start_timer()
+        if evicted:
+            self._write_back(evicted)
+        return entry.game_session
+
+    def commit(self, db_session: Session, game_session: GameSession, new_rows=(), checkpoint: bool = False,
+               changed: bool = True) -> None:
+        """
+        Persists the changes made to game_session (plus new_rows, e.g. PuzzleAttempt
+        objects) and, if changed, bumps its revision (only a change to the session
+        itself makes cached copies and ETags stale). In write_behind mode this only
+        marks the session dirty, unless checkpoint is set, in which case it is written
+        back immediately. Inside transaction() nothing is committed until it ends.
+        """
+        checkpoints = db_session.info.get(_TRANSACTION_KEY)
+        with self._lock:
+            entry = self._entries.get((db_session.get_bind(), game_session.id)) if self.write_behind else None
+            if entry is not None and entry.game_session is game_session:
+                if changed: # The one shared copy, changed under session_lock()
+                    game_session.revision = (game_session.revision or 0) + 1
+                entry.dirty = True
+                entry.pending_rows.extend(new_rows)
+            else:
+                entry = None
+
+        if entry is None: # Write-through, or an object this cache does not own
+            if changed:
+                game_session.revision = _next_revision(game_session)
+            db_session.add(game_session)
+            db_session.add_all(new_rows)
+            if checkpoints is None:
+                db_session.commit()
+            else:
+                db_session.flush() # Statements now, commit (or rollback) when the transaction ends
+            return
+
+        if checkpoints is not None:
+            if checkpoint:
+                checkpoints.add(game_session.id)
+            return
+        db_session.commit() # Anything else the caller added to the request's session
+        if checkpoint:
+            self.flush_session(db_session, game_session.id)
+
+    @contextmanager
+    def transaction(self, db_session: Session, session_id: int):
+        """
+        Makes every commit() of db_session inside the block part of one transaction,
+        committed when the block ends. If the block raises, the transaction is rolled
+        back and, in write_behind mode, the session's cached state (changed in place)
+        is dropped so it is reloaded from the database. Other requests for the
+        session wait until the block ends.
+        """
+        with self.session_lock(db_session, session_id):
+            if _TRANSACTION_KEY in db_session.info:
+                raise RuntimeError("A session cache transaction is already open on this database session.")
+            entry = None
+            if self.write_behind:
+                self.flush_session(db_session, session_id) # Changes from before the block must survive a rollback
+                if self.get(db_session, session_id) is not None:
+                    with self._lock:
+                        entry = self._entries.get((db_session.get_bind(), session_id))
+                        if entry is not None:
+                            entry.in_transaction = True # The flush thread leaves it alone until the end
+            checkpoints = db_session.info[_TRANSACTION_KEY] = set()
+            try:
+                yield
+            except BaseException:
+                del db_session.info[_TRANSACTION_KEY]
+                db_session.rollback()
+                if self.write_behind:
+                    self.discard(db_session, session_id)
+                raise
+            del db_session.info[_TRANSACTION_KEY]
+            if entry is not None:
+                with self._lock:
+                    entry.in_transaction = False
+            db_session.commit()
+            for checkpointed_id in checkpoints:
+                self.flush_session(db_session, checkpointed_id)
+
+    def flush(self) -> int:
+        """
+        Writes back every dirty session. Returns the number of sessions written.
+        """
+        with self._lock:
+            batch = [self._take_changes(entry) for entry in self._entries.values() if entry.dirty and not entry.in_transaction]
+        return self._write_back(batch)
+
+    def flush_session(self, db_session: Session, session_id: int) -> int:
+        """
+        Writes back one session if it is dirty. Returns the number of sessions written (0 or 1).
+        """
+        with self._lock:
+            entry = self._entries.get((db_session.get_bind(), session_id))
+            batch = [self._take_changes(entry)] if entry is not None and entry.dirty else []
+        return self._write_back(batch)
+
+    def discard(self, db_session: Session, session_id: int) -> None:
+        """
+        Forgets a session without writing back its pending changes (e.g. before deleting it).
+        """
+        with self._lock:
+            self._entries.pop((db_session.get_bind(), session_id), None)
+
+    def clear(self) -> None:
+        """
+        Writes back everything and empties the cache.
+        """
+        self.flush()
+        with self._lock:
+            self._entries.clear()
+
+    def dirty_count(self) -> int:
+        with self._lock:
+            return sum(1 for entry in self._entries.values() if entry.dirty)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "entries": len(self._entries),
+                "dirty": sum(1 for entry in self._entries.values() if entry.dirty),
+                "hits": self.hits,
+                "misses": self.misses,
+                "flushes": self.flushes,
+                "sessions_flushed": self.sessions_flushed,
+            }
+
+    def close(self) -> None:
+        """
+        Stops the flush thread and writes back every dirty session.
+        """
+        self._stop.set()
+        timer, self._timer = self._timer, None
+        if timer is not None and timer is not threading.current_thread():
+            timer.join()
+        try:
+            self.flush()
+        except Exception as e:
+            logging.error(f"Failed to write back cached game sessions on shutdown: {e}")
+
+    def _take_changes(self, entry: _CachedSession) -> tuple:
+        # Called with self._lock held: snapshot the columns so the write-back
+        # does not race with requests still changing the cached object.
+        game_session = entry.game_session
+        values = {column: copy.deepcopy(getattr(game_session, column)) for column in _FLUSHED_COLUMNS}
+        rows, entry.pending_rows = entry.pending_rows, []
+        entry.dirty = False
+        return entry, game_session.id, values, rows
+
+    def _evict_overflow(self) -> list:
+        # Called with self._lock held
+        evicted = []
+        while len(self._entries) > self.max_entries:
+            _, entry = self._entries.popitem(last=False)
+            if entry.dirty:
+                evicted.append(self._take_changes(entry))
+        return evicted
+
+    def _write_back(self, batch: list) -> int:
+        if not batch:
+            return 0
+        with self._flush_lock:
+            by_bind = {}
+            for item in batch:
+                by_bind.setdefault(item[0].bind, []).append(item)
+            for bind, items in by_bind.items():
+                try:
+                    with Session(bind=bind) as db_session:
+                        for _, session_id, values, rows in items:
+                            db_session.execute(update(GameSession).where(GameSession.id == session_id).values(**values))
+                            db_session.add_all(rows)
+                        db_session.commit()
+                except Exception:
+                    self._requeue(items)
+                    raise
+            with self._lock:
+                self.flushes += 1
+                self.sessions_flushed += len(batch)
+        return len(batch)
+
+    def _requeue(self, items: list) -> None:
+        with self._lock:
+            for entry, _, _, rows in items:
+                entry.dirty = True
+                entry.pending_rows[:0] = rows
+
+    def _start_timer(self) -> None:
+        if self._timer is not None or not self.flush_interval_seconds or self._stop.is_set():
+            return
+        with self._lock:
+            if self._timer is None:
+                self._timer = threading.Thread(target=self._run_timer, name="session-cache-flush", daemon=True)
+                self._timer.start()
+
+    def _run_timer(self) -> None:
+        while not self._stop.wait(self.flush_interval_seconds):
+            try:
+                self.flush()
+            except Exception as e:
+                logging.error(f"Periodic write-back of cached game sessions failed: {e}")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_session_cache() -> SessionStateCache:
+    """
+    Returns the process-wide session cache, configured by SESSION_DURABILITY
+    (write_through or write_behind), SESSION_FLUSH_INTERVAL_SECONDS and
+    SESSION_CACHE_MAX_ENTRIES.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SessionStateCache(
+                    mode=os.environ.get("SESSION_DURABILITY", WRITE_THROUGH).strip().lower(),
+                    flush_interval_seconds=float(os.environ.get("SESSION_FLUSH_INTERVAL_SECONDS", 5.0)),
+                    max_entries=int(os.environ.get("SESSION_CACHE_MAX_ENTRIES", 10000)),
+                )
+                atexit.register(_close_cache)
+    return _cache
+
+
+def set_session_cache(cache: SessionStateCache | None) -> None:
+    """
+    Replaces the process-wide cache (e.g. in tests), writing back and closing the previous one.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is not None and _cache is not cache:
+            _cache.close()
+        _cache = cache
+
+
+def _close_cache() -> None:
+    if _cache is not None:
+        _cache.close()
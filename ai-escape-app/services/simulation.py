@@ -0,0 +1,181 @@
+import time
+from collections import defaultdict
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+
+from models import Base
+from data.rooms import ROOM_DATA, PUZZLE_SOLUTIONS
+from services.game_logic import (
+    create_game_session,
+    get_a_hint,
+    get_contextual_option_entries,
+    player_action,
+    solve_puzzle,
+    update_player_inventory,
+    use_item,
+)
+
+# Headless game simulation: scripted players drive game_logic directly (no
+# Flask, an in-memory SQLite database) through every theme in ROOM_DATA, and
+# each call is timed and its SQL statements counted.
+#
+# Per room the scripted player looks around (player_action), asks for a hint
+# (get_a_hint; later hints hit the session cooldown), makes one wrong attempt
+# (solve_puzzle), tries its item on the puzzle (use_item), solves every puzzle
+# with the answer from PUZZLE_SOLUTIONS (or the puzzle's own solution) and
+# takes the "Go to" option to the next room. tests/benchmarks runs this under
+# pytest-benchmark.
+
+WRONG_ATTEMPT = "not the answer"
+SIMULATION_ITEM = "pocket_lamp" # Picked up at the start so use_item has something to use
+MAX_ROOMS_PER_GAME = 50 # Guards against a room cycle in the theme data
+
+
+def puzzle_solution(puzzle_id: str, puzzle_definition: dict) -> str:
+    """
+    The answer the scripted solver types for a puzzle.
+    """
+    solution = PUZZLE_SOLUTIONS.get(puzzle_id) or puzzle_definition.get("solution", "")
+    return "".join(solution) if isinstance(solution, list) else solution
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    # Nearest-rank percentile of an already sorted list
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class SimulationReport:
+    """
+    Latencies and statement counts of every game_logic call made by a simulation.
+    """
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statements = defaultdict(int)
+        self.elapsed = 0.0
+        self.games = 0
+        self.games_completed = 0
+
+    def record(self, operation: str, seconds: float, statements: int) -> None:
+        self.latencies[operation].append(seconds)
+        self.statements[operation] += statements
+        self.elapsed += seconds
+
+    @property
+    def actions(self) -> int:
+        return sum(len(latencies) for latencies in self.latencies.values())
+
+    @property
+    def actions_per_second(self) -> float:
+        return self.actions / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def statements_per_action(self) -> float:
+        return sum(self.statements.values()) / self.actions if self.actions else 0.0
+
+    def operation_summary(self, operation: str) -> dict:
+        latencies = sorted(self.latencies[operation])
+        return {
+            "calls": len(latencies),
+            "p50_ms": _percentile(latencies, 0.50) * 1000,
+            "p99_ms": _percentile(latencies, 0.99) * 1000,
+            "statements_per_call": self.statements[operation] / len(latencies) if latencies else 0.0,
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "games": self.games,
+            "games_completed": self.games_completed,
+            "actions": self.actions,
+            "actions_per_second": self.actions_per_second,
+            "statements_per_action": self.statements_per_action,
+            "operations": {operation: self.operation_summary(operation) for operation in sorted(self.latencies)},
+        }
+
+
+class GameSimulation:
+    """
+    Plays scripted games against one database, recording into self.report.
+    Without a db_session, an in-memory SQLite database is created.
+    """
+
+    def __init__(self, db_session: Session = None):
+        if db_session is None:
+            engine = create_engine("sqlite:///:memory:")
+            Base.metadata.create_all(engine)
+            db_session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+        self.db_session = db_session
+        self.report = SimulationReport()
+        self._statements = 0
+        event.listen(db_session.get_bind(), "before_cursor_execute", self._count_statement)
+
+    def close(self) -> None:
+        event.remove(self.db_session.get_bind(), "before_cursor_execute", self._count_statement)
+
+    def _count_statement(self, conn, cursor, statement, parameters, context, executemany):
+        self._statements += 1
+
+    def _call(self, operation: str, function, *args):
+        statements = self._statements
+        start = time.perf_counter()
+        result = function(self.db_session, *args)
+        self.report.record(operation, time.perf_counter() - start, self._statements - statements)
+        return result
+
+    def play_theme(self, theme_id: str, player_id: str = "simulated_player") -> bool:
+        """
+        Plays one game of theme_id from its start room. Returns True if every
+        puzzle on the way was solved and the last room was reached.
+        """
+        game_session, error = self._call("create_game_session", create_game_session, player_id, theme_id, ROOM_DATA[theme_id]["start_room"])
+        if error:
+            raise ValueError(error)
+        self.report.games += 1
+        session_id = game_session.id
+        self._call("update_player_inventory", update_player_inventory, session_id, SIMULATION_ITEM, "add")
+
+        for _ in range(MAX_ROOMS_PER_GAME):
+            room_id = game_session.current_room
+            puzzles = ROOM_DATA[theme_id]["rooms"][room_id].get("puzzles", {})
+            options = get_contextual_option_entries(game_session)
+
+            look_around = next((option for option in options if option.action_type == "interact"), None)
+            if look_around:
+                self._call("player_action", player_action, session_id, look_around.label)
+            self._call("get_a_hint", get_a_hint, session_id)
+            first_puzzle_id = next(iter(puzzles), None)
+            if first_puzzle_id:
+                self._call("solve_puzzle", solve_puzzle, session_id, first_puzzle_id, WRONG_ATTEMPT)
+                self._call("use_item", use_item, session_id, SIMULATION_ITEM, first_puzzle_id)
+
+            for puzzle_id, puzzle_definition in puzzles.items():
+                if game_session.current_room != room_id: # Solving the door puzzle already moved the player on
+                    break
+                is_solved, _, game_session, _ = self._call(
+                    "solve_puzzle", solve_puzzle, session_id, puzzle_id, puzzle_solution(puzzle_id, puzzle_definition)
+                )
+                if not is_solved:
+                    return False
+
+            if game_session.current_room == room_id:
+                move = next((option for option in get_contextual_option_entries(game_session) if option.action_type == "move"), None)
+                if move is None:
+                    break # Last room
+                is_successful, _, game_session, _ = self._call("player_action", player_action, session_id, move.label)
+                if not is_successful:
+                    return False
+
+        self.report.games_completed += 1
+        return True
+
+    def play_all_themes(self, games_per_theme: int = 1) -> SimulationReport:
+        """
+        Plays games_per_theme games of every theme in ROOM_DATA.
+        """
+        for theme_id in ROOM_DATA:
+            for game in range(games_per_theme):
+                self.play_theme(theme_id, f"simulated_{theme_id}_{game}")
+        return self.report
@@ -0,0 +1,102 @@
+from datetime import datetime, timezone
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
+from models import GameSession, PuzzleAttempt
+from services.session_cache import get_session_cache
+
+# Longest normalized action stored per attempt (puzzle_attempts.action)
+MAX_ATTEMPT_ACTION_LENGTH = 64
+
+
+class ActionUnitOfWork:
+    """
+    Collects every state change produced by a single player action
+    (puzzle state, inventory deltas, narrative flags, room move, attempt log rows)
+    on working copies of the session's JSON columns, and writes them back in one commit.
+    Because all changes land on the same GameSession object before the flush,
+    SQLAlchemy emits a single UPDATE for the game_sessions row.
+    """
+
+    def __init__(self, db_session: Session, game_session: GameSession):
+        self.db_session = db_session
+        self.game_session = game_session
+        self.inventory = list(game_session.inventory or [])
+        self.narrative_state = dict(game_session.narrative_state or {})
+        self.puzzle_state = dict(game_session.puzzle_state or {})
+        self.game_history = list(game_session.game_history or [])
+        self.current_room = game_session.current_room
+        self.current_room_description = game_session.current_room_description
+        self._dirty = set()
+        self._attempts = []
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self._dirty or self._attempts)
+
+    def add_item(self, item: str) -> None:
+        if item not in self.inventory:
+            self.inventory.append(item)
+            self._dirty.add("inventory")
+
+    def remove_item(self, item: str) -> None:
+        if item in self.inventory:
+            self.inventory.remove(item)
+            self._dirty.add("inventory")
+
+    def set_puzzle_state(self, puzzle_id: str, state: dict) -> None:
+        self.puzzle_state[puzzle_id] = state
+        self._dirty.add("puzzle_state")
+
+    def set_narrative_flags(self, flags: dict) -> None:
+        if flags:
+            self.narrative_state.update(flags)
+            self._dirty.add("narrative_state")
+
+    def record_attempt(self, puzzle_id: str, action: str, is_correct: bool, hint_given: bool) -> None:
+        """
+        Queues a row for the append-only puzzle_attempts log.
+        """
+        self._attempts.append(
+            PuzzleAttempt(
+                session_id=self.game_session.id,
+                puzzle_id=puzzle_id,
+                attempted_at=datetime.now(timezone.utc),
+                action=(action or "")[:MAX_ATTEMPT_ACTION_LENGTH],
+                is_correct=bool(is_correct),
+                hint_given=bool(hint_given),
+            )
+        )
+
+    def move_to(self, room_id: str, room_description: str) -> None:
+        """
+        Moves the player to room_id, recording the room they are leaving in game_history.
+        """
+        self.game_history.append(self.current_room)
+        self.current_room = room_id
+        self.current_room_description = room_description
+        self._dirty.update(("game_history", "current_room", "current_room_description"))
+
+    def commit(self, checkpoint: bool = False) -> GameSession:
+        """
+        Applies the collected changes to the GameSession and commits them together.
+        Does nothing (and issues no statements) if the action changed nothing.
+        In write_behind mode the commit goes to the session cache, and only a
+        room change or a checkpoint (e.g. a completed room) is written back immediately.
+        """
+        if not self.has_changes:
+            return self.game_session
+
+        if self._dirty:
+            for column in self._dirty:
+                setattr(self.game_session, column, getattr(self, column))
+                if column in ("inventory", "puzzle_state", "narrative_state", "game_history"):
+                    flag_modified(self.game_session, column) # Explicitly flag JSON fields as modified
+            self.game_session.last_updated = datetime.now(timezone.utc)
+
+        get_session_cache().commit(
+            self.db_session, self.game_session, new_rows=self._attempts,
+            checkpoint=checkpoint or "current_room" in self._dirty, changed=bool(self._dirty),
+        )
+        self._dirty.clear()
+        self._attempts = []
+        return self.game_session
@@ -1,6 +1,5 @@
 let lastPage = 'start';
 let loadingInterval;
-let hintCooldownInterval;
 let gameTimerInterval;
 let selectedDifficulty = 'normal';
 let selectedAmbianceText = 'mysterious'; // Default to mysterious
@@ -229,6 +228,152 @@ function applyTranslations() {
             // This function might be removed or repurposed later if no other client-side init is needed.
         }
 
+        // Latest state of the session on this page: the events stream's initial
+        // "state", patched in place by the deltas that follow it.
+        let currentGameState = null;
+        let gameEventSource = null;
+        let hintCooldownEndsAt = 0; // Date.now() at which the running hint cooldown ends
+
+        function startGameClock() {
+            // A single clock per page; it also counts down the hint cooldown
+            if (gameTimerInterval) return;
+            const timerInitialOffset = Date.now(); // Store the time when the timer actually starts running
+            gameTimerInterval = setInterval(() => {
+                const nowMs = Date.now();
+                const elapsedSeconds = Math.floor((nowMs - timerInitialOffset) / 1000); // Calculate elapsed from when this interval started
+                const timerElement = document.querySelector('.game-timer');
+                if (timerElement) {
+                    timerElement.textContent = `TIME: ${formatTime(elapsedSeconds)}`;
+                }
+                renderHintCountdown();
+            }, 1000);
+        }
+
+        function renderRoom(gameData) {
+            const immersiveTextBox = document.querySelector('.immersive-text-box');
+            if (immersiveTextBox) {
+                immersiveTextBox.querySelector('h3').textContent = gameData.current_room_name;
+                immersiveTextBox.querySelector('p').textContent = gameData.current_room_description;
+            }
+            document.querySelector('.current-location-subtext').innerHTML = `${tr('current_location')}: ${gameData.current_room_name}`;
+
+            // Update background image
+            const backgroundContainer = document.getElementById('background-container');
+            if (backgroundContainer && gameData.current_room_image) {
+                backgroundContainer.style.backgroundImage = `url(${gameData.current_room_image})`;
+            } else if (backgroundContainer) {
+                backgroundContainer.style.backgroundImage = "url('/static/images/start_page_image_2.jpg')"; // Fallback
+            }
+        }
+
+        function renderOptions(contextualOptions) {
+            const immersiveOptions = document.querySelector('.immersive-text-box .immersive-options');
+            if (!immersiveOptions) return;
+            immersiveOptions.innerHTML = '';
+            contextualOptions.forEach((option, index) => {
+                const div = document.createElement('div');
+                div.classList.add('immersive-option');
+                // Use tr() for options if they are translatable keys, otherwise display directly
+                div.textContent = `${index + 1}. ${option}`; // Options are dynamic from backend, not directly translatable keys
+                div.dataset.optionIndex = index; // Store index for interaction
+                immersiveOptions.appendChild(div);
+            });
+        }
+
+        function renderInventory(inventory) {
+            const inventoryList = document.getElementById('inventory-list');
+            if (!inventoryList) return;
+            inventoryList.innerHTML = '';
+            if (inventory && inventory.length > 0) {
+                inventory.forEach(item => {
+                    const li = document.createElement('li');
+                    li.textContent = item;
+                    inventoryList.appendChild(li);
+                });
+            } else {
+                inventoryList.innerHTML = '<li>Empty</li>';
+            }
+        }
+
+        function renderGameState(gameData) {
+            renderRoom(gameData);
+            renderOptions(gameData.contextual_options);
+            document.getElementById('objective-text').textContent = gameData.objective_display_text;
+            renderInventory(gameData.inventory);
+
+            // Render hint state based on backend data
+            renderHint(gameData);
+            if (gameData.remaining_hint_cooldown > 0) {
+                startHintCooldown(gameData.remaining_hint_cooldown);
+            }
+        }
+
+        // Deltas pushed on /game_session/<id>/events (see services/game_events.py)
+        const GAME_EVENT_HANDLERS = {
+            state: (data) => {
+                currentGameState = data;
+                renderGameState(data);
+                startGameClock();
+            },
+            room_changed: (data) => {
+                Object.assign(currentGameState, data);
+                renderRoom(currentGameState);
+            },
+            inventory_changed: (data) => {
+                currentGameState.inventory = currentGameState.inventory
+                    .filter(item => !data.removed.includes(item))
+                    .concat(data.added.filter(item => !currentGameState.inventory.includes(item)));
+                renderInventory(currentGameState.inventory);
+            },
+            puzzle_solved: (data) => {
+                data.puzzle_ids.forEach(puzzleId => {
+                    currentGameState.puzzle_state[puzzleId] = { ...(currentGameState.puzzle_state[puzzleId] || {}), solved: true };
+                });
+            },
+            options_changed: (data) => {
+                currentGameState.contextual_options = data.contextual_options;
+                renderOptions(data.contextual_options);
+            },
+            hint_status_changed: (data) => {
+                // Keeps the hint text on screen; only the budget and cooldown change
+                Object.assign(currentGameState, data);
+                const hintBudget = document.getElementById('hint-budget');
+                if (hintBudget) hintBudget.textContent = `x${data.hints_remaining}`;
+                if (data.remaining_hint_cooldown > 0) {
+                    startHintCooldown(data.remaining_hint_cooldown);
+                }
+            },
+            hint_cooldown_ended: (data) => {
+                Object.assign(currentGameState, data);
+                hintCooldownEndsAt = 0;
+                renderHint(currentGameState);
+            },
+            state_reset: (data, sessionId) => {
+                // We fell behind the stream: reconnect for a fresh state
+                gameEventSource.close();
+                connectGameEvents(sessionId);
+            },
+        };
+
+        function connectGameEvents(sessionId) {
+            if (!window.EventSource) {
+                fetchAndRenderGameImmersive(); // No streaming support: fetch the state after each action instead
+                return;
+            }
+            gameEventSource = new EventSource(`/game_session/${sessionId}/events`);
+            Object.entries(GAME_EVENT_HANDLERS).forEach(([eventType, handler]) => {
+                gameEventSource.addEventListener(eventType, (e) => {
+                    const data = JSON.parse(e.data);
+                    if (eventType === 'state' || currentGameState) {
+                        handler(data, sessionId);
+                    }
+                });
+            });
+            gameEventSource.onerror = () => {
+                console.warn('Game event stream interrupted; the browser reconnects and sends a fresh state.');
+            };
+        }
+
         async function fetchAndRenderGameImmersive() {
             // Extract sessionId from URL pathname
             const pathParts = window.location.pathname.split('/');
@@ -246,67 +391,9 @@ function applyTranslations() {
                 }
                 const gameData = await response.json();
                 console.log('Game data received:', gameData);
-
-                if (gameTimerInterval) clearInterval(gameTimerInterval);
-                const timerInitialOffset = Date.now(); // Store the time when the timer actually starts running
-                gameTimerInterval = setInterval(() => {
-                    const nowMs = Date.now();
-                    const elapsedSeconds = Math.floor((nowMs - timerInitialOffset) / 1000); // Calculate elapsed from when this interval started
-                    const timerElement = document.querySelector('.game-timer');
-                    if (timerElement) {
-                        timerElement.textContent = `TIME: ${formatTime(elapsedSeconds)}`;
-                    }
-                }, 1000);
-                
-                // Update narrative and options
-                const immersiveTextBox = document.querySelector('.immersive-text-box');
-                if (immersiveTextBox) {
-                    immersiveTextBox.querySelector('h3').textContent = gameData.current_room_name;
-                    immersiveTextBox.querySelector('p').textContent = gameData.current_room_description;
-                    const immersiveOptions = immersiveTextBox.querySelector('.immersive-options');
-                    immersiveOptions.innerHTML = '';
-                    gameData.contextual_options.forEach((option, index) => {
-                        const div = document.createElement('div');
-                        div.classList.add('immersive-option');
-                        // Use tr() for options if they are translatable keys, otherwise display directly
-                        div.textContent = `${index + 1}. ${option}`; // Options are dynamic from backend, not directly translatable keys
-                        div.dataset.optionIndex = index; // Store index for interaction
-                        immersiveOptions.appendChild(div);
-                    });
-                }
-
-                // Update game status (objective, inventory)
-                document.getElementById('objective-text').textContent = gameData.objective_display_text;
-                document.querySelector('.current-location-subtext').innerHTML = `${tr('current_location')}: ${gameData.current_room_name}`;
-                
-                const inventoryList = document.getElementById('inventory-list');
-                if (inventoryList) {
-                    inventoryList.innerHTML = '';
-                    if (gameData.inventory && gameData.inventory.length > 0) {
-                        gameData.inventory.forEach(item => {
-                            const li = document.createElement('li');
-                            li.textContent = item;
-                            inventoryList.appendChild(li);
-                        });
-                    } else {
-                        inventoryList.innerHTML = '<li>Empty</li>';
-                    }
-                }
-
-                // Update background image
-                const backgroundContainer = document.getElementById('background-container');
-                if (backgroundContainer && gameData.current_room_image) {
-                    backgroundContainer.style.backgroundImage = `url(${gameData.current_room_image})`;
-                } else if (backgroundContainer) {
-                    backgroundContainer.style.backgroundImage = "url('/static/images/start_page_image_2.jpg')"; // Fallback
-                }
-                
-                // Render hint state based on backend data
-                renderHint(gameData);
-                if (gameData.remaining_hint_cooldown > 0) {
-                    startHintCooldown(gameData.remaining_hint_cooldown);
-                }
-
+                currentGameState = gameData;
+                renderGameState(gameData);
+                startGameClock();
             } catch (error) {
                 console.error('Failed to fetch and render game immersive:', error);
                 // Optionally, show an error message on the UI
@@ -413,38 +500,44 @@ function applyTranslations() {
         }
 
         function startHintCooldown(remainingSeconds) { // Now accepts remainingSeconds
-            clearInterval(hintCooldownInterval); // Clear any existing interval
-            
-            let timeLeft = remainingSeconds;
-            const hintCooldownEl = document.getElementById('hint-cooldown');
+            hintCooldownEndsAt = Date.now() + remainingSeconds * 1000;
             const hintBox = document.getElementById('hint-box');
+            if (hintBox) hintBox.classList.add('disabled');
+            renderHintCountdown();
+        }
 
-            hintBox.classList.add('disabled');
-            hintCooldownEl.textContent = `(${timeLeft}s)`;
-            
-            hintCooldownInterval = setInterval(() => {
-                timeLeft--;
-                hintCooldownEl.textContent = `(${timeLeft}s)`;
-                if (timeLeft <= 0) {
-                    clearInterval(hintCooldownInterval);
-                    fetchAndRenderGameImmersive(); // Refresh state from backend
-                }
-            }, 1000);
+        function renderHintCountdown() {
+            // Called by the game clock every second while a cooldown is running
+            if (!hintCooldownEndsAt) return;
+            const hintCooldownEl = document.getElementById('hint-cooldown');
+            const timeLeft = Math.max(0, Math.ceil((hintCooldownEndsAt - Date.now()) / 1000));
+            if (hintCooldownEl) hintCooldownEl.textContent = `(${timeLeft}s)`;
+            if (timeLeft <= 0 && !gameEventSource) {
+                // Without the events stream (which sends hint_cooldown_ended) refresh from the backend
+                hintCooldownEndsAt = 0;
+                fetchAndRenderGameImmersive();
+            }
         }
 
-        async function fetchAndRenderSavedGames() {
+        async function fetchAndRenderSavedGames(cursor = null) {
+            // Without a cursor the list starts over; with one the next page is appended
             const savedGamesList = document.querySelector('.saved-games-list');
-            savedGamesList.innerHTML = ''; // Clear existing items
+            if (!cursor) savedGamesList.innerHTML = ''; // Clear existing items
+            const previousLoadMore = savedGamesList.querySelector('.load-more-saves');
+            if (previousLoadMore) previousLoadMore.remove();
 
             try {
                 // Assuming currentPlayerId is available globally or passed appropriately
-                const response = await fetch(`/saved_games?player_id=${currentPlayerId}`);
+                let url = `/saved_games?player_id=${currentPlayerId}`;
+                if (cursor) url += `&cursor=${encodeURIComponent(cursor)}`;
+                const response = await fetch(url);
                 if (!response.ok) {
                     throw new Error(`HTTP error! status: ${response.status}`);
                 }
                 const savedGames = await response.json();
+                const nextCursor = response.headers.get('X-Next-Cursor');
 
-                if (savedGames.length === 0) {
+                if (savedGames.length === 0 && !cursor) {
                     savedGamesList.innerHTML = '<p>No saved games found.</p>';
                 } else {
                     savedGames.forEach(game => {
@@ -457,8 +550,10 @@ function applyTranslations() {
                         const formattedDate = savedDate.toLocaleDateString();
                         const formattedTime = savedDate.toLocaleTimeString();
 
+                        const summary = game.summary || {};
+                        const progress = summary.progress ? ` (${summary.progress.solved}/${summary.progress.total} puzzles)` : '';
                         gameItem.innerHTML = `
-                            <p>${game.save_name} - ${game.game_state.location}</p>
+                            <p>${game.save_name} - ${summary.room_name || summary.theme || ''}${progress}</p>
                             <small>Date: ${formattedDate} | Time: ${formattedTime}</small>
                         `;
                         gameItem.addEventListener('click', async () => {
@@ -485,9 +580,22 @@ function applyTranslations() {
                         savedGamesList.appendChild(gameItem);
                     });
                 }
+
+                if (nextCursor) {
+                    // The listing is paginated; older saves come one page per click
+                    const loadMoreButton = document.createElement('button');
+                    loadMoreButton.classList.add('action-btn', 'load-more-saves');
+                    loadMoreButton.textContent = 'LOAD MORE';
+                    loadMoreButton.addEventListener('click', () => fetchAndRenderSavedGames(nextCursor));
+                    savedGamesList.appendChild(loadMoreButton);
+                }
             } catch (error) {
                 console.error('Failed to fetch saved games:', error);
-                savedGamesList.innerHTML = '<p>Error loading saved games.</p>';
+                if (cursor) {
+                    alert('Failed to load more saved games: ' + error.message);
+                } else {
+                    savedGamesList.innerHTML = '<p>Error loading saved games.</p>';
+                }
             }
         }
 
@@ -856,7 +964,7 @@ function applyTranslations() {
                                     // Check if we are on the /game/<session_id> page
                                     if (currentSessionId !== null) {
                                         console.log('On immersive game page. currentSessionId:', currentSessionId);
-                                        fetchAndRenderGameImmersive(); // This function now handles getting currentSessionId
+                                        connectGameEvents(currentSessionId); // Initial state, then deltas as the game changes
                                         // Attach event listener for dynamic immersive options using event delegation
                                         const immersiveOptionsContainer = document.querySelector('.immersive-options');                            if (immersiveOptionsContainer) { // Null-safe check
                                 immersiveOptionsContainer.addEventListener('click', async (e) => {
@@ -891,9 +999,9 @@ function applyTranslations() {
                                             const data = await response.json();
                                             if (data.game_over) {
                                                 showPage('win'); // Show game over message
-                                            } else {
+                                            } else if (!gameEventSource) {
                                                 fetchAndRenderGameImmersive(); // Re-render immersive screen with new state
-                                            }
+                                            } // Otherwise the changes arrive as deltas on the events stream
                                         } catch (error) {
                                             console.error('Failed to interact:', error);
                                             alert('Failed to interact: ' + error.message);
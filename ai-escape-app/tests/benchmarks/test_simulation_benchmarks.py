@@ -0,0 +1,56 @@
+"""
+Throughput benchmarks of the headless game simulation (services/simulation.py),
+run by pytest-benchmark. Skipped when the plugin isn't installed; being
+wall-clock measurements they are marked "benchmark", so a build can leave them
+out with -m "not benchmark" and gate on the deterministic statement budget in
+tests/unit/test_simulation.py instead.
+
+Each benchmark fails outright below SIMULATION_MIN_ACTIONS_PER_SECOND. To catch
+smaller slowdowns, save a baseline on main and compare against it:
+    python -m pytest tests/benchmarks --benchmark-autosave
+    python -m pytest tests/benchmarks --benchmark-compare --benchmark-compare-fail=median:20%
+Actions/sec, p50/p99 per operation and statements per action of every run are
+stored in the benchmark's extra_info (see --benchmark-json).
+"""
+import os
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from data.rooms import ROOM_DATA
+from services.session_cache import WRITE_BEHIND, WRITE_THROUGH, SessionStateCache, set_session_cache
+from services.simulation import GameSimulation
+
+pytestmark = pytest.mark.benchmark
+
+# Deliberately far below what a laptop or CI runner does (several hundred per second)
+MIN_ACTIONS_PER_SECOND = float(os.environ.get("SIMULATION_MIN_ACTIONS_PER_SECOND", 100))
+
+
+@pytest.fixture(scope="function", params=[WRITE_THROUGH, WRITE_BEHIND])
+def simulation(request):
+    set_session_cache(SessionStateCache(mode=request.param, flush_interval_seconds=0))
+    simulation = GameSimulation()
+    yield simulation
+    simulation.close()
+    set_session_cache(None)
+
+
+def _check(benchmark, report):
+    benchmark.extra_info.update(report.to_dict())
+    assert report.games_completed == report.games
+    assert report.actions_per_second >= MIN_ACTIONS_PER_SECOND
+
+
+@pytest.mark.parametrize("theme_id", list(ROOM_DATA))
+def test_play_theme(benchmark, simulation, theme_id):
+    benchmark.group = "play_theme"
+    benchmark.pedantic(simulation.play_theme, args=(theme_id,), rounds=20, warmup_rounds=2)
+    _check(benchmark, simulation.report)
+
+
+def test_play_all_themes(benchmark, simulation):
+    benchmark.group = "play_all_themes"
+    benchmark.pedantic(simulation.play_all_themes, rounds=5, warmup_rounds=1)
+    _check(benchmark, simulation.report)
@@ -0,0 +1,59 @@
+import pytest
+import json
+from flask import Flask
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from models import Base
+from app import create_app
+from services.game_logic import create_game_session
+from services.hint_status import HINT_COOLDOWN_SECONDS
+
+
+@pytest.fixture(scope="function")
+def app_with_db():
+    """
+    Fixture for a Flask app with an in-memory SQLite database for testing.
+    """
+    app = create_app(
+        config_object=type(
+            "TestConfig",
+            (object,),
+            {
+                "TESTING": True,
+                "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+                "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            },
+        )
+    )
+    with app.app_context():
+        engine = create_engine(app.config["SQLALCHEMY_DATABASE_URI"])
+        Base.metadata.create_all(engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        app.session = SessionLocal()
+        yield app
+        Base.metadata.drop_all(engine)
+        app.session.close()
+
+
+@pytest.fixture(scope="function")
+def client(app_with_db: Flask):
+    return app_with_db.test_client()
+
+
+def test_hint_and_session_routes_report_the_same_status(app_with_db, client):
+    game_session, _ = create_game_session(app_with_db.session, "route_player", "forgotten_library", "forgotten_library_entrance")
+
+    session_data = json.loads(client.get(f"/game_session/{game_session.id}").data)
+    assert session_data["hint_status_display_text"] == "Click for a hint"
+    assert session_data["remaining_hint_cooldown"] == 0
+
+    hint_data = json.loads(client.get(f"/game_session/{game_session.id}/hint").data)
+    assert hint_data["hints_remaining"] == 4
+    assert 0 < hint_data["remaining_hint_cooldown"] <= HINT_COOLDOWN_SECONDS
+
+    # The session GET used to fail while a cooldown was running
+    response = client.get(f"/game_session/{game_session.id}")
+    assert response.status_code == 200
+    session_data = json.loads(response.data)
+    assert session_data["hints_remaining"] == 4
+    assert session_data["hint_status_display_text"].startswith("Hint on cooldown")
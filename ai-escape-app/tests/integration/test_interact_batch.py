@@ -0,0 +1,116 @@
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from models import Base
+from app import create_app
+from services.game_logic import create_game_session, get_puzzle_attempts
+from services.session_cache import WRITE_THROUGH, SessionStateCache, set_session_cache
+
+# Contextual option indexes in the library entrance
+LOOK_AROUND_OPTION = 4
+SOLVE_DOOR_OPTION = 5
+
+
+@pytest.fixture(scope="function")
+def engine():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture(scope="function")
+def app_with_db(engine):
+    """
+    Fixture for a Flask app with an in-memory SQLite database for testing.
+    """
+    app = create_app(
+        config_object=type(
+            "TestConfig",
+            (object,),
+            {
+                "TESTING": True,
+                "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+                "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            },
+        )
+    )
+    with app.app_context():
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        app.session = SessionLocal()
+        yield app
+        app.session.close()
+
+
+@pytest.fixture(scope="function")
+def client(app_with_db: Flask):
+    return app_with_db.test_client()
+
+
+@pytest.fixture(scope="function")
+def game_session(app_with_db):
+    game_session, _ = create_game_session(app_with_db.session, "batch_player", "forgotten_library", "forgotten_library_entrance")
+    return game_session
+
+
+@pytest.fixture(scope="function")
+def write_through():
+    set_session_cache(SessionStateCache(mode=WRITE_THROUGH))
+    yield
+    set_session_cache(None)
+
+
+def test_batch_applies_steps_in_one_transaction(engine, client, game_session, write_through):
+    commits = []
+    event.listen(engine, "commit", lambda connection: commits.append(connection))
+
+    response = client.post(f"/game_session/{game_session.id}/interact_batch", json={"actions": [
+        {"option_index": LOOK_AROUND_OPTION},
+        {"option_index": SOLVE_DOOR_OPTION, "player_attempt": "WRONG"},
+        {"option": "Solve Ancient Symbol Door Puzzle", "player_attempt": "EYETEARS"},
+    ]})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [step["is_successful"] for step in data["steps"]] == [True, False, True]
+    assert data["steps"][1]["option"] == "Solve Ancient Symbol Door Puzzle"
+    assert data["steps"][2]["current_room"] == "forgotten_library_study"
+    assert data["state"]["current_room"] == "forgotten_library_study"
+    assert data["state"]["puzzle_state"]["ancient_symbol_door_puzzle"]["attempts"] == 2
+    assert len(commits) == 1
+
+
+def test_failing_step_rolls_back_the_batch(app_with_db, client, game_session):
+    response = client.post(f"/game_session/{game_session.id}/interact_batch", json={"actions": [
+        {"option_index": SOLVE_DOOR_OPTION, "player_attempt": "EYETEARS"},
+        {"option_index": 99},
+    ]})
+    assert response.status_code == 409
+    data = response.get_json()
+    assert data["failed_step"] == 1
+    assert data["error"] == "Invalid option index"
+    assert data["steps"][0]["current_room"] == "forgotten_library_study"
+    assert data["state"]["current_room"] == "forgotten_library_entrance"
+    assert data["state"]["puzzle_state"] == {}
+    assert get_puzzle_attempts(app_with_db.session, game_session.id) == []
+
+
+def test_unknown_option_label_fails_the_batch(client, game_session):
+    response = client.post(f"/game_session/{game_session.id}/interact_batch", json={"actions": [{"option": "Dance"}]})
+    assert response.status_code == 409
+    assert response.get_json()["failed_step"] == 0
+
+
+@pytest.mark.parametrize("body", [
+    {},
+    {"actions": []},
+    {"actions": [{"player_attempt": "x"}]},
+    {"actions": [{"option_index": 1, "option": "Look around the room"}]},
+])
+def test_malformed_batches_are_rejected(client, game_session, body):
+    assert client.post(f"/game_session/{game_session.id}/interact_batch", json=body).status_code == 400
+
+
+def test_batch_for_unknown_session_is_404(client):
+    response = client.post("/game_session/999/interact_batch", json={"actions": [{"option_index": 0}]})
+    assert response.status_code == 404
@@ -0,0 +1,81 @@
+import pytest
+import json
+from flask import Flask
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from models import Base
+from app import create_app
+
+
+@pytest.fixture(scope="function")
+def app_with_db():
+    """
+    Fixture for a Flask app with an in-memory SQLite database for testing.
+    """
+    app = create_app(
+        config_object=type(
+            "TestConfig",
+            (object,),
+            {
+                "TESTING": True,
+                "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+                "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            },
+        )
+    )
+    with app.app_context():
+        engine = create_engine(app.config["SQLALCHEMY_DATABASE_URI"])
+        Base.metadata.create_all(engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        app.session = SessionLocal()
+        yield app
+        Base.metadata.drop_all(engine)
+        app.session.close()
+
+
+@pytest.fixture(scope="function")
+def client(app_with_db: Flask):
+    return app_with_db.test_client()
+
+
+def _start_library_game(client):
+    response = client.post(
+        "/start_game",
+        json={
+            "player_id": "interact_player",
+            "theme": "forgotten_library",
+            "location": "forgotten_library_entrance",
+            "difficulty": "medium",
+        },
+    )
+    assert response.status_code == 201
+    return json.loads(response.data)["session_id"]
+
+
+def test_interact_dispatches_option_by_index(client):
+    session_id = _start_library_game(client)
+    options = json.loads(client.get(f"/game_session/{session_id}").data)["contextual_options"]
+
+    response = client.post(
+        f"/game_session/{session_id}/interact",
+        json={
+            "option_index": options.index("Solve Ancient Symbol Door Puzzle"),
+            "player_attempt": "eyetears",
+        },
+    )
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert data["is_successful"] is True
+    assert data["current_room"] == "forgotten_library_study"
+    assert data["current_room_name"] == "The Silent Study"
+    assert "Solve The Silent Word" in data["contextual_options"]
+
+
+def test_interact_rejects_out_of_range_index(client):
+    session_id = _start_library_game(client)
+    response = client.post(
+        f"/game_session/{session_id}/interact", json={"option_index": 999}
+    )
+    assert response.status_code == 400
+    assert json.loads(response.data)["error"] == "Invalid option index"
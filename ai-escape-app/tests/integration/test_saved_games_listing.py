@@ -0,0 +1,112 @@
+import pytest
+import json
+from datetime import datetime, timedelta
+from flask import Flask
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from models import Base
+from app import create_app
+from services.game_logic import create_game_session, save_game_state
+
+
+@pytest.fixture(scope="function")
+def app_with_db():
+    """
+    Fixture for a Flask app with an in-memory SQLite database for testing.
+    """
+    app = create_app(
+        config_object=type(
+            "TestConfig",
+            (object,),
+            {
+                "TESTING": True,
+                "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+                "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            },
+        )
+    )
+    with app.app_context():
+        engine = create_engine(app.config["SQLALCHEMY_DATABASE_URI"])
+        Base.metadata.create_all(engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        app.session = SessionLocal()
+        app.test_engine = engine
+        yield app
+        Base.metadata.drop_all(engine)
+        app.session.close()
+
+
+@pytest.fixture(scope="function")
+def client(app_with_db: Flask):
+    return app_with_db.test_client()
+
+
+def _save_games(app, player_id, count, same_timestamp=False):
+    game_session, _ = create_game_session(app.session, player_id, "forgotten_library", "forgotten_library_entrance")
+    now = datetime(2025, 6, 1, 12, 0, 0)
+    for index in range(count):
+        saved_at = now if same_timestamp else now - timedelta(minutes=count - index)
+        save_game_state(app.session, game_session.id, f"Save {index}", saved_at=saved_at)
+    return game_session
+
+
+def _list_all(client, player_id, limit):
+    names = []
+    cursor = None
+    pages = 0
+    while True:
+        url = f"/saved_games?player_id={player_id}&limit={limit}" + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(url)
+        assert response.status_code == 200
+        names.extend(game["save_name"] for game in json.loads(response.data))
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return names, pages
+
+
+def test_saved_games_listing_is_projection_only(app_with_db, client):
+    _save_games(app_with_db, "list_player", 1)
+    statements = []
+    event.listen(app_with_db.test_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    response = client.get("/saved_games?player_id=list_player")
+    games = json.loads(response.data)
+
+    assert set(games[0]) == {"id", "session_id", "save_name", "saved_at", "summary"}
+    summary = games[0]["summary"]
+    assert summary["room"] == "forgotten_library_entrance"
+    assert summary["theme"] == "forgotten_library"
+    assert summary["progress"]["solved"] == 0 and summary["progress"]["total"] > 0
+    selects = [statement for statement in statements if statement.startswith("SELECT")]
+    assert selects and all("game_state" not in statement and "state_delta" not in statement for statement in selects)
+
+
+def test_saved_games_keyset_pagination_visits_every_save_once(app_with_db, client):
+    _save_games(app_with_db, "page_player", 7)
+    names, pages = _list_all(client, "page_player", limit=3)
+    assert names == [f"Save {index}" for index in range(6, -1, -1)] # Newest first
+    assert pages == 3
+
+
+def test_saved_games_pagination_breaks_timestamp_ties_by_id(app_with_db, client):
+    _save_games(app_with_db, "tie_player", 5, same_timestamp=True)
+    names, _ = _list_all(client, "tie_player", limit=2)
+    assert sorted(names) == [f"Save {index}" for index in range(5)]
+    assert len(names) == 5
+
+
+@pytest.mark.parametrize("query", ["limit=0", "limit=500", "limit=abc", "cursor=not-a-cursor"])
+def test_saved_games_rejects_bad_paging_parameters(client, query):
+    response = client.get(f"/saved_games?player_id=someone&{query}")
+    assert response.status_code == 400
+
+
+def test_save_game_response_omits_full_state(app_with_db, client):
+    game_session, _ = create_game_session(app_with_db.session, "save_player", "forgotten_library", "forgotten_library_entrance")
+    response = client.post("/save_game", json={"session_id": game_session.id, "save_name": "Quick"})
+    assert response.status_code == 201
+    data = json.loads(response.data)
+    assert "game_state" not in data
+    assert data["summary"]["room"] == "forgotten_library_entrance"
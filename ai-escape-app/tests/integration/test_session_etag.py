@@ -0,0 +1,101 @@
+import pytest
+import json
+from flask import Flask
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from models import Base
+from app import create_app
+from services.game_logic import create_game_session, get_a_hint, update_player_inventory
+
+
+@pytest.fixture(scope="function")
+def app_with_db():
+    """
+    Fixture for a Flask app with an in-memory SQLite database for testing.
+    """
+    app = create_app(
+        config_object=type(
+            "TestConfig",
+            (object,),
+            {
+                "TESTING": True,
+                "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+                "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            },
+        )
+    )
+    with app.app_context():
+        engine = create_engine(app.config["SQLALCHEMY_DATABASE_URI"])
+        Base.metadata.create_all(engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        app.session = SessionLocal()
+        yield app
+        Base.metadata.drop_all(engine)
+        app.session.close()
+
+
+@pytest.fixture(scope="function")
+def client(app_with_db: Flask):
+    return app_with_db.test_client()
+
+
+@pytest.fixture(scope="function")
+def game_session(app_with_db):
+    game_session, _ = create_game_session(app_with_db.session, "etag_player", "forgotten_library", "forgotten_library_entrance")
+    return game_session
+
+
+def test_unchanged_session_is_not_modified(client, game_session):
+    response = client.get(f"/game_session/{game_session.id}")
+    assert response.status_code == 200
+    assert response.headers["ETag"] == f'"s{game_session.id}-r{game_session.revision}"'
+    assert response.headers["Cache-Control"] == "no-cache"
+
+    not_modified = client.get(f"/game_session/{game_session.id}", headers={"If-None-Match": response.headers["ETag"]})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b""
+    assert not_modified.headers["ETag"] == response.headers["ETag"]
+
+
+def test_changes_bump_the_revision_and_etag(app_with_db, client, game_session):
+    first = client.get(f"/game_session/{game_session.id}")
+    update_player_inventory(app_with_db.session, game_session.id, "lamp", "add")
+
+    second = client.get(f"/game_session/{game_session.id}", headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 200
+    assert second.get_json()["revision"] == first.get_json()["revision"] + 1
+    assert second.get_json()["inventory"] == ["lamp"]
+    assert second.headers["ETag"] != first.headers["ETag"]
+
+
+def test_etag_changes_while_hint_cooldown_runs(app_with_db, client, game_session):
+    get_a_hint(app_with_db.session, game_session.id)
+    response = client.get(f"/game_session/{game_session.id}")
+    cooldown = response.get_json()["remaining_hint_cooldown"]
+    assert cooldown > 0
+    assert response.headers["ETag"].endswith(f'-c{cooldown}"')
+
+
+def test_fields_projection(client, game_session):
+    response = client.get(f"/game_session/{game_session.id}?fields=inventory,hints_remaining")
+    assert response.status_code == 200
+    assert json.loads(response.data) == {
+        "id": game_session.id, "revision": game_session.revision, "inventory": [], "hints_remaining": 5,
+    }
+
+    full = client.get(f"/game_session/{game_session.id}")
+    assert response.headers["ETag"] != full.headers["ETag"] # A projection is its own representation
+    not_modified = client.get(f"/game_session/{game_session.id}?fields=hints_remaining,inventory",
+                              headers={"If-None-Match": response.headers["ETag"]})
+    assert not_modified.status_code == 304
+
+
+def test_unknown_fields_are_rejected(client, game_session):
+    response = client.get(f"/game_session/{game_session.id}?fields=inventory,secret")
+    assert response.status_code == 400
+    assert "secret" in response.get_json()["error"]
+    assert "inventory" in response.get_json()["fields"]
+
+
+def test_missing_session_is_404(client):
+    assert client.get("/game_session/999").status_code == 404
@@ -0,0 +1,157 @@
+import pytest
+import json
+import time
+from flask import Flask
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from models import Base
+from app import create_app
+from services.game_events import EventStream, GameEventBus, set_event_bus
+from services.game_logic import create_game_session, get_a_hint, solve_puzzle, update_player_inventory
+
+
+@pytest.fixture(scope="function")
+def app_with_db():
+    """
+    Fixture for a Flask app with an in-memory SQLite database for testing.
+    """
+    app = create_app(
+        config_object=type(
+            "TestConfig",
+            (object,),
+            {
+                "TESTING": True,
+                "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+                "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            },
+        )
+    )
+    with app.app_context():
+        engine = create_engine(app.config["SQLALCHEMY_DATABASE_URI"])
+        Base.metadata.create_all(engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        app.session = SessionLocal()
+        yield app
+        Base.metadata.drop_all(engine)
+        app.session.close()
+
+
+@pytest.fixture(scope="function")
+def client(app_with_db: Flask):
+    return app_with_db.test_client()
+
+
+@pytest.fixture(scope="function")
+def bus():
+    bus = GameEventBus()
+    set_event_bus(bus)
+    yield bus
+    set_event_bus(None)
+
+
+def _next_event(stream):
+    """
+    Reads the next event from an SSE body iterator, skipping retry and keepalive lines.
+    """
+    for chunk in stream:
+        chunk = chunk.decode("utf-8") if isinstance(chunk, bytes) else chunk
+        fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines() if not line.startswith(("retry:", ":")))
+        if "event" in fields:
+            return fields["event"], json.loads(fields["data"])
+    raise AssertionError("Event stream ended")
+
+
+def _open_stream(client, session_id):
+    response = client.get(f"/game_session/{session_id}/events", buffered=False)
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    return response, iter(response.response)
+
+
+def test_stream_starts_with_full_state(app_with_db, client, bus):
+    game_session, _ = create_game_session(app_with_db.session, "sse_player", "forgotten_library", "forgotten_library_entrance")
+    response, stream = _open_stream(client, game_session.id)
+
+    event_type, state = _next_event(stream)
+    assert event_type == "state"
+    assert state == json.loads(client.get(f"/game_session/{game_session.id}").data)
+
+    response.close()
+    assert not bus.has_subscribers(game_session.id)
+
+
+def test_actions_push_compact_deltas(app_with_db, client, bus):
+    game_session, _ = create_game_session(app_with_db.session, "sse_player", "forgotten_library", "forgotten_library_entrance")
+    response, stream = _open_stream(client, game_session.id)
+    _next_event(stream) # state
+
+    client.post(f"/game_session/{game_session.id}/inventory", json={"item": "lamp", "action": "add"})
+    assert _next_event(stream) == ("inventory_changed", {"added": ["lamp"], "removed": []})
+
+    solve_puzzle(app_with_db.session, game_session.id, "ancient_symbol_door_puzzle", "EYETEARS")
+    event_type, room = _next_event(stream)
+    assert event_type == "room_changed"
+    assert room["current_room"] == "forgotten_library_study"
+    assert _next_event(stream) == ("puzzle_solved", {"puzzle_ids": ["ancient_symbol_door_puzzle"]})
+    event_type, options = _next_event(stream)
+    assert event_type == "options_changed"
+    assert options["contextual_options"]
+
+    get_a_hint(app_with_db.session, game_session.id)
+    event_type, hint_status = _next_event(stream)
+    assert event_type == "hint_status_changed"
+    assert hint_status["hints_remaining"] == 4
+    assert hint_status["remaining_hint_cooldown"] > 0
+    response.close()
+
+
+def test_failed_attempts_publish_nothing_visible(app_with_db, client, bus):
+    game_session, _ = create_game_session(app_with_db.session, "sse_player", "forgotten_library", "forgotten_library_entrance")
+    subscription = bus.subscribe(game_session.id)
+
+    solve_puzzle(app_with_db.session, game_session.id, "ancient_symbol_door_puzzle", "WRONG")
+    assert subscription.queue.empty()
+    bus.unsubscribe(subscription)
+
+
+def test_nothing_is_published_without_subscribers(app_with_db, bus, monkeypatch):
+    game_session, _ = create_game_session(app_with_db.session, "quiet_player", "forgotten_library", "forgotten_library_entrance")
+    published = []
+    monkeypatch.setattr(bus, "publish", lambda session_id, events: published.append(events))
+
+    update_player_inventory(app_with_db.session, game_session.id, "lamp", "add")
+    assert published == []
+
+
+def test_stream_announces_end_of_hint_cooldown(bus):
+    subscription = bus.subscribe(7)
+    stream = EventStream(bus, subscription, {"hints_remaining": 3, "remaining_hint_cooldown": 0}, keepalive_seconds=5)
+    events = iter(stream)
+    _next_event(events) # state
+
+    bus.publish(7, [{"type": "hint_status_changed", "hints_remaining": 2, "remaining_hint_cooldown": 1,
+                     "hint_status_display_text": "Hint on cooldown (1s)", "hint_cooldown_until": time.time() + 0.05}])
+    assert _next_event(events)[0] == "hint_status_changed"
+    assert _next_event(events) == ("hint_cooldown_ended", {
+        "hints_remaining": 2, "remaining_hint_cooldown": 0, "hint_status_display_text": "Click for a hint",
+    })
+    stream.close()
+    assert not bus.has_subscribers(7)
+
+
+def test_slow_subscriber_is_told_to_resynchronize():
+    bus = GameEventBus(max_queued=2)
+    subscription = bus.subscribe(1)
+    bus.publish(1, [{"type": "puzzle_solved", "puzzle_ids": [str(index)]} for index in range(3)])
+
+    stream = iter(EventStream(bus, subscription, {}))
+    _next_event(stream) # state
+    assert _next_event(stream) == ("state_reset", {})
+    with pytest.raises(AssertionError):
+        _next_event(stream) # The stream ends; the browser reconnects
+
+
+def test_events_for_unknown_session_is_404(client, bus):
+    response = client.get("/game_session/999/events")
+    assert response.status_code == 404
+    assert not bus.has_subscribers(999)
@@ -175,7 +175,7 @@ def test_solve_puzzle_correct_solution(mock_evaluate_and_adapt_puzzle, db_sessio
     assert message == "Puzzle solved!"
     assert updated_session.puzzle_state.get("observation_puzzle", {}).get("solved") is True
     assert ai_evaluation["is_correct"] is True
-    assert updated_session.puzzle_state.get("observation_puzzle", {}).get("ai_feedback") is not None
+    assert "ai_feedback" not in updated_session.puzzle_state.get("observation_puzzle", {})
 
 
 @patch('services.game_logic.evaluate_and_adapt_puzzle')
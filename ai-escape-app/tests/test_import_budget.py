@@ -0,0 +1,61 @@
+import os
+import subprocess
+import sys
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Cold-start budget for importing the app and running create_app(), in seconds.
+# Override with IMPORT_BUDGET_SECONDS on slow CI machines.
+IMPORT_BUDGET_SECONDS = float(os.environ.get("IMPORT_BUDGET_SECONDS", "2.0"))
+
+COLD_START_SCRIPT = """
+import time
+start = time.perf_counter()
+from app import create_app, TestConfig
+create_app(TestConfig)
+print(f"create_app_seconds={time.perf_counter() - start}")
+"""
+
+
+def _run_cold_start():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", COLD_START_SCRIPT],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "GEMINI_API_KEY": "test_api_key"},
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    return result
+
+
+def _imported_modules(importtime_output: str) -> dict[str, int]:
+    """
+    Parses `-X importtime` lines ("import time: self | cumulative | module")
+    into {module name: cumulative microseconds}.
+    """
+    modules = {}
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        modules[module.strip()] = int(cumulative)
+    return modules
+
+
+def test_create_app_does_not_import_gemini_sdk():
+    result = _run_cold_start()
+    modules = _imported_modules(result.stderr)
+
+    assert "app" in modules
+    assert not any(name.startswith("google.generativeai") for name in modules)
+
+
+def test_create_app_cold_start_within_budget():
+    result = _run_cold_start()
+    modules = _imported_modules(result.stderr)
+    create_app_seconds = float(result.stdout.strip().split("=")[1])
+
+    assert modules["app"] / 1_000_000 < IMPORT_BUDGET_SECONDS
+    assert create_app_seconds < IMPORT_BUDGET_SECONDS
@@ -0,0 +1,71 @@
+import os
+from unittest.mock import MagicMock, patch
+import pytest
+from services.ai_provider import (
+    AIProvider,
+    DeterministicProvider,
+    GeminiProvider,
+    get_ai_provider,
+    set_ai_provider,
+)
+from services.llm_client import AsyncLLMClient
+
+
+@pytest.fixture(autouse=True)
+def reset_provider():
+    set_ai_provider(None)
+    yield
+    set_ai_provider(None)
+
+
+def test_provider_without_api_key_is_deterministic():
+    with patch.dict(os.environ, {"AI_LIVE_GENERATION": "true", "GEMINI_API_KEY": ""}), patch("dotenv.load_dotenv"):
+        provider = get_ai_provider()
+    assert isinstance(provider, DeterministicProvider)
+    assert not provider.is_available()
+    assert provider.generate_text("prompt", "stub") == "stub"
+    assert get_ai_provider() is provider # Resolved once
+
+
+def test_provider_without_live_flag_is_deterministic():
+    with patch.dict(os.environ, {"AI_LIVE_GENERATION": "false", "GEMINI_API_KEY": "test_api_key"}), patch("dotenv.load_dotenv"):
+        provider = get_ai_provider()
+    assert isinstance(provider, DeterministicProvider)
+
+
+def test_gemini_provider_uses_async_client_configured_from_environment():
+    environment = {
+        "AI_LIVE_GENERATION": "true",
+        "GEMINI_API_KEY": "test_api_key",
+        "GEMINI_MODEL": "test-model",
+        "LLM_DEADLINE_SECONDS": "3",
+    }
+    with patch.dict(os.environ, environment), patch("dotenv.load_dotenv"):
+        provider = get_ai_provider()
+    assert isinstance(provider, GeminiProvider)
+    assert provider.is_available()
+    assert isinstance(provider.client, AsyncLLMClient)
+    assert provider.client.api_key == "test_api_key"
+    assert provider.client.model == "test-model"
+    assert provider.client.deadline_seconds == 3.0
+
+
+def test_gemini_provider_generates_through_its_client():
+    client = MagicMock(api_key="test_api_key")
+    client.generate_sync.return_value = "Generated."
+    provider = GeminiProvider(client)
+    assert provider.generate_text("prompt", "stub") == "Generated."
+    client.generate_sync.assert_called_once_with("prompt", "stub", None)
+
+    set_ai_provider(provider)
+    set_ai_provider(None) # Replacing the provider stops its client's loop
+    client.close.assert_called_once()
+
+
+def test_incomplete_provider_fails_at_construction():
+    class NoGenerateProvider(AIProvider):
+        def is_available(self):
+            return True
+
+    with pytest.raises(TypeError):
+        NoGenerateProvider()
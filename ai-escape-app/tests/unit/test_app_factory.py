@@ -0,0 +1,126 @@
+import threading
+from unittest.mock import patch
+from sqlalchemy.orm import scoped_session
+from sqlalchemy.pool import QueuePool
+from sqlalchemy import text
+from app import create_app, build_engine_options, build_sqlite_pragmas
+from models import PuzzleAttempt, SavedGame
+from services.game_logic import (
+    create_game_session,
+    delete_game_session,
+    get_game_session,
+    save_game_state,
+    solve_puzzle,
+    update_player_inventory,
+)
+
+
+def _config(database_uri, **extra):
+    return type(
+        "TestConfig",
+        (object,),
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": database_uri,
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            **extra,
+        },
+    )
+
+
+def test_create_app_uses_scoped_session():
+    app = create_app(config_object=_config("sqlite:///:memory:"))
+    assert isinstance(app.session, scoped_session)
+    assert app.session is app.session_factory
+
+
+def test_session_is_removed_after_request():
+    app = create_app(config_object=_config("sqlite:///:memory:"))
+    with app.test_request_context("/"):
+        first_session = app.session()
+        assert app.session_factory.registry.has()
+    # Leaving the context runs the teardown hook, which discards the session
+    assert not app.session_factory.registry.has()
+    with app.test_request_context("/"):
+        assert app.session() is not first_session
+
+
+def test_sessions_are_isolated_per_thread():
+    app = create_app(config_object=_config("sqlite:///:memory:"))
+    sessions = []
+
+    def grab_session():
+        sessions.append(app.session())
+        app.session.remove()
+
+    threads = [threading.Thread(target=grab_session) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sessions[0] is not sessions[1]
+
+
+def test_file_database_uses_configured_queue_pool(tmp_path):
+    app = create_app(
+        config_object=_config(
+            f"sqlite:///{tmp_path / 'pool.db'}",
+            SQLALCHEMY_POOL_SIZE=4,
+            SQLALCHEMY_MAX_OVERFLOW=2,
+            SQLALCHEMY_POOL_RECYCLE=60,
+        )
+    )
+    pool = app.engine.pool
+    assert isinstance(pool, QueuePool)
+    assert pool.size() == 4
+    assert pool._max_overflow == 2
+    assert pool._recycle == 60
+    assert pool._pre_ping is True
+    app.engine.dispose()
+
+
+def test_memory_database_skips_queue_pool_options():
+    options = build_engine_options({"SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:"})
+    assert "poolclass" not in options
+    assert "pool_size" not in options
+    assert options["pool_pre_ping"] is True
+
+
+def test_file_database_connections_use_sqlite_profile(tmp_path):
+    app = create_app(config_object=_config(f"sqlite:///{tmp_path / 'profile.db'}", SQLITE_CACHE_SIZE=-32000))
+    with app.engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1 # NORMAL
+        assert connection.execute(text("PRAGMA cache_size")).scalar() == -32000
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        assert connection.execute(text("PRAGMA foreign_keys")).scalar() == 1
+        assert connection.execute(text("PRAGMA mmap_size")).scalar() > 0
+    app.engine.dispose()
+
+
+def test_memory_database_skips_file_only_pragmas():
+    pragmas = dict(build_sqlite_pragmas({"SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:"}))
+    assert "journal_mode" not in pragmas
+    assert "mmap_size" not in pragmas
+    assert pragmas["foreign_keys"] == "ON"
+
+
+@patch("services.game_logic.evaluate_and_adapt_puzzle")
+def test_delete_game_session_with_attempts_and_saves(mock_evaluate_and_adapt_puzzle):
+    # Foreign keys are enforced, so the session's attempts and saves must go with it
+    mock_evaluate_and_adapt_puzzle.return_value = {"is_correct": False, "feedback": "Try again."}
+    app = create_app(config_object=_config("sqlite:///:memory:"))
+    db_session = app.session()
+    game_session, _ = create_game_session(db_session, "fk_player", "forgotten_library", "forgotten_library_entrance")
+    solve_puzzle(db_session, game_session.id, "ancient_symbol_door_puzzle", "wrong answer")
+    save_game_state(db_session, game_session.id, "Keyframe")
+    update_player_inventory(db_session, game_session.id, "map", "add")
+    assert save_game_state(db_session, game_session.id, "Delta").base_save_id is not None
+    assert db_session.query(PuzzleAttempt).count() == 1
+
+    assert delete_game_session(db_session, game_session.id) is True
+    assert get_game_session(db_session, game_session.id) is None
+    assert db_session.query(PuzzleAttempt).count() == 0
+    assert db_session.query(SavedGame).count() == 0
+    app.session.remove()
@@ -0,0 +1,86 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from models import Base
+from services.game_logic import (
+    ContextualOption,
+    _build_contextual_options,
+    create_game_session,
+    get_contextual_option_entries,
+    get_contextual_options,
+    perform_contextual_option,
+    player_action,
+)
+
+
+@pytest.fixture(scope="function")
+def db_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def library_session(db_session):
+    game_session, _ = create_game_session(
+        db_session, "options_player", "forgotten_library", "forgotten_library_entrance"
+    )
+    return game_session
+
+
+def test_contextual_options_are_sorted_and_match_entries(library_session):
+    options = get_contextual_options(library_session)
+    entries = get_contextual_option_entries(library_session)
+
+    assert options == sorted(options)
+    assert options == [entry.label for entry in entries]
+    assert ContextualOption(
+        "Solve Ancient Symbol Door Puzzle", "solve", "ancient_symbol_door_puzzle"
+    ) in entries
+    assert ContextualOption(
+        "Examine Glowing Symbol", "interact", "Examine Glowing Symbol"
+    ) in entries
+
+
+def test_contextual_options_are_memoized_per_solved_mask(library_session):
+    _build_contextual_options.cache_clear()
+
+    get_contextual_options(library_session)
+    get_contextual_options(library_session)
+    assert _build_contextual_options.cache_info().hits == 1
+    assert _build_contextual_options.cache_info().misses == 1
+
+    # Solving the main puzzle changes the mask, so a new entry is built
+    library_session.current_room = "forgotten_library_entrance"
+    library_session.puzzle_state = {"ancient_symbol_door_puzzle": {"solved": True}}
+    entries = get_contextual_option_entries(library_session)
+    assert _build_contextual_options.cache_info().misses == 2
+    assert ContextualOption(
+        "Go to The Silent Study", "move", "forgotten_library_study"
+    ) in entries
+    assert "Solve Ancient Symbol Door Puzzle" not in [entry.label for entry in entries]
+
+
+def test_unknown_room_has_no_option_entries(library_session):
+    library_session.current_room = "no_such_room"
+    assert get_contextual_option_entries(library_session) == ()
+    assert get_contextual_options(library_session) == ["Error: Room data not found in current theme."]
+
+
+def test_perform_contextual_option_matches_player_action(db_session, library_session):
+    option = ContextualOption("Solve Ancient Symbol Door Puzzle", "solve", "ancient_symbol_door_puzzle")
+    is_successful, _, updated_session, _ = perform_contextual_option(
+        db_session, library_session, option, "eyetears"
+    )
+    assert is_successful
+    assert updated_session.current_room == "forgotten_library_study"
+
+    # The same label typed as a phrase resolves to the same action
+    is_successful, message, _, _ = player_action(
+        db_session, library_session.id, "solve the silent word", "silence"
+    )
+    assert is_successful, message
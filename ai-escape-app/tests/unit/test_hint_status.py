@@ -0,0 +1,68 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from models import Base
+from services.game_logic import create_game_session, get_a_hint
+from services.hint_status import HINT_COOLDOWN_KEY, HINT_COOLDOWN_SECONDS, HintStatus, use_hint
+
+
+@pytest.fixture(scope="function")
+def db_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_status_without_cooldown():
+    status = HintStatus.of({"hints_remaining": 3, HINT_COOLDOWN_KEY: 0}, now=1000)
+    assert status == HintStatus(3, 0)
+    assert status.available
+    assert status.display_text == "Click for a hint"
+
+
+def test_use_hint_starts_cooldown_as_epoch_seconds():
+    narrative_state = {"hints_remaining": 3, HINT_COOLDOWN_KEY: 0}
+    use_hint(narrative_state, now=1000.7)
+
+    assert narrative_state == {"hints_remaining": 2, HINT_COOLDOWN_KEY: 1000 + HINT_COOLDOWN_SECONDS}
+    status = HintStatus.of(narrative_state, now=1010)
+    assert status.remaining_cooldown == HINT_COOLDOWN_SECONDS - 10
+    assert not status.available
+    assert status.to_dict() == {
+        "hints_remaining": 2,
+        "remaining_hint_cooldown": HINT_COOLDOWN_SECONDS - 10,
+        "hint_status_display_text": f"Hint on cooldown ({HINT_COOLDOWN_SECONDS - 10}s)",
+    }
+    assert HintStatus.of(narrative_state, now=1000 + HINT_COOLDOWN_SECONDS).available
+
+
+def test_no_hints_left_takes_precedence_over_cooldown():
+    status = HintStatus.of({"hints_remaining": 0, HINT_COOLDOWN_KEY: 2000}, now=1000)
+    assert status.display_text == "No more hints available."
+
+
+def test_legacy_iso_timestamp_is_still_honoured():
+    last_hint = datetime(2025, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    narrative_state = {"hints_remaining": 2, "last_hint_timestamp": last_hint.isoformat()}
+
+    status = HintStatus.of(narrative_state, now=last_hint.timestamp() + 5)
+    assert status.remaining_cooldown == HINT_COOLDOWN_SECONDS - 5
+
+    use_hint(narrative_state, now=last_hint.timestamp() + 60)
+    assert "last_hint_timestamp" not in narrative_state
+
+
+def test_get_a_hint_spends_a_hint_then_enforces_cooldown(db_session):
+    game_session, _ = create_game_session(db_session, "hint_player", "forgotten_library", "forgotten_library_entrance", "medium")
+
+    hint, game_session = get_a_hint(db_session, game_session.id)
+    assert "Try again in" not in hint
+    assert HintStatus.of(game_session.narrative_state).hints_remaining == 4
+
+    hint, game_session = get_a_hint(db_session, game_session.id)
+    assert "Try again in" in hint
+    assert HintStatus.of(game_session.narrative_state).hints_remaining == 4
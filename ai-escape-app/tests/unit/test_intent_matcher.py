@@ -0,0 +1,58 @@
+from services.ai_service import _normalize_player_attempt
+from services.intent_matcher import INTENT_MATCHER, IntentMatcher
+
+ENTRANCE = ("forgotten_library", "forgotten_library_entrance")
+LIBRARY_EXIT = ("forgotten_library", "forgotten_library_escape_chamber")
+
+
+def test_matcher_finds_overlapping_phrases_in_one_pass():
+    matcher = IntentMatcher()
+    matcher.add_phrase("he", "he")
+    matcher.add_phrase("she", "she")
+    matcher.add_phrase("hers", "hers")
+    matcher.compile()
+
+    assert matcher.match("ushers") == "hers" # Longest of "she", "he", "hers"
+    assert matcher.match("ushe") == "she"
+    assert matcher.match("nothing here") == "he"
+    assert matcher.match("xyz") is None
+
+
+def test_matcher_prefers_first_registered_phrase_on_tie():
+    matcher = IntentMatcher()
+    matcher.add_phrase("open", "first")
+    matcher.add_phrase("door", "second")
+    assert matcher.match("open door") == "first"
+
+
+def test_matcher_respects_scope():
+    matcher = IntentMatcher()
+    matcher.add_phrase("escape", "escape_the_library", ("library", "exit"))
+    matcher.add_phrase("escape", "escape_the_ship", ("ship", "pods"))
+    matcher.add_phrase("help", "help")
+
+    assert matcher.match("escape now", ("ship", "pods")) == "escape_the_ship"
+    assert matcher.match("escape now", ("library", "exit")) == "escape_the_library"
+    assert matcher.match("escape now", ("other", "room")) is None
+    assert matcher.match("help me", ("other", "room")) == "help"
+
+
+def test_room_data_synonyms_are_compiled():
+    assert INTENT_MATCHER.match("i touch eye carefully", ENTRANCE) == "examine_glowing_symbol"
+    assert INTENT_MATCHER.match("solve door", ENTRANCE) == "eyetears"
+    assert INTENT_MATCHER.match("enter eyetears", ENTRANCE) == "eyetears"
+    assert INTENT_MATCHER.match("exit library", LIBRARY_EXIT) == "escape_the_library"
+
+
+def test_normalize_player_attempt_uses_room_scope():
+    assert _normalize_player_attempt("Type EYETEARS", *ENTRANCE) == "eyetears"
+    assert _normalize_player_attempt("escape", *LIBRARY_EXIT) == "escape_the_library"
+    # The library's "escape" synonym does not leak into other themes
+    assert _normalize_player_attempt("escape", "sci_fi_hangar", "sci_fi_hangar_escape_pods") == "escape"
+    assert _normalize_player_attempt("Escape the Ship", "sci_fi_hangar", "sci_fi_hangar_escape_pods") == "escape_the_ship"
+
+
+def test_normalize_player_attempt_fallbacks():
+    assert _normalize_player_attempt("use brass key on old door", *ENTRANCE) == "use_brass_key_on_old_door"
+    assert _normalize_player_attempt("use lantern", *ENTRANCE) == "use_lantern"
+    assert _normalize_player_attempt("  Something Else ", *ENTRANCE) == "something else"
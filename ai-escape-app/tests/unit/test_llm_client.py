@@ -0,0 +1,231 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services import ai_service
+from services.ai_provider import DeterministicProvider, GeminiProvider, set_ai_provider
+from services.llm_client import AsyncLLMClient
+from services.response_cache import LRUTier, ResponseCache, set_response_cache
+
+
+class FakeGeminiServer:
+    """
+    Local stand-in for the Gemini generateContent endpoint. Behaviour per request
+    is taken from `responses` (status, delay) in order; the last entry repeats.
+    """
+
+    def __init__(self, responses=None, text="Generated text"):
+        self.responses = list(responses or [(200, 0.0)])
+        self.text = text
+        self.request_count = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.prompts = []
+        self.paths = []
+        self.api_keys = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1beta"
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with fake._lock:
+                    index = min(fake.request_count, len(fake.responses) - 1)
+                    fake.request_count += 1
+                    fake.in_flight += 1
+                    fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+                    fake.prompts.append(body["contents"][0]["parts"][0]["text"])
+                    fake.paths.append(self.path)
+                    fake.api_keys.append(self.headers.get("x-goog-api-key"))
+                status, delay = fake.responses[index]
+                try:
+                    time.sleep(delay)
+                    payload = json.dumps(
+                        {"candidates": [{"content": {"parts": [{"text": fake.text}]}}]}
+                    ).encode()
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass # Client gave up (deadline)
+                finally:
+                    with fake._lock:
+                        fake.in_flight -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def _client(server, **kwargs):
+    options = {"deadline_seconds": 2.0, "backoff_base_seconds": 0.01, "backoff_max_seconds": 0.05}
+    options.update(kwargs)
+    return AsyncLLMClient(api_key="test-key", base_url=server.base_url, **options)
+
+
+def test_generate_returns_model_text():
+    with FakeGeminiServer(text="A dusty hall.") as server:
+        result = asyncio.run(_client(server).generate("describe", fallback="stub"))
+    assert result == "A dusty hall."
+    assert server.prompts == ["describe"]
+
+
+def test_api_key_is_sent_as_header_not_query():
+    with FakeGeminiServer() as server:
+        asyncio.run(_client(server).generate("prompt", fallback="stub"))
+    assert server.api_keys == ["test-key"]
+    assert "key=" not in server.paths[0]
+
+
+def test_missed_deadline_returns_fallback_without_waiting_for_server():
+    with FakeGeminiServer(responses=[(200, 1.5)]) as server:
+        start = time.perf_counter()
+        result = asyncio.run(_client(server).generate("describe", fallback="stub", deadline_seconds=0.2))
+        elapsed = time.perf_counter() - start
+    assert result == "stub"
+    assert elapsed < 1.0
+
+
+def test_retryable_errors_are_retried_with_backoff():
+    with FakeGeminiServer(responses=[(503, 0.0), (429, 0.0), (200, 0.0)], text="ok") as server:
+        result = asyncio.run(_client(server, max_retries=2).generate("p", fallback="stub"))
+    assert result == "ok"
+    assert server.request_count == 3
+
+
+def test_non_retryable_error_falls_back_immediately():
+    with FakeGeminiServer(responses=[(400, 0.0)]) as server:
+        result = asyncio.run(_client(server, max_retries=3).generate("p", fallback="stub"))
+    assert result == "stub"
+    assert server.request_count == 1
+
+
+def test_exhausted_retries_fall_back():
+    with FakeGeminiServer(responses=[(500, 0.0)]) as server:
+        result = asyncio.run(_client(server, max_retries=2).generate("p", fallback="stub"))
+    assert result == "stub"
+    assert server.request_count == 3
+
+
+def test_unreachable_backend_falls_back():
+    client = AsyncLLMClient(
+        api_key="k", base_url="http://127.0.0.1:9/v1beta", max_retries=1,
+        backoff_base_seconds=0.01, deadline_seconds=2.0,
+    )
+    assert asyncio.run(client.generate("p", fallback="stub")) == "stub"
+
+
+def test_concurrency_is_bounded_by_semaphore():
+    with FakeGeminiServer(responses=[(200, 0.1)]) as server:
+        client = _client(server, max_concurrency=2)
+
+        async def run_many():
+            return await asyncio.gather(*(client.generate(f"p{i}", fallback="stub") for i in range(6)))
+
+        results = asyncio.run(run_many())
+    assert results == ["Generated text"] * 6
+    assert server.max_in_flight <= 2
+
+
+def test_generate_sync_shares_one_loop_across_threads():
+    with FakeGeminiServer(responses=[(200, 0.05)]) as server:
+        client = _client(server, max_concurrency=2)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(client.generate_sync("p", fallback="stub")))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        client.close()
+    assert results == ["Generated text"] * 5
+    assert server.max_in_flight <= 2
+
+
+def test_generate_sync_returns_fallback_when_client_closes_mid_call():
+    with FakeGeminiServer(responses=[(200, 3.0)]) as server:
+        client = _client(server, deadline_seconds=5.0)
+        results = []
+        thread = threading.Thread(target=lambda: results.append(client.generate_sync("p", fallback="stub")))
+        thread.start()
+        time.sleep(0.1)
+        start = time.perf_counter()
+        client.close() # Cancels the pending call
+        thread.join(10.0)
+    assert results == ["stub"]
+    assert time.perf_counter() - start < 1.0 # Neither the server nor the deadline was waited for
+
+
+@pytest.fixture
+def live_generation():
+    set_response_cache(ResponseCache(LRUTier()))
+    yield
+    set_ai_provider(None)
+    set_response_cache(None)
+
+
+def test_room_description_uses_llm_when_live(live_generation):
+    with FakeGeminiServer(text="A candle flickers.") as server:
+        set_ai_provider(GeminiProvider(_client(server)))
+        description = ai_service.generate_room_description(
+            "library", "Library", {}, {"name": "Entrance", "description": "A room."}, "entrance"
+        )
+    assert description == "A candle flickers."
+
+
+def test_room_description_falls_back_to_stub_on_deadline(live_generation):
+    with FakeGeminiServer(responses=[(200, 1.0)]) as server:
+        set_ai_provider(GeminiProvider(_client(server, deadline_seconds=0.1)))
+        description = ai_service.generate_room_description(
+            "library", "Library", {}, {"name": "Entrance", "description": "A room."}, "entrance"
+        )
+    assert description == "A room."
+
+
+def test_adjust_difficulty_parses_json_and_falls_back_on_bad_json(live_generation):
+    adjustment = {"difficulty_adjustment": "easier", "reason": "Many attempts.", "suggested_puzzle_parameters": {}}
+    with FakeGeminiServer(text=f"```json\n{json.dumps(adjustment)}\n```") as server:
+        set_ai_provider(GeminiProvider(_client(server)))
+        assert ai_service.adjust_difficulty_based_on_performance({}, "library", "entrance", "medium") == adjustment
+
+    with FakeGeminiServer(text="not json") as server:
+        set_ai_provider(GeminiProvider(_client(server)))
+        result = ai_service.adjust_difficulty_based_on_performance({"p": {}}, "library", "entrance", "medium")
+    assert result["difficulty_adjustment"] == "none"
+
+
+def test_generation_stays_deterministic_without_live_flag(monkeypatch):
+    monkeypatch.delenv("AI_LIVE_GENERATION", raising=False)
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    set_ai_provider(None)
+    try:
+        assert ai_service.generate_narrative("start") == "You find yourself in a mysterious place. Your adventure begins!"
+        assert isinstance(ai_service.get_ai_provider(), DeterministicProvider)
+    finally:
+        set_ai_provider(None)
@@ -0,0 +1,191 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models import Base
+from services import pregeneration
+from services.ai_provider import GeminiProvider, set_ai_provider
+from services.ai_service import generate_room_description
+from services.game_logic import create_game_session, enter_room, solve_puzzle
+from services.pregeneration import PregeneratedRoom, PregenerationWorker, room_context, set_pregeneration_worker
+from services.response_cache import LRUTier, ResponseCache, set_response_cache
+
+
+@pytest.fixture(scope="function")
+def db_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    monkeypatch.setattr(pregeneration, "live_generation_available", lambda: True)
+    worker = PregenerationWorker(max_workers=2)
+    set_pregeneration_worker(worker)
+    yield worker
+    set_pregeneration_worker(None)
+
+
+def _wait_until_done(worker, session_id, room_id, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        future = worker._pending.get((session_id, room_id))
+        if future is None or future.done():
+            return
+        time.sleep(0.01)
+
+
+def test_schedule_is_noop_in_deterministic_mode(monkeypatch):
+    monkeypatch.setattr(pregeneration, "live_generation_available", lambda: False)
+    worker = PregenerationWorker()
+    assert worker.schedule(1, "forgotten_library", "forgotten_library_study", {}) is False
+    assert worker.pending_count() == 0
+
+
+def test_schedule_ignores_unknown_or_missing_rooms(worker):
+    assert worker.schedule(1, "forgotten_library", None, {}) is False
+    assert worker.schedule(1, "forgotten_library", "no_such_room", {}) is False
+
+
+def test_take_returns_ready_content(worker, monkeypatch):
+    monkeypatch.setattr(
+        pregeneration, "generate_room_content",
+        lambda theme_id, room_id, room_info, narrative_state: PregeneratedRoom(f"Warm {room_id}", "A story."),
+    )
+    assert worker.schedule(1, "forgotten_library", "forgotten_library_study", {}) is True
+    assert worker.schedule(1, "forgotten_library", "forgotten_library_study", {}) is False # Already pending
+    _wait_until_done(worker, 1, "forgotten_library_study")
+
+    assert worker.take(1, "forgotten_library_study") == PregeneratedRoom("Warm forgotten_library_study", "A story.")
+    assert worker.take(1, "forgotten_library_study") is None # Consumed
+
+
+def test_take_never_waits_for_unfinished_generation(worker, monkeypatch):
+    release = threading.Event()
+
+    def slow_generation(theme_id, room_id, room_info, narrative_state):
+        release.wait(2.0)
+        return PregeneratedRoom("late", "late")
+
+    monkeypatch.setattr(pregeneration, "generate_room_content", slow_generation)
+    worker.schedule(1, "forgotten_library", "forgotten_library_study", {})
+
+    start = time.perf_counter()
+    assert worker.take(1, "forgotten_library_study") is None
+    assert time.perf_counter() - start < 0.1
+    release.set()
+
+
+class _BlockingClient:
+    api_key = "test-key"
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.prompts = []
+
+    def generate_sync(self, prompt, fallback, deadline_seconds=None):
+        self.prompts.append(prompt)
+        self.release.wait(2.0)
+        return "Generated."
+
+    def close(self):
+        pass
+
+
+def test_unfinished_pregeneration_warms_the_transition_cache(worker):
+    client = _BlockingClient()
+    set_ai_provider(GeminiProvider(client))
+    set_response_cache(ResponseCache(LRUTier()))
+    try:
+        room_id = "forgotten_library_study"
+        worker.schedule(1, "forgotten_library", room_id, {"hints_remaining": 3})
+        future = worker._pending[(1, room_id)]
+        while not client.prompts: # Wait for the job to start, so it cannot be cancelled
+            time.sleep(0.01)
+
+        assert worker.take(1, room_id) is None
+        client.release.set()
+        future.result(timeout=2.0)
+        generated = len(client.prompts)
+
+        # What move_player does on a miss, with the session's hint state moved on since
+        room_info = pregeneration.ROOM_INDEX.room("forgotten_library", room_id)
+        description = generate_room_description(
+            theme="forgotten_library",
+            scenario_name_for_ai_prompt=room_info["name"],
+            narrative_state={"hints_remaining": 2, "hint_cooldown_until": 1700000000},
+            room_context=room_context(room_info),
+            current_room_id=room_id,
+        )
+        assert description == "Generated."
+        assert len(client.prompts) == generated
+    finally:
+        set_ai_provider(None)
+        set_response_cache(None)
+
+
+def test_solve_puzzle_transition_uses_pregenerated_room(worker, monkeypatch, db_session):
+    monkeypatch.setattr(
+        pregeneration, "generate_room_content",
+        lambda theme_id, room_id, room_info, narrative_state: PregeneratedRoom("A warmed study.", "You step inside."),
+    )
+    game_session, _ = create_game_session(
+        db_session, "pregeneration_player", "forgotten_library", "forgotten_library_entrance"
+    )
+    # Entering the first room schedules the next room in the chain
+    _wait_until_done(worker, game_session.id, "forgotten_library_study")
+
+    is_correct, _, updated_session, _ = solve_puzzle(
+        db_session, game_session.id, "ancient_symbol_door_puzzle", "EYETEARS"
+    )
+    assert is_correct
+    assert updated_session.current_room == "forgotten_library_study"
+    assert updated_session.current_room_description == "A warmed study."
+    assert updated_session.narrative_state["room_narrative"] == "You step inside."
+    # ...and entering the study schedules the room after it
+    assert (game_session.id, "forgotten_library_escape_chamber") in worker._pending
+
+
+def test_enter_room_stores_pregenerated_narrative_or_falls_back_without_waiting(worker, monkeypatch, db_session):
+    release = threading.Event()
+
+    def generation(theme_id, room_id, room_info, narrative_state):
+        if room_id == "forgotten_library_escape_chamber":
+            release.wait(2.0)
+        return PregeneratedRoom(f"Warm {room_id}", "You step inside.")
+
+    monkeypatch.setattr(pregeneration, "generate_room_content", generation)
+    game_session, _ = create_game_session(
+        db_session, "pregeneration_player", "forgotten_library", "forgotten_library_entrance"
+    )
+    _wait_until_done(worker, game_session.id, "forgotten_library_study")
+
+    study = pregeneration.ROOM_INDEX.room("forgotten_library", "forgotten_library_study")
+    updated_session = enter_room(db_session, game_session.id, "forgotten_library_study", study)
+    assert updated_session.current_room_description == "Warm forgotten_library_study"
+    assert updated_session.narrative_state["room_narrative"] == "You step inside."
+    assert updated_session.game_history == ["forgotten_library_entrance"]
+
+    # The escape chamber's job is still running: static description, no waiting
+    chamber = pregeneration.ROOM_INDEX.room("forgotten_library", "forgotten_library_escape_chamber")
+    start = time.perf_counter()
+    updated_session = enter_room(db_session, game_session.id, "forgotten_library_escape_chamber", chamber)
+    assert time.perf_counter() - start < 0.5
+    assert updated_session.current_room_description == chamber["description"]
+    release.set()
+
+
+def test_solve_puzzle_transition_falls_back_to_static_description(monkeypatch, db_session):
+    monkeypatch.setattr(pregeneration, "live_generation_available", lambda: False)
+    game_session, _ = create_game_session(
+        db_session, "pregeneration_player", "forgotten_library", "forgotten_library_entrance"
+    )
+    _, _, updated_session, _ = solve_puzzle(db_session, game_session.id, "ancient_symbol_door_puzzle", "EYETEARS")
+    assert updated_session.current_room == "forgotten_library_study"
+    assert "room_narrative" not in updated_session.narrative_state
@@ -0,0 +1,143 @@
+import time
+
+import pytest
+
+from services import ai_service
+from services.ai_provider import GeminiProvider, set_ai_provider
+from services.response_cache import (
+    LRUTier,
+    ResponseCache,
+    SQLiteTier,
+    make_cache_key,
+    set_response_cache,
+)
+
+
+def test_cache_key_ignores_dict_order_and_whitespace():
+    first = make_cache_key("room_description", {"theme": "library", "narrative_state": {"a": True, "b": False}})
+    second = make_cache_key("room_description", {"narrative_state": {"b": False, "a": True}, "theme": " library "})
+    assert first == second
+    assert make_cache_key("narrative", {"theme": "library"}) != make_cache_key("room_description", {"theme": "library"})
+    assert make_cache_key("narrative", {"theme": "library"}) != make_cache_key("narrative", {"theme": "asylum"})
+
+
+def test_lru_tier_evicts_least_recently_used():
+    tier = LRUTier(max_entries=2)
+    tier.set("a", "1")
+    tier.set("b", "2")
+    tier.get("a")
+    tier.set("c", "3")
+    assert tier.get("a") == "1"
+    assert tier.get("b") is None
+    assert tier.get("c") == "3"
+
+
+def test_sqlite_tier_expires_entries_after_ttl(tmp_path):
+    tier = SQLiteTier(str(tmp_path / "cache.db"), ttl_seconds=0.05)
+    tier.set("k", {"text": "v"})
+    assert tier.get("k") == {"text": "v"}
+    time.sleep(0.1)
+    assert tier.get("k") is None
+    assert len(tier) == 0
+    tier.close()
+
+
+def test_sqlite_tier_evicts_oldest_beyond_max_entries(tmp_path):
+    tier = SQLiteTier(str(tmp_path / "cache.db"), max_entries=3)
+    for index in range(5):
+        tier.set(f"k{index}", f"v{index}")
+        time.sleep(0.001)
+    assert len(tier) == 3
+    assert tier.get("k0") is None
+    assert tier.get("k4") == "v4"
+    tier.close()
+
+
+def test_persistent_tier_survives_new_process_cache(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = ResponseCache(LRUTier(), SQLiteTier(path))
+    cache.set("k", "stored")
+    cache.persistent_tier.close()
+
+    restarted = ResponseCache(LRUTier(), SQLiteTier(path))
+    assert restarted.get("k") == "stored"
+    assert restarted.get("k") == "stored" # Promoted to the LRU tier
+    stats = restarted.stats()
+    assert stats["persistent_hits"] == 1
+    assert stats["memory_hits"] == 1
+    assert stats["memory_entries"] == 1
+    restarted.persistent_tier.close()
+
+
+def test_cached_dicts_are_copies():
+    cache = ResponseCache(LRUTier())
+    cache.set("k", {"hints": []})
+    cache.get("k")["hints"].append("mutated")
+    assert cache.get("k") == {"hints": []}
+
+
+class _CountingClient:
+    api_key = "test-key"
+
+    def __init__(self, text):
+        self.text = text
+        self.calls = 0
+
+    def generate_sync(self, prompt, fallback, deadline_seconds=None):
+        self.calls += 1
+        return self.text
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def live_cache():
+    cache = ResponseCache(LRUTier())
+    set_response_cache(cache)
+    yield cache
+    set_ai_provider(None)
+    set_response_cache(None)
+
+
+def test_repeated_room_description_is_served_from_cache(live_cache):
+    client = _CountingClient("A candle flickers.")
+    set_ai_provider(GeminiProvider(client))
+    room_context = {"name": "Entrance", "description": "A room."}
+    for narrative_state in ({"door_open": True, "lamp_lit": False}, {"lamp_lit": False, "door_open": True}):
+        description = ai_service.generate_room_description("library", "Library", narrative_state, room_context, "entrance")
+        assert description == "A candle flickers."
+    assert client.calls == 1
+    assert live_cache.stats()["memory_hits"] == 1
+    assert live_cache.stats()["misses"] == 1
+
+
+def test_sessions_with_different_hint_state_share_room_description(live_cache):
+    client = _CountingClient("Dust hangs over the desk.")
+    set_ai_provider(GeminiProvider(client))
+    room_context = {"name": "Study", "description": "A cluttered study."}
+    sessions = (
+        {"hints_remaining": 3, "intro_story": "Day one.", "forgotten_library_entrance_door_unlocked": True},
+        {"hints_remaining": 0, "hint_cooldown_until": 1700000000, "room_narrative": "You step inside."},
+    )
+    for narrative_state in sessions:
+        ai_service.generate_room_description(
+            "forgotten_library", "Study", narrative_state, room_context, "forgotten_library_study"
+        )
+    assert client.calls == 1
+    assert live_cache.stats()["memory_hits"] == 1
+
+    # The room's own puzzle outcome changes the story, so it gets its own entry
+    ai_service.generate_room_description(
+        "forgotten_library", "Study", {"desk_unlocked": True}, room_context, "forgotten_library_study"
+    )
+    assert client.calls == 2
+
+
+def test_fallback_responses_are_not_cached(live_cache):
+    client = _CountingClient("You find yourself in a mysterious place. Your adventure begins!")
+    set_ai_provider(GeminiProvider(client))
+    ai_service.generate_narrative("start", theme="library")
+    ai_service.generate_narrative("start", theme="library")
+    assert client.calls == 2
+    assert live_cache.stats()["stores"] == 0
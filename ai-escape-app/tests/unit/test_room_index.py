@@ -0,0 +1,75 @@
+from data.rooms import ROOM_DATA
+from data.room_index import ROOM_INDEX, RoomIndex
+
+
+def test_room_index_covers_every_room():
+    for theme_id, theme_data in ROOM_DATA.items():
+        assert ROOM_INDEX.theme(theme_id) is theme_data
+        for room_id, room_info in theme_data["rooms"].items():
+            assert ROOM_INDEX.room(theme_id, room_id) is room_info
+            assert ROOM_INDEX.find_room_id(theme_id, room_info["name"]) == room_id
+
+
+def test_room_index_unknown_keys_return_none():
+    assert ROOM_INDEX.theme("no_such_theme") is None
+    assert ROOM_INDEX.room("no_such_theme", "forgotten_library_entrance") is None
+    assert ROOM_INDEX.room("forgotten_library", "no_such_room") is None
+    assert ROOM_INDEX.find_action("forgotten_library", "forgotten_library_entrance", "Dance") is None
+    assert ROOM_INDEX.find_room_id("forgotten_library", "Nowhere") is None
+    assert ROOM_INDEX.locate_puzzle("forgotten_library", "no_such_puzzle") is None
+
+
+def test_find_action_is_case_insensitive():
+    action = ROOM_INDEX.find_action(
+        "forgotten_library", "forgotten_library_entrance", "examine glowing symbol"
+    )
+    assert action["label"] == "Examine Glowing Symbol"
+    assert action["effect"]["puzzle_id"] == "ancient_symbol_door_puzzle"
+
+
+def test_find_puzzle_id_by_name_is_scoped_to_room():
+    assert (
+        ROOM_INDEX.find_puzzle_id(
+            "forgotten_library", "forgotten_library_entrance", "ancient symbol door puzzle"
+        )
+        == "ancient_symbol_door_puzzle"
+    )
+    assert (
+        ROOM_INDEX.find_puzzle_id(
+            "forgotten_library", "forgotten_library_study", "Ancient Symbol Door Puzzle"
+        )
+        is None
+    )
+
+
+def test_locate_puzzle_is_keyed_by_theme():
+    # final_escape_puzzle exists in several themes
+    theme_id, room_id, definition = ROOM_INDEX.locate_puzzle("asylum", "final_escape_puzzle")
+    assert theme_id == "asylum"
+    assert room_id == "asylum_escape_chamber"
+    assert definition is ROOM_DATA["asylum"]["rooms"][room_id]["puzzles"]["final_escape_puzzle"]
+
+
+def test_puzzles_required_for_escape_excludes_escape_chamber():
+    required = ROOM_INDEX.puzzles_required_for_escape("forgotten_library")
+    assert required == frozenset({"ancient_symbol_door_puzzle", "silent_word_puzzle"})
+    assert ROOM_INDEX.escape_chamber_id("forgotten_library") == "forgotten_library_escape_chamber"
+
+
+def test_room_index_keeps_first_duplicate_label():
+    room_data = {
+        "theme": {
+            "rooms": {
+                "theme_room": {
+                    "name": "Room",
+                    "puzzles": {},
+                    "interactables": {
+                        "a": {"actions": [{"label": "Look", "effect": {"type": "first"}}]},
+                        "b": {"actions": [{"label": "look", "effect": {"type": "second"}}]},
+                    },
+                }
+            }
+        }
+    }
+    index = RoomIndex(room_data)
+    assert index.find_action("theme", "theme_room", "LOOK")["effect"]["type"] == "first"
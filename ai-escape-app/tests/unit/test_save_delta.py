@@ -0,0 +1,116 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, SavedGame
+from services import game_logic
+from services.game_logic import (
+    SAVE_KEYFRAME_INTERVAL,
+    create_game_session,
+    get_saved_game_state,
+    get_saved_game_states,
+    load_game_state,
+    save_game_state,
+    update_game_session,
+)
+from services.save_delta import apply_delta, diff_state
+
+
+@pytest.fixture(scope="function")
+def db_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_diff_and_apply_round_trip():
+    old = {
+        "inventory": ["lamp"],
+        "game_history": ["entrance"],
+        "puzzle_state": {"door": {"attempts": 1}},
+        "narrative_state": {"intro": "x", "stale": True},
+        "current_room": "entrance",
+    }
+    new = {
+        "inventory": ["key"],
+        "game_history": ["entrance", "study"],
+        "puzzle_state": {"door": {"attempts": 2, "solved": True}, "desk": {"attempts": 1}},
+        "narrative_state": {"intro": "x"},
+        "current_room": "study",
+    }
+    delta = diff_state(old, new)
+    assert apply_delta(old, delta) == new
+    assert ["a", ["game_history"], ["study"]] in delta # Appends, not a full copy of the list
+    assert ["d", ["narrative_state", "stale"]] in delta
+    assert old["inventory"] == ["lamp"] # apply_delta does not mutate its input
+
+
+def test_unchanged_state_has_empty_delta():
+    state = {"a": {"b": [1, 2]}}
+    assert diff_state(state, {"a": {"b": [1, 2]}}) == []
+
+
+def test_apply_delta_rejects_unknown_ops():
+    with pytest.raises(ValueError):
+        apply_delta({}, [["x", ["a"]]])
+
+
+def _play_and_save(db_session, session_id, save_count):
+    saves = []
+    expected_states = []
+    for index in range(save_count):
+        game_session = game_logic.get_game_session(db_session, session_id)
+        update_game_session(
+            db_session,
+            session_id,
+            inventory=list(game_session.inventory) + [f"item_{index}"],
+            current_room_description=f"Description {index}",
+        )
+        db_session.commit()
+        saved_game = save_game_state(db_session, session_id, f"Save {index}")
+        saves.append(saved_game)
+        expected_states.append(game_logic.get_game_session(db_session, session_id).to_dict())
+    return saves, expected_states
+
+
+def test_saves_are_deltas_between_keyframes(db_session):
+    game_session, _ = create_game_session(db_session, "delta_player", "forgotten_library", "forgotten_library_entrance")
+    saves, expected_states = _play_and_save(db_session, game_session.id, SAVE_KEYFRAME_INTERVAL + 2)
+
+    assert saves[0].is_keyframe
+    assert all(not saved_game.is_keyframe for saved_game in saves[1:SAVE_KEYFRAME_INTERVAL])
+    assert saves[1].game_state is None
+    assert saves[1].base_save_id == saves[0].id
+    assert saves[SAVE_KEYFRAME_INTERVAL].is_keyframe # Periodic keyframe
+    assert saves[SAVE_KEYFRAME_INTERVAL + 1].base_save_id == saves[SAVE_KEYFRAME_INTERVAL].id
+
+    for saved_game, expected_state in zip(saves, expected_states):
+        assert get_saved_game_state(db_session, saved_game) == expected_state
+
+    batch_states = get_saved_game_states(db_session, saves)
+    assert [batch_states[saved_game.id] for saved_game in saves] == expected_states
+
+
+def test_load_game_state_replays_deltas(db_session):
+    game_session, _ = create_game_session(db_session, "delta_player", "forgotten_library", "forgotten_library_entrance")
+    saves, expected_states = _play_and_save(db_session, game_session.id, 4)
+
+    update_game_session(db_session, game_session.id, inventory=[], current_room_description="Changed")
+    db_session.commit()
+
+    loaded_session = load_game_state(db_session, saves[2].id)
+    assert loaded_session.inventory == expected_states[2]["inventory"]
+    assert loaded_session.current_room_description == "Description 2"
+
+
+def test_broken_chain_is_not_loaded(db_session):
+    game_session, _ = create_game_session(db_session, "delta_player", "forgotten_library", "forgotten_library_entrance")
+    saves, _ = _play_and_save(db_session, game_session.id, 2)
+    delta_save_id = saves[1].id
+    db_session.query(SavedGame).filter(SavedGame.id == saves[0].id).delete()
+    db_session.commit()
+    db_session.expire_all()
+
+    assert load_game_state(db_session, delta_save_id) is None
@@ -0,0 +1,88 @@
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, SavedGame
+from services.game_logic import get_saved_games, list_saved_game_summaries, load_game_state
+from services.schema_migrations import MIGRATIONS, applied_revisions, upgrade_schema
+
+# saved_games / game_sessions as created by the original models.py
+LEGACY_SCHEMA = [
+    """CREATE TABLE game_sessions (
+        id INTEGER NOT NULL, player_id VARCHAR NOT NULL, current_room VARCHAR,
+        current_room_description VARCHAR, inventory JSON, game_history JSON,
+        narrative_state JSON, narrative_archetype VARCHAR, puzzle_state JSON,
+        puzzle_dependencies JSON, start_time DATETIME, last_updated DATETIME,
+        theme VARCHAR, location VARCHAR, difficulty VARCHAR, PRIMARY KEY (id))""",
+    """CREATE TABLE saved_games (
+        id INTEGER NOT NULL, player_id VARCHAR NOT NULL, session_id INTEGER NOT NULL,
+        save_name VARCHAR NOT NULL, saved_at DATETIME, game_state JSON NOT NULL,
+        PRIMARY KEY (id), FOREIGN KEY(session_id) REFERENCES game_sessions (id))""",
+    """INSERT INTO game_sessions (id, player_id, current_room, inventory, game_history,
+        narrative_state, puzzle_state, theme, location, difficulty)
+        VALUES (1, 'legacy_player', 'forgotten_library_study', '[]', '[]', '{}', '{}',
+        'forgotten_library', 'forgotten_library', 'medium')""",
+    """INSERT INTO saved_games (id, player_id, session_id, save_name, saved_at, game_state)
+        VALUES (1, 'legacy_player', 1, 'Old Save', '2025-01-01 10:00:00',
+        '{"current_room": "forgotten_library_entrance", "inventory": ["lamp"]}')""",
+]
+
+
+def _index_names(engine, table_name):
+    return {index["name"] for index in inspect(engine).get_indexes(table_name)}
+
+
+def test_fresh_database_is_stamped_without_changes():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+
+    assert upgrade_schema(engine) == [migration.revision for migration in MIGRATIONS]
+    assert upgrade_schema(engine) == [] # Idempotent
+    assert applied_revisions(engine) == [migration.revision for migration in MIGRATIONS]
+    assert "ix_saved_games_player_id_saved_at" in _index_names(engine, "saved_games")
+    assert "ix_game_sessions_player_id" in _index_names(engine, "game_sessions")
+
+
+def test_legacy_database_is_upgraded_in_place(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        for statement in LEGACY_SCHEMA:
+            connection.execute(text(statement))
+
+    Base.metadata.create_all(engine) # What create_app does first: adds missing tables only
+    upgrade_schema(engine)
+
+    columns = {column["name"]: column for column in inspect(engine).get_columns("saved_games")}
+    assert {"base_save_id", "state_delta", "keyframe_distance"} <= set(columns)
+    assert columns["game_state"]["nullable"] is True
+    assert {
+        "ix_saved_games_player_id_saved_at",
+        "ix_saved_games_session_id",
+    } <= _index_names(engine, "saved_games")
+    assert "ix_game_sessions_player_id" in _index_names(engine, "game_sessions")
+
+    db_session = sessionmaker(bind=engine)()
+    summaries, _ = list_saved_game_summaries(db_session, "legacy_player")
+    assert summaries[0]["summary"]["room"] == "forgotten_library_entrance" # Backfilled
+    saved_games = get_saved_games(db_session, "legacy_player")
+    assert [saved_game.save_name for saved_game in saved_games] == ["Old Save"]
+    loaded_session = load_game_state(db_session, saved_games[0].id)
+    assert loaded_session.current_room == "forgotten_library_entrance"
+    assert loaded_session.inventory == ["lamp"]
+    db_session.close()
+
+
+def test_saved_games_query_uses_player_index():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    db_session = sessionmaker(bind=engine)()
+    query = (
+        db_session.query(SavedGame)
+        .filter(SavedGame.player_id == "p")
+        .order_by(SavedGame.saved_at.desc())
+    )
+    compiled = query.statement.compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as connection:
+        plan = " ".join(str(row[-1]) for row in connection.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+    assert "ix_saved_games_player_id_saved_at" in plan
+    assert "TEMP B-TREE" not in plan # No separate sort step
+    db_session.close()
@@ -0,0 +1,244 @@
+import json
+import threading
+import time
+from contextlib import nullcontext
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+from models import Base
+from services.game_logic import (
+    create_game_session,
+    get_game_session,
+    get_puzzle_attempts,
+    save_game_state,
+    solve_puzzle,
+    update_player_inventory,
+)
+from services.session_cache import WRITE_BEHIND, WRITE_THROUGH, SessionStateCache, set_session_cache
+
+
+@pytest.fixture(scope="function")
+def engine(tmp_path):
+    # File-backed so the write-back (its own connection) sees the same database
+    engine = create_engine(f"sqlite:///{tmp_path / 'sessions.db'}")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def db_session(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture(scope="function")
+def cache():
+    cache = SessionStateCache(mode=WRITE_BEHIND, flush_interval_seconds=0)
+    set_session_cache(cache)
+    yield cache
+    set_session_cache(None)
+
+
+def _record_statements(engine):
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    return statements
+
+
+def _stored_inventory(engine, session_id):
+    with engine.connect() as connection:
+        return connection.execute(text("SELECT inventory FROM game_sessions WHERE id = :id"), {"id": session_id}).scalar()
+
+
+def test_write_behind_defers_writes_until_flush(engine, db_session, cache):
+    game_session, _ = create_game_session(db_session, "cache_player", "forgotten_library", "forgotten_library_entrance")
+    statements = _record_statements(engine)
+
+    for item in ("lamp", "rope", "map"):
+        update_player_inventory(db_session, game_session.id, item, "add")
+        solve_puzzle(db_session, game_session.id, "ancient_symbol_door_puzzle", "WRONG")
+
+    assert not [statement for statement in statements if statement.startswith(("UPDATE", "INSERT"))]
+    assert get_game_session(db_session, game_session.id).inventory == ["lamp", "rope", "map"]
+    assert _stored_inventory(engine, game_session.id) == "[]"
+    assert cache.dirty_count() == 1
+
+    assert cache.flush() == 1
+    assert _stored_inventory(engine, game_session.id) == '["lamp", "rope", "map"]'
+    assert len(get_puzzle_attempts(db_session, game_session.id)) == 3
+    assert cache.stats()["hits"] >= 6 and cache.stats()["misses"] == 1
+
+
+def test_room_change_is_written_back_immediately(engine, db_session, cache):
+    game_session, _ = create_game_session(db_session, "room_player", "forgotten_library", "forgotten_library_entrance")
+
+    is_solved, _, _, _ = solve_puzzle(db_session, game_session.id, "ancient_symbol_door_puzzle", "EYETEARS")
+
+    assert is_solved
+    assert cache.dirty_count() == 0
+    with engine.connect() as connection:
+        current_room = connection.execute(text("SELECT current_room FROM game_sessions")).scalar()
+    assert current_room == "forgotten_library_study"
+
+
+def test_winning_solve_is_written_back_immediately(engine, db_session, cache):
+    game_session, _ = create_game_session(db_session, "win_player", "forgotten_library", "forgotten_library_escape_chamber")
+
+    _, _, _, ai_evaluation = solve_puzzle(db_session, game_session.id, "final_escape_puzzle", "ESCAPE_THE_LIBRARY")
+
+    assert ai_evaluation["game_over"] is True
+    assert cache.dirty_count() == 0
+    with engine.connect() as connection:
+        puzzle_state, narrative_state = connection.execute(
+            text("SELECT puzzle_state, narrative_state FROM game_sessions WHERE id = :id"), {"id": game_session.id}
+        ).one()
+    assert json.loads(puzzle_state)["final_escape_puzzle"]["solved"] is True
+    assert json.loads(narrative_state)["game_completed"] is True
+
+
+def test_save_flushes_session_first(engine, db_session, cache):
+    game_session, _ = create_game_session(db_session, "save_player", "forgotten_library", "forgotten_library_entrance")
+    update_player_inventory(db_session, game_session.id, "lamp", "add")
+
+    saved_game = save_game_state(db_session, game_session.id, "Checkpoint")
+
+    assert saved_game.game_state["inventory"] == ["lamp"]
+    assert _stored_inventory(engine, game_session.id) == '["lamp"]'
+
+
+def test_close_writes_back_pending_changes(engine, db_session, cache):
+    game_session, _ = create_game_session(db_session, "shutdown_player", "forgotten_library", "forgotten_library_entrance")
+    update_player_inventory(db_session, game_session.id, "lamp", "add")
+
+    cache.close()
+
+    assert _stored_inventory(engine, game_session.id) == '["lamp"]'
+
+
+def test_timer_writes_back_dirty_sessions(engine, db_session):
+    cache = SessionStateCache(mode=WRITE_BEHIND, flush_interval_seconds=0.05)
+    set_session_cache(cache)
+    try:
+        game_session, _ = create_game_session(db_session, "timer_player", "forgotten_library", "forgotten_library_entrance")
+        update_player_inventory(db_session, game_session.id, "lamp", "add")
+
+        deadline = time.monotonic() + 5
+        while not cache.stats()["sessions_flushed"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert _stored_inventory(engine, game_session.id) == '["lamp"]'
+    finally:
+        set_session_cache(None)
+
+
+def test_evicted_dirty_session_is_written_back(engine, db_session):
+    cache = SessionStateCache(mode=WRITE_BEHIND, flush_interval_seconds=0, max_entries=1)
+    set_session_cache(cache)
+    try:
+        first, _ = create_game_session(db_session, "first_player", "forgotten_library", "forgotten_library_entrance")
+        second, _ = create_game_session(db_session, "second_player", "forgotten_library", "forgotten_library_entrance")
+        update_player_inventory(db_session, first.id, "lamp", "add")
+        get_game_session(db_session, second.id) # Pushes the first session out
+
+        assert _stored_inventory(engine, first.id) == '["lamp"]'
+        assert cache.stats()["entries"] == 1
+    finally:
+        set_session_cache(None)
+
+
+def test_write_through_commits_every_change(engine, db_session):
+    set_session_cache(SessionStateCache(mode=WRITE_THROUGH))
+    try:
+        game_session, _ = create_game_session(db_session, "through_player", "forgotten_library", "forgotten_library_entrance")
+        update_player_inventory(db_session, game_session.id, "lamp", "add")
+        assert _stored_inventory(engine, game_session.id) == '["lamp"]'
+    finally:
+        set_session_cache(None)
+
+
+def test_write_through_revisions_stay_distinct_for_concurrent_requests(engine, db_session):
+    set_session_cache(SessionStateCache(mode=WRITE_THROUGH))
+    try:
+        game_session, _ = create_game_session(db_session, "etag_player", "forgotten_library", "forgotten_library_entrance")
+        first_request, second_request = sessionmaker(bind=engine)(), sessionmaker(bind=engine)()
+        # Both requests load the row (revision N) before either commits
+        first = get_game_session(first_request, game_session.id)
+        second = get_game_session(second_request, game_session.id)
+        start = first.revision
+        first_revision = update_player_inventory(first_request, game_session.id, "lamp", "add").revision
+        second_revision = update_player_inventory(second_request, game_session.id, "rope", "add").revision
+
+        assert (first_revision, second_revision) == (start + 1, start + 2)
+        assert second.revision == start + 2
+        first_request.close()
+        second_request.close()
+    finally:
+        set_session_cache(None)
+
+
+def test_unknown_durability_mode_is_rejected():
+    with pytest.raises(ValueError):
+        SessionStateCache(mode="eventually")
+
+
+def test_transaction_rollback_drops_the_cached_changes(engine, db_session, cache):
+    game_session, _ = create_game_session(db_session, "batch_player", "forgotten_library", "forgotten_library_entrance")
+    update_player_inventory(db_session, game_session.id, "lamp", "add") # Pending before the transaction
+
+    with pytest.raises(RuntimeError):
+        with cache.transaction(db_session, game_session.id):
+            update_player_inventory(db_session, game_session.id, "rope", "add")
+            solve_puzzle(db_session, game_session.id, "ancient_symbol_door_puzzle", "EYETEARS") # A checkpoint
+            raise RuntimeError("step failed")
+
+    assert get_game_session(db_session, game_session.id).inventory == ["lamp"]
+    assert get_game_session(db_session, game_session.id).current_room == "forgotten_library_entrance"
+    assert get_puzzle_attempts(db_session, game_session.id) == []
+
+
+def test_transaction_commits_once_and_checkpoints_at_the_end(engine, db_session, cache):
+    game_session, _ = create_game_session(db_session, "batch_player", "forgotten_library", "forgotten_library_entrance")
+    statements = _record_statements(engine)
+
+    with cache.transaction(db_session, game_session.id):
+        solve_puzzle(db_session, game_session.id, "ancient_symbol_door_puzzle", "EYETEARS")
+        update_player_inventory(db_session, game_session.id, "rope", "add")
+        assert not [statement for statement in statements if statement.startswith(("UPDATE", "INSERT"))]
+
+    assert len([statement for statement in statements if statement.startswith("UPDATE game_sessions")]) == 1
+    assert cache.dirty_count() == 0
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT current_room FROM game_sessions")).scalar() == "forgotten_library_study"
+
+
+def test_transaction_holds_off_other_requests_for_the_session(engine, db_session, cache):
+    game_session, _ = create_game_session(db_session, "lock_player", "forgotten_library", "forgotten_library_entrance")
+    other_request = sessionmaker(bind=engine)()
+    done = threading.Event()
+
+    def add_rope():
+        update_player_inventory(other_request, game_session.id, "rope", "add")
+        done.set()
+
+    with cache.transaction(db_session, game_session.id):
+        update_player_inventory(db_session, game_session.id, "lamp", "add")
+        thread = threading.Thread(target=add_rope)
+        thread.start()
+        assert not done.wait(0.2) # Waits for the lock rather than changing the cached session mid-block
+        assert get_game_session(db_session, game_session.id).inventory == ["lamp"]
+    thread.join(2.0)
+    other_request.close()
+
+    assert done.is_set()
+    assert get_game_session(db_session, game_session.id).inventory == ["lamp", "rope"]
+
+
+def test_write_through_needs_no_session_lock(db_session):
+    cache = SessionStateCache(mode=WRITE_THROUGH)
+    assert isinstance(cache.session_lock(db_session, 1), nullcontext)
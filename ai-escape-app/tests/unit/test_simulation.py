@@ -0,0 +1,55 @@
+import pytest
+from data.rooms import ROOM_DATA
+from services.session_cache import WRITE_THROUGH, SessionStateCache, set_session_cache
+from services.simulation import GameSimulation, SimulationReport, puzzle_solution
+
+# SQL statements per call of each game_logic operation in the scripted games
+# (write_through sessions). Raise a budget only together with the change that
+# needs the extra statements.
+STATEMENT_BUDGETS = {
+    "create_game_session": 2,
+    "update_player_inventory": 2,
+    "player_action": 3,
+    "solve_puzzle": 4,
+    "get_a_hint": 2,
+    "use_item": 3,
+}
+
+
+@pytest.fixture(scope="function")
+def simulation():
+    set_session_cache(SessionStateCache(mode=WRITE_THROUGH))
+    simulation = GameSimulation()
+    yield simulation
+    simulation.close()
+    set_session_cache(None)
+
+
+@pytest.mark.parametrize("theme_id", list(ROOM_DATA))
+def test_scripted_solver_completes_every_theme(simulation, theme_id):
+    assert simulation.play_theme(theme_id)
+
+
+def test_statements_per_operation_stay_within_budget(simulation):
+    report = simulation.play_all_themes()
+    assert report.games == report.games_completed == len(ROOM_DATA)
+    assert set(report.latencies) == set(STATEMENT_BUDGETS)
+    for operation, budget in STATEMENT_BUDGETS.items():
+        assert report.operation_summary(operation)["statements_per_call"] <= budget, operation
+
+
+def test_puzzle_solution_prefers_the_solutions_table():
+    assert puzzle_solution("ancient_symbol_door_puzzle", {"solution": "EYETEARS"}) == "eyetears"
+    assert puzzle_solution("final_escape_puzzle", {"solution": ["ESCAPE_", "THE_LIBRARY"]}) == "ESCAPE_THE_LIBRARY"
+
+
+def test_report_percentiles():
+    report = SimulationReport()
+    for milliseconds in range(1, 101):
+        report.record("solve_puzzle", milliseconds / 1000, 3)
+
+    summary = report.to_dict()
+    assert summary["actions"] == 100
+    assert summary["statements_per_action"] == 3
+    assert summary["operations"]["solve_puzzle"]["p50_ms"] == pytest.approx(51)
+    assert summary["operations"]["solve_puzzle"]["p99_ms"] == pytest.approx(100)
@@ -0,0 +1,131 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from models import Base
+from services.game_logic import create_game_session, get_game_session, get_puzzle_attempts, solve_puzzle
+from services.unit_of_work import ActionUnitOfWork
+
+
+@pytest.fixture(scope="function")
+def engine():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture(scope="function")
+def db_session(engine):
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    yield session
+    session.close()
+
+
+def _record_statements(engine):
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    return statements
+
+
+def test_unit_of_work_commits_all_changes_together(db_session):
+    game_session, _ = create_game_session(
+        db_session, "uow_player", "forgotten_library", "forgotten_library_entrance"
+    )
+
+    unit_of_work = ActionUnitOfWork(db_session, game_session)
+    unit_of_work.add_item("brass_key")
+    unit_of_work.add_item("brass_key") # Duplicate adds are ignored
+    unit_of_work.set_puzzle_state("ancient_symbol_door_puzzle", {"solved": True})
+    unit_of_work.set_narrative_flags({"door_unlocked": True})
+    unit_of_work.move_to("forgotten_library_study", "A quiet study.")
+    unit_of_work.commit()
+
+    db_session.expire_all()
+    reloaded = get_game_session(db_session, game_session.id)
+    assert reloaded.inventory == ["brass_key"]
+    assert reloaded.puzzle_state["ancient_symbol_door_puzzle"]["solved"] is True
+    assert reloaded.narrative_state["door_unlocked"] is True
+    assert reloaded.narrative_state["hints_remaining"] == 5
+    assert reloaded.current_room == "forgotten_library_study"
+    assert reloaded.current_room_description == "A quiet study."
+    assert reloaded.game_history == ["forgotten_library_entrance"]
+
+
+def test_unit_of_work_without_changes_issues_no_statements(engine, db_session):
+    game_session, _ = create_game_session(
+        db_session, "uow_player", "forgotten_library", "forgotten_library_entrance"
+    )
+    db_session.refresh(game_session)
+    statements = _record_statements(engine)
+
+    unit_of_work = ActionUnitOfWork(db_session, game_session)
+    unit_of_work.remove_item("not_in_inventory")
+    assert not unit_of_work.has_changes
+    unit_of_work.commit()
+
+    assert statements == []
+
+
+def test_solve_puzzle_writes_session_row_once(engine, db_session):
+    game_session, _ = create_game_session(
+        db_session, "uow_player", "forgotten_library", "forgotten_library_entrance"
+    )
+    statements = _record_statements(engine)
+
+    is_solved, _, updated_session, _ = solve_puzzle(
+        db_session, game_session.id, "ancient_symbol_door_puzzle", "eyetears"
+    )
+
+    updates = [s for s in statements if s.startswith("UPDATE game_sessions")]
+    assert is_solved
+    assert len(updates) == 1
+    assert updated_session.current_room == "forgotten_library_study"
+    assert updated_session.puzzle_state["ancient_symbol_door_puzzle"]["solved"] is True
+    assert updated_session.narrative_state["forgotten_library_entrance_door_unlocked"] is True
+
+
+def test_attempts_are_logged_outside_puzzle_state(engine, db_session):
+    game_session, _ = create_game_session(
+        db_session, "uow_player", "forgotten_library", "forgotten_library_entrance"
+    )
+    statements = _record_statements(engine)
+
+    for attempt in ("wrong", "also wrong", "Enter EYETEARS"):
+        solve_puzzle(db_session, game_session.id, "ancient_symbol_door_puzzle", attempt)
+
+    inserts = [s for s in statements if s.startswith("INSERT INTO puzzle_attempts")]
+    assert len(inserts) == 3
+
+    attempts = get_puzzle_attempts(db_session, game_session.id, "ancient_symbol_door_puzzle")
+    assert [(a.action, a.is_correct, a.hint_given) for a in attempts] == [
+        ("wrong", False, False),
+        ("also wrong", False, False),
+        ("eyetears", True, False), # Normalized action
+    ]
+
+    puzzle_state = get_game_session(db_session, game_session.id).puzzle_state["ancient_symbol_door_puzzle"]
+    assert puzzle_state["attempts"] == 3
+    assert "ai_feedback" not in puzzle_state
+    assert "last_attempt" not in puzzle_state
+
+
+def test_recorded_attempt_alone_commits_without_session_update(engine, db_session):
+    game_session, _ = create_game_session(
+        db_session, "uow_player", "forgotten_library", "forgotten_library_entrance"
+    )
+    statements = _record_statements(engine)
+
+    unit_of_work = ActionUnitOfWork(db_session, game_session)
+    unit_of_work.record_attempt("ancient_symbol_door_puzzle", "x" * 200, False, True)
+    assert unit_of_work.has_changes
+    unit_of_work.commit()
+
+    assert not [s for s in statements if s.startswith("UPDATE game_sessions")]
+    attempt = get_puzzle_attempts(db_session, game_session.id)[0]
+    assert len(attempt.action) == 64
+    assert attempt.hint_given is True